@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import webbrowser
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import parse_mix, write_log
+
+
+def _load(context: dict) -> list:
+    from app.providers.events_provider import load_events
+    if "events" not in context:
+        context["events"] = load_events(context["log"])
+    return context["events"]
+
+
+def _alerts(context: dict) -> list:
+    from app.services.events_analyzer import EventAnalyzer
+    if "alerts" not in context:
+        context["alerts"] = EventAnalyzer().analyze_batch(_load(context))
+    return context["alerts"]
+
+
+def bench_load_events(context: dict):
+    from app.providers.events_provider import load_events
+    return lambda: len(load_events(context["log"]))
+
+
+def bench_load_events_parallel(context: dict):
+    from app.providers.events_provider import load_events
+    return lambda: len(load_events(context["log"], workers=context["workers"]))
+
+
+def bench_event_construction(context: dict):
+    from app.models.event_model import Event
+    with open(context["log"]) as f:
+        raws = [json.loads(line) for line in f if line.strip()]
+
+    def run():
+        for raw in raws:
+            Event(raw)
+        return len(raws)
+    return run
+
+
+def bench_analyze(context: dict):
+    from app.services.events_analyzer import EventAnalyzer
+    events = _load(context)
+
+    def run():
+        analyzer = EventAnalyzer()
+        for event in events:
+            analyzer.analyze(event)
+        return len(events)
+    return run
+
+
+def bench_analyze_batch(context: dict):
+    from app.services.events_analyzer import EventAnalyzer
+    events = _load(context)
+
+    def run():
+        EventAnalyzer().analyze_batch(events)
+        return len(events)
+    return run
+
+
+def bench_save_alerts(context: dict):
+    from app.providers.alerts_provider import save_alerts
+    from app.providers.alert_store import close_writers
+    alerts = _alerts(context)
+    path = os.path.join(context["workdir"], "bench_alerts.json")
+
+    def run():
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for alert in alerts:
+                save_alerts(alert, path)
+        close_writers()
+        return len(alerts)
+    return run
+
+
+def _pipeline(context: dict, mode: str):
+    from app.services.events_analyzer import EventAnalyzer
+    from app.services.process.process_lines import process_batches, process_lines
+    from app.services.process.read import read_batches, read_lines
+    from app.providers.alert_store import close_writers
+    path = os.path.join(context["workdir"], f"bench_{mode}_alerts.json")
+
+    async def pipeline():
+        queue = asyncio.Queue(maxsize=100)
+        if mode == "stream":
+            reader = read_lines(context["log"], queue)
+            consumer = asyncio.create_task(process_lines(queue, EventAnalyzer(), path))
+        else:
+            reader = read_batches(context["log"], queue, 1000)
+            consumer = asyncio.create_task(process_batches(queue, EventAnalyzer(), path))
+        await reader
+        await queue.join()
+        consumer.cancel()
+
+    def run():
+        # La sortie console fait partie du coût du pipeline, mais n'est pas affichée
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            asyncio.run(pipeline())
+        close_writers()
+        return context["lines"]
+    return run
+
+
+def bench_pipeline_stream(context: dict):
+    return _pipeline(context, "stream")
+
+
+def bench_pipeline_throughput(context: dict):
+    return _pipeline(context, "throughput")
+
+
+def bench_aggregates(context: dict):
+    from app.services.aggregates import refresh_aggregates
+    path = os.path.join(context["workdir"], "bench_aggregates.json")
+    return lambda: refresh_aggregates(context["log"], None, path, rebuild=True).total_events
+
+
+def _report(context: dict, kind: str):
+    from app.services.aggregates import Aggregates
+    from app.services.process.report_generator import generate_html, generate_pdf
+    from app.services.report_stats import ReportStats
+    aggregates = Aggregates().refresh(context["log"])
+    alerts = _alerts(context)
+    output_dir = os.path.join(context["workdir"], "reports")
+    webbrowser.open = lambda *args, **kwargs: True  # Ne pas ouvrir de navigateur pendant la mesure
+
+    def run():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            stats = ReportStats.from_aggregates(aggregates, alerts)
+            if kind == "pdf":
+                generate_pdf(stats, alerts, output_dir)
+            else:
+                generate_html(stats, alerts, os.path.join(output_dir, "report.html"))
+        return aggregates.total_events
+    return run
+
+
+def bench_report_pdf(context: dict):
+    return _report(context, "pdf")
+
+
+def bench_report_html(context: dict):
+    return _report(context, "html")
+
+
+def bench_cli_startup(context: dict):
+    # Nouvel interpréteur à chaque mesure : imports de `main.py` compris (voir tests/test_cli_startup.py)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.join(root, "src"), os.environ.get("PYTHONPATH")])))
+
+    def run():
+        subprocess.run([sys.executable, os.path.join(root, "main.py"), "show-alerts"], cwd=context["workdir"],
+                       env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return 1
+    return run
+
+
+STAGES = {
+    "load_events": bench_load_events,
+    "load_events_parallel": bench_load_events_parallel,
+    "event_construction": bench_event_construction,
+    "analyze": bench_analyze,
+    "analyze_batch": bench_analyze_batch,
+    "save_alerts": bench_save_alerts,
+    "pipeline_stream": bench_pipeline_stream,
+    "pipeline_throughput": bench_pipeline_throughput,
+    "aggregates": bench_aggregates,
+    "report_pdf": bench_report_pdf,
+    "report_html": bench_report_html,
+    "cli_startup": bench_cli_startup,
+}
+
+
+def _run_stage(name: str, context: dict, repeat: int, conn):
+    """
+        Exécute une étape dans un processus dédié et renvoie sa mesure au parent.
+
+        La préparation (chargement des données d'entrée) n'est pas chronométrée ; seule la
+        meilleure des `repeat` exécutions est retenue. Le pic de mémoire résidente est celui
+        du processus de l'étape, préparation comprise.
+    """
+    try:
+        run = STAGES[name](context)
+        best, items = None, 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            items = run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        conn.send({
+            "stage": name,
+            "items": items,
+            "seconds": round(best, 6),
+            "items_per_second": round(items / best, 1) if best else None,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        })
+    except Exception as e:
+        conn.send({"stage": name, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_stage(name: str, context: dict, repeat: int = 1) -> dict:
+    """
+        Mesure une étape du pipeline dans un processus isolé.
+
+        Chaque étape dispose de son propre processus afin que son pic de mémoire ne soit pas
+        faussé par les étapes précédentes.
+
+        :param name: str - Le nom de l'étape (clé de `STAGES`).
+        :param context: dict - Les paramètres partagés (fichier log, répertoire de travail...).
+        :param repeat: int - Nombre d'exécutions, la meilleure étant retenue.
+        :return: dict - La mesure de l'étape.
+    """
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    mp_context = multiprocessing.get_context(method)
+    receiver, sender = mp_context.Pipe(duplex=False)
+    process = mp_context.Process(target=_run_stage, args=(name, context, repeat, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"stage": name, "error": f"processus terminé (code {process.exitcode})"}
+    process.join()
+    return result
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> list[str]:
+    """
+        Compare des mesures à une référence et liste les régressions de débit.
+
+        :param results: list[dict] - Les mesures courantes.
+        :param baseline_path: str - Le fichier JSON de référence (sortie d'une exécution précédente).
+        :param threshold: float - Baisse de débit tolérée (0.1 pour 10 %).
+        :return: list[str] - Les régressions détectées.
+    """
+    with open(baseline_path) as f:
+        baseline = {r["stage"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["stage"])
+        if not reference or not reference.get("items_per_second") or not result.get("items_per_second"):
+            continue
+        ratio = result["items_per_second"] / reference["items_per_second"]
+        if ratio < 1 - threshold:
+            regressions.append(f"{result['stage']} : {ratio:.0%} du débit de référence")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesurer chaque étape du pipeline sur un log synthétique")
+    parser.add_argument("--events", type=int, default=100000, help="Nombre d'événements synthétiques")
+    parser.add_argument("--seed", type=int, default=42, help="Graine pseudo-aléatoire")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Répartition des niveaux, ex. INFO=0.7,CRITICAL=0.3")
+    parser.add_argument("--burst-every", type=int, default=1000, help="Une rafale CRITICAL tous les N événements (0 pour aucune)")
+    parser.add_argument("--burst-size", type=int, default=20, help="Taille des rafales")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Étapes à mesurer, séparées par des virgules")
+    parser.add_argument("--repeat", type=int, default=1, help="Nombre d'exécutions par étape (la meilleure est retenue)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus pour 'load_events_parallel'")
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats (sortie standard par défaut)")
+    parser.add_argument("--baseline", default=None, help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Baisse de débit tolérée avant d'échouer")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"étapes inconnues : {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        log = os.path.join(workdir, "events.log")
+        lines = write_log(log, args.events, seed=args.seed, level_mix=args.mix,
+                          burst_every=args.burst_every, burst_size=args.burst_size)
+        context = {"log": log, "lines": lines, "workdir": workdir, "workers": args.workers}
+        results = []
+        for stage in stages:
+            result = run_stage(stage, context, args.repeat)
+            results.append(result)
+            if "error" in result:
+                print(f"\033[35m[-] {stage} : {result['error']}\033[35m", file=sys.stderr)
+            else:
+                print(f"\033[32m[+] {stage} : {result['seconds']:.3f} s, "
+                      f"{result['items_per_second']:.0f}/s, {result['peak_rss_kb']} Ko\033[0m", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "events": lines,
+            "seed": args.seed,
+            "burst_every": args.burst_every,
+            "burst_size": args.burst_size,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for regression in regressions:
+            print(f"\033[31m[-] Régression : {regression}\033[0m", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_MIX = {"INFO": 0.7, "WARNING": 0.15, "ERROR": 0.1, "CRITICAL": 0.05}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """
+        Décode une répartition de niveaux de la forme `INFO=0.7,ERROR=0.2,CRITICAL=0.1`.
+
+        :param value: str - La répartition, sous forme de texte.
+        :return: dict[str, float] - Le poids de chaque niveau.
+    """
+    mix = {}
+    for part in value.split(","):
+        level, weight = part.split("=")
+        mix[level.strip().upper()] = float(weight)
+    return mix
+
+
+def generate_events(
+    count: int,
+    seed: int = 42,
+    level_mix: dict[str, float] | None = None,
+    rate: float = 50.0,
+    hosts: int = 10,
+    burst_every: int = 0,
+    burst_size: int = 20,
+    start: datetime = datetime(2025, 7, 11, tzinfo=timezone.utc),
+):
+    """
+        Génère un flux déterministe d'événements synthétiques.
+
+        Les événements sont espacés en moyenne de `1 / rate` secondes. Si `burst_every` est
+        fourni, une rafale de `burst_size` événements CRITICAL rapprochés (10 ms) est insérée
+        tous les `burst_every` événements, afin de simuler un incident. Pour une même graine
+        et les mêmes paramètres, la sortie est identique octet pour octet.
+
+        :param count: int - Nombre d'événements (hors rafales).
+        :param seed: int - Graine du générateur pseudo-aléatoire.
+        :param level_mix: dict[str, float] | None - Poids de chaque niveau (par défaut `DEFAULT_MIX`).
+        :param rate: float - Débit moyen, en événements par seconde.
+        :param hosts: int - Nombre d'hôtes distincts (champ `host`).
+        :param burst_every: int - Intervalle entre deux rafales, en événements (0 pour aucune).
+        :param burst_size: int - Nombre d'événements par rafale.
+        :param start: datetime - Horodatage du premier événement.
+        :return: Iterator[dict] - Les événements générés.
+    """
+    rng = random.Random(seed)
+    mix = level_mix or DEFAULT_MIX
+    levels, weights = list(mix), list(mix.values())
+    current = start
+    for i in range(count):
+        current += timedelta(seconds=rng.expovariate(rate))
+        host = f"host-{rng.randrange(hosts)}"
+        level = rng.choices(levels, weights)[0]
+        yield {
+            "timestamp": current.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": level,
+            "message": f"{level.lower()} sur {host} (requête {rng.randrange(100000)})",
+            "host": host,
+        }
+        if burst_every and i % burst_every == burst_every - 1:
+            host = f"host-{rng.randrange(hosts)}"
+            for _ in range(burst_size):
+                current += timedelta(milliseconds=10)
+                yield {
+                    "timestamp": current.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                    "level": "CRITICAL",
+                    "message": f"panne sur {host}",
+                    "host": host,
+                }
+
+
+def write_log(path: str, count: int, **kwargs) -> int:
+    """
+        Écrit un fichier log synthétique au format JSON Lines.
+
+        :param path: str - Le chemin du fichier à écrire.
+        :param count: int - Nombre d'événements (hors rafales).
+        :param kwargs: Paramètres transmis à `generate_events`.
+        :return: int - Nombre de lignes écrites.
+    """
+    lines = 0
+    with open(path, "w") as f:
+        for event in generate_events(count, **kwargs):
+            f.write(json.dumps(event) + "\n")
+            lines += 1
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générer un fichier events.log synthétique")
+    parser.add_argument("--output", default="events.log", help="Fichier de sortie")
+    parser.add_argument("--events", type=int, default=100000, help="Nombre d'événements")
+    parser.add_argument("--seed", type=int, default=42, help="Graine pseudo-aléatoire")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Répartition des niveaux, ex. INFO=0.7,CRITICAL=0.3")
+    parser.add_argument("--rate", type=float, default=50.0, help="Débit moyen (événements par seconde)")
+    parser.add_argument("--hosts", type=int, default=10, help="Nombre d'hôtes distincts")
+    parser.add_argument("--burst-every", type=int, default=0, help="Une rafale CRITICAL tous les N événements")
+    parser.add_argument("--burst-size", type=int, default=20, help="Taille des rafales")
+    args = parser.parse_args()
+    lines = write_log(args.output, args.events, seed=args.seed, level_mix=args.mix, rate=args.rate,
+                      hosts=args.hosts, burst_every=args.burst_every, burst_size=args.burst_size)
+    print(f"\033[32m[+] {lines} événements écrits dans {args.output}\033[0m")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,334 @@
-import asyncio
 import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 
 import typer
 
-from app.configs.config import Config
-from app.providers.alerts_provider import load_alerts
+from app.configs.config import get_config, use_config
+from app.models import codec
+from app.providers import alert_store
+from app.providers.alerts_provider import iter_alerts, load_alerts, query_alerts
 from app.providers.events_provider import load_events
-from app.services.events_analyzer import EventAnalyzer
-from app.services.process.process_lines import process_lines
-from app.services.process.read import read_lines
-from app.services.process.report_generator import generate_pdf, generate_html
+from app.services.aggregates import refresh_aggregates
 
 app = typer.Typer()
 
-# Charger la configuration
-config = Config()
+# Charger la configuration (valeurs par défaut, fichier ALERT_FLOW_CONFIG, variables ALERT_FLOW_*)
+config = get_config()
+codec.use(config.get("codec.backend", "auto"))  # Moteur JSON (hérité par les processus de travail)
+
+
+@app.callback()
+def main(config_path: str = typer.Option(None, "--config", help="Fichier de configuration (JSON, TOML ou YAML)")):
+    """Détection d'alertes dans des fichiers log"""
+    if config_path:
+        use_config(config_path)  # Le fichier est aussi transmis aux processus de travail
+        codec.use(config.get("codec.backend", "auto"))
+
+
+def update_aggregates(file_path: str, rebuild: bool = False):
+    """Met à jour les agrégats persistés à partir du log et du fichier d'alertes"""
+    return refresh_aggregates(
+        file_path,
+        config.get("alert_storage.alerts_file_path"),
+        config.get("aggregates.path", "aggregates.json"),
+        config.get("aggregates.bucket_seconds", 60),
+        rebuild,
+    )
+
+
+# Les modules lourds (NumPy, matplotlib et fpdf pour les rapports, asyncio pour le pipeline) ne
+# sont importés que par les commandes qui les utilisent : le démarrage de la CLI reste rapide.
+def report_stats(aggregates, alerts):
+    """Calcule une seule fois les statistiques partagées par le rapport et ses graphiques"""
+    from app.services.report_stats import ReportStats
+    return ReportStats.from_aggregates(aggregates, alerts, config.get("event_analyzer.critical_levels", ["CRITICAL"]))
+
+
+def chart_cache():
+    """Cache des graphiques des rapports (dans `<répertoire des rapports>/charts`)"""
+    from app.services.charts import ChartCache
+    return ChartCache(
+        f"{config.get('reports.output_directory')}/charts",
+        config.get("reports.chart_cache_max_bytes", 50 * 1024 * 1024),
+        config.get("reports.chart_workers", 2),
+    )
 
 
 @app.command()
-def run(file_path: str = typer.Option("events.log", help="Le chemin du fichier log à traiter")):
+def run(
+    file_path: str = typer.Option("events.log", help="Le chemin du fichier log à traiter, d'un répertoire de logs ou un motif glob (fichiers .gz acceptés)"),
+    mode: str = typer.Option("stream", help="Mode de traitement : 'stream' (ligne par ligne) ou 'throughput' (par lots)"),
+    batch_size: int = typer.Option(None, help="Nombre de lignes par lot en mode 'throughput'"),
+    queue_depth: int = typer.Option(None, help="Nombre maximal d'éléments en attente dans la queue"),
+    echo: bool = typer.Option(False, help="Afficher les événements en mode 'throughput'"),
+    follow: bool = typer.Option(False, help="Suivre le fichier en continu (comme 'tail -F')"),
+    poll_interval: float = typer.Option(None, help="Intervalle d'interrogation du fichier en mode suivi (secondes)"),
+    checkpoint: str = typer.Option(None, help="Fichier de point de reprise du mode suivi (par défaut <fichier>.checkpoint)"),
+    delay: float = typer.Option(None, help="Délai simulé entre chaque ligne en mode 'stream' (secondes)"),
+    workers: int = typer.Option(None, help="Nombre de processus d'analyse (routage par clé de regroupement)"),
+    metrics: bool = typer.Option(None, help="Activer l'instrumentation du pipeline (statistiques et export Prometheus)"),
+    snapshot: bool = typer.Option(None, help="Reprendre depuis le dernier instantané de l'analyseur et en prendre périodiquement"),
+):
     """Lancer le traitement asynchrone avec file pipeline"""
-    if not os.path.exists(file_path):
+    # Modules du pipeline (asyncio, serveur de métriques...) : chargés par cette seule commande
+    import asyncio
+    from app.providers.log_sources import DEFAULT_PATTERNS, is_compressed, resolve_sources
+    from app.services.alert_sink import build_sink
+    from app.services.events_analyzer import EventAnalyzer, load_rules
+    from app.services.metrics import NULL_METRICS, Metrics, TimedQueue, report_periodically, sample_queue
+    from app.services.process.process_lines import describe_alert, emit_alert, process_batches, process_lines
+    from app.services.process.read import follow_lines, read_batches, read_lines, read_merged
+    from app.services.process.reload import watch_config
+    from app.services.process.sharding import ShardRouter, process_sharded, unshardable_rules
+    from app.services.process.snapshot import Snapshotter
+    from app.services.suppression import build_suppressor
+
+    sources = resolve_sources(file_path, config.get("ingest.patterns", DEFAULT_PATTERNS))
+    if not sources or not os.path.exists(sources[0]):
         print(f"\033[35m[-] Le fichier spécifié '{file_path}' est introuvable.\033[35m")
         return  # Empêcher la sortie du programme avec SystemExit(2)
+    # Plusieurs fichiers ou une archive : lecture parallèle et fusion chronologique
+    merged = sources != [file_path] or is_compressed(file_path)
+    if merged and follow:
+        print("\033[35m[-] Le mode suivi ne s'applique qu'à un seul fichier non compressé.\033[35m")
+        return
+    if mode not in {"stream", "throughput"}:
+        print(f"\033[35m[-] Mode inconnu '{mode}' (attendu : stream ou throughput).\033[35m")
+        return
+
+    batch_size = batch_size or config.get("pipeline.batch_size", 1000)
+    queue_depth = queue_depth or config.get("pipeline.max_queue_depth", 100)
+    poll_interval = poll_interval if poll_interval is not None else config.get("follow.poll_interval", 0.5)
+    checkpoint = checkpoint or f"{file_path}.checkpoint"
+    delay = delay if delay is not None else config.get("pipeline.read_delay", 0.0)
+    workers = workers or config.get("pipeline.workers", 1)
+    if workers > 1:
+        key_field = config.get("pipeline.shard_key") or config.get("event_analyzer.group_by")
+        unshardable = unshardable_rules(load_rules(config), key_field)
+        if unshardable:
+            # Ces règles ne verraient qu'une partie des événements de leurs fenêtres dans chaque processus
+            print(f"\033[33m[-] Analyse répartie désactivée : les règles {', '.join(unshardable)} ne regroupent "
+                  f"pas par '{key_field}'.\033[0m")
+            workers = 1
+    alert_path = config.get("alert_storage.alerts_file_path")
+    batched = mode == "throughput" or workers > 1
+    metrics = metrics if metrics is not None else config.get("metrics.enabled", False)
+    stats = Metrics() if metrics else NULL_METRICS
+    prometheus_file = config.get("metrics.prometheus_file")
+    # Alertes par référence : les processus répartis renvoient des copies, la position n'y est pas suivie
+    source = os.path.abspath(file_path) if config.get("alert_storage.event_refs", False) and workers == 1 \
+        and not merged else None
+    offsets = source is not None
+    snapshot = snapshot if snapshot is not None else config.get("snapshot.enabled", False)
+    if snapshot and (workers > 1 or merged):
+        # Les fenêtres des processus répartis et la position dans plusieurs fichiers ne sont pas sauvegardées
+        print("\033[33m[-] Instantanés désactivés : un seul fichier et un seul processus d'analyse sont requis.\033[0m")
+        snapshot = False
+    snapshot_path = config.get("snapshot.path") or f"{file_path}.snapshot"
 
     try:
         async def pipeline():
-            queue = asyncio.Queue()
-            analyzer = EventAnalyzer()
-            producer = asyncio.create_task(read_lines(file_path, queue))
-            consumer = asyncio.create_task(process_lines(queue, analyzer))
+            nonlocal server
+            # Queue bornée : le lecteur attend le consommateur (horodatée pour la latence de bout en bout)
+            queue = (TimedQueue if stats.enabled else asyncio.Queue)(maxsize=queue_depth)
+            # Puits des alertes : écritures groupées en arrière-plan, sans bloquer la boucle
+            sink = build_sink(config, stats)
+            sink.start()
+            router = writer = analyzer = suppressor = None
+            if workers > 1:
+                # Mode réparti : chaque processus possède les fenêtres des clés qui lui sont attribuées
+                router = ShardRouter(workers, key_field, batch_size, queue_depth)
+                router.start()
+                writer = asyncio.create_task(router.write_alerts(alert_path, stats, sink))
+                consumer = asyncio.create_task(process_sharded(queue, router, stats))
+            elif mode == "throughput":
+                analyzer = EventAnalyzer()
+                suppressor = build_suppressor(config, stats)
+                consumer = asyncio.create_task(process_batches(queue, analyzer, alert_path, echo, stats, source, sink,
+                                                               suppressor))
+            else:
+                analyzer = EventAnalyzer()
+                suppressor = build_suppressor(config, stats)
+                consumer = asyncio.create_task(process_lines(queue, analyzer, alert_path, stats, source, sink,
+                                                             suppressor))
+            if stats.enabled and config.get("metrics.http_port"):
+                # Après `router.start()` : les processus répartis sont créés (fork) avant le thread du serveur
+                server = stats.serve(config.get("metrics.http_port"))
+
+            snapshotter = resume = None
+            if snapshot:
+                snapshotter = Snapshotter(snapshot_path, analyzer, queue, sink, config.get("snapshot.interval", 5.0),
+                                          suppressor)
+                resume = snapshotter.restore(file_path)
+                if resume:
+                    print(f"\033[36m[~] Reprise depuis l'instantané '{snapshot_path}' (octet {resume['offset']}).\033[0m")
+            start = resume["offset"] if resume else 0
+            if follow:
+                reader = follow_lines(file_path, queue, poll_interval, checkpoint, batch_size if batched else None,
+                                      offsets=offsets, snapshot=snapshotter, resume=resume,
+                                      checkpoint_interval=config.get("follow.checkpoint_interval", 5.0))
+            elif merged:
+                reader = read_merged(sources, queue, batch_size if batched else None,
+                                     config.get("ingest.chunk_size", 1 << 20))
+            elif batched:
+                reader = read_batches(file_path, queue, batch_size, offsets=offsets, start=start, snapshot=snapshotter)
+            else:
+                reader = read_lines(file_path, queue, delay, offsets, start, snapshotter)
+            producer = asyncio.create_task(reader)
+            refresher = asyncio.create_task(refresh_periodically()) if follow else None
+            monitors = []
+            if config.path and config.get("reload.enabled", True):
+                # Rechargement à chaud (SIGHUP ou modification du fichier) ; les processus répartis ne sont pas recalibrés
+                monitors.append(asyncio.create_task(watch_config(config, analyzer, config.get("reload.interval", 1.0))))
+            if stats.enabled:
+                stats.register_gauge("alert_sink_pending", lambda: sink.pending)
+                if analyzer:
+                    stats.register_gauge("active_keys", lambda: sum(
+                        m.get("active_keys", 0) for m in analyzer.metrics().values()))
+                monitors += [
+                    asyncio.create_task(sample_queue(queue, stats, config.get("metrics.queue_sample_interval", 1.0))),
+                    asyncio.create_task(report_periodically(stats, config.get("metrics.stats_interval", 10), prometheus_file)),
+                ]
             await producer
             await queue.join()
             consumer.cancel()
+            if router:
+                await router.close()
+                await writer
+            if suppressor:
+                for alert in suppressor.flush():  # Synthèses des alertes encore retenues
+                    alert.source = source
+                    print(describe_alert(alert))
+                    emit_alert(alert, alert_path, sink)
+            await sink.close()  # Écrire les dernières alertes
+            if sink.dropped:
+                print(f"\033[35m[-] {sink.dropped} alerte(s) abandonnée(s) : file du puits pleine.\033[35m")
+            if refresher:
+                refresher.cancel()
+            for monitor in monitors:
+                monitor.cancel()
+
+        async def refresh_periodically():
+            # Mode suivi : les agrégats des rapports sont tenus à jour pendant l'ingestion
+            interval = config.get("aggregates.refresh_interval", 30)
+            while True:
+                await asyncio.sleep(interval)
+                await asyncio.to_thread(update_aggregates, file_path)
 
-        asyncio.run(pipeline())
+        server = None
+        try:
+            asyncio.run(pipeline())
+        finally:
+            if stats.enabled:
+                # Statistiques finales, y compris après une interruption
+                print(f"\033[36m[~] Stats : {stats.stats_line()}\033[0m")
+                if prometheus_file:
+                    stats.write_prometheus(prometheus_file)
+            if server:
+                server.shutdown()
+        if not merged:
+            update_aggregates(file_path)  # Les agrégats persistés suivent un seul fichier log
+    except KeyboardInterrupt:
+        print("\033[33m[-] Traitement interrompu.\033[0m")
     except Exception as e:
         print(f"\033[31m[-] Une erreur s'est produite : {e}\033[0m")
 
 @app.command()
-def show_alerts():
-    """Afficher les alertes sauvegardées"""
+def query_events(
+    file_path: str = typer.Option("events.log", help="Le chemin du fichier log à interroger"),
+    since: str = typer.Option(None, help="Début de l'intervalle (ISO 8601 ou epoch)"),
+    until: str = typer.Option(None, help="Fin de l'intervalle (ISO 8601 ou epoch)"),
+    level: list[str] = typer.Option(None, help="Niveau retenu (option répétable)"),
+):
+    """Afficher les événements d'un intervalle de temps, via l'index temporel du fichier"""
+    if not os.path.exists(file_path):
+        print(f"\033[35m[-] Le fichier spécifié '{file_path}' est introuvable.\033[35m")
+        return
     try:
-        alerts = load_alerts(config.get("alert_storage.alerts_file_path"))
-        if not alerts:
-            print("\033[33m[-] Aucune alerte trouvée.\033[0m")
+        events = load_events(file_path, since=since, until=until, levels=level or None)
+        for e in events:
+            print(f"\033[32m[*] {e.timestamp} | {e.level} | {e.message} (octet {e.offset})\033[0m")
+        if not events:
+            print("\033[33m[-] Aucun événement trouvé.\033[0m")
+    except Exception as e:
+        print(f"\033[31m[-] Une erreur s'est produite : {e}\033[0m")
+
+
+@app.command()
+def show_alerts(
+    since: str = typer.Option(None, help="Début de l'intervalle de déclenchement (ISO 8601 ou epoch)"),
+    until: str = typer.Option(None, help="Fin de l'intervalle de déclenchement (ISO 8601 ou epoch)"),
+    level: list[str] = typer.Option(None, help="Niveau d'événement retenu (option répétable)"),
+    limit: int = typer.Option(None, min=0, help="Nombre maximal d'alertes affichées"),
+    offset: int = typer.Option(0, min=0, help="Nombre d'alertes correspondantes à sauter"),
+):
+    """Afficher les alertes sauvegardées, filtrées par date et par niveau, via l'index du fichier d'alertes"""
+    try:
+        found = False
+        alerts = query_alerts(config.get("alert_storage.alerts_file_path"), since, until, level or None, limit, offset)
         for a in alerts:
+            found = True
             print(f"\033[32m\n[-->] Alerte à {a.triggered_at}\033[0m")
             for e in a.events:
                 print(f"\033[32m[*]   {e.timestamp} | {e.level} | {e.message}\033[0m")
+        if not found:
+            print("\033[33m[-] Aucune alerte trouvée.\033[0m")
     except Exception as e:
         print(f"\033[31m[-] Une erreur s'est produite : {e}\033[0m")
 
 
 @app.command()
-def report():
+def compact_alerts(keep_last: int = typer.Option(None, help="Nombre d'alertes récentes à conserver")):
+    """Compacter le fichier d'alertes (lignes corrompues, rétention)"""
+    path = config.get("alert_storage.alerts_file_path")
+    if not os.path.exists(path):
+        print(f"\033[35m[-] Le fichier {path} est introuvable.\033[35m")
+        return
+    count = alert_store.compact_alerts(path, keep_last)
+    print(f"\033[32m[+] {count} alerte(s) conservée(s) dans {path}\033[0m")
+
+
+@app.command()
+def migrate_alerts():
+    """Convertir un fichier d'alertes historique (tableau JSON) au format JSON Lines"""
+    path = config.get("alert_storage.alerts_file_path")
+    if not os.path.exists(path):
+        print(f"\033[35m[-] Le fichier {path} est introuvable.\033[35m")
+        return
+    count = alert_store.migrate_alerts(path)
+    if count:
+        print(f"\033[32m[+] {count} alerte(s) migrée(s) au format JSON Lines\033[0m")
+    else:
+        print("\033[35m[-] Le fichier est déjà au format JSON Lines.\033[35m")
+
+
+@app.command()
+def report(
+    file_path: str = typer.Option("events.log", help="Le chemin du fichier log"),
+    rebuild: bool = typer.Option(False, help="Recalculer les agrégats depuis le log brut"),
+):
     """Générer un rapport PDF avec graphique"""
-    events = load_events()
+    from app.services.process.report_generator import generate_pdf
     alerts = load_alerts(config.get("alert_storage.alerts_file_path"))
-    generate_pdf(events, alerts)
+    stats = report_stats(update_aggregates(file_path, rebuild), alerts)
+    generate_pdf(stats, alerts, config.get("reports.output_directory"), chart_cache())
 
 @app.command()
-def html():
+def html(
+    file_path: str = typer.Option("events.log", help="Le chemin du fichier log"),
+    rebuild: bool = typer.Option(False, help="Recalculer les agrégats depuis le log brut"),
+):
     """Générer un rapport HTML interactif horodaté"""
-    events = load_events()
-    alerts = load_alerts(config.get("alert_storage.alerts_file_path"))
+    from app.services.process.report_generator import generate_html
+    # Les alertes sont lues en flux (deux passes) : la mémoire reste bornée quel que soit leur nombre
+    alerts_path = config.get("alert_storage.alerts_file_path")
+    stats = report_stats(update_aggregates(file_path, rebuild), iter_alerts(alerts_path))
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    graph_path = f"{config.get('reports.output_directory')}/event_distribution_{timestamp}.png"
     html_path = f"{config.get('reports.output_directory')}/report_{timestamp}.html"
-    generate_html(events, alerts, graph_path, html_path)
+    generate_html(stats, iter_alerts(alerts_path), html_path, cache=chart_cache(),
+                  page_size=config.get("reports.html_page_size", 500))
 
 @app.command()
 def clean_reports():
@@ -81,10 +339,13 @@ def clean_reports():
         return
 
     count = 0
-    for file in reports_dir.iterdir():
-        if file.suffix in {".html", ".pdf", ".png"}:
+    for file in [*reports_dir.iterdir(), *(reports_dir / "charts").glob("*.png")]:
+        if file.is_file() and file.suffix in {".html", ".pdf", ".png"}:
             file.unlink()
             count += 1
+        elif file.is_dir() and file.name.endswith("_data"):  # Pages d'alertes d'un rapport HTML
+            shutil.rmtree(file)
+            count += 1
     if count > 0:
         print(f"\033[32m[+] {count} fichier(s) supprimé(s) dans 'reports/'\033[0m")
     else:
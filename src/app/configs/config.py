@@ -1,56 +1,301 @@
+import json
+import os
+from pathlib import Path
+
+# Variable d'environnement désignant le fichier de configuration de l'utilisateur
+CONFIG_ENV = "ALERT_FLOW_CONFIG"
+# Préfixe des variables d'environnement surchargeant une valeur (sections séparées par `__`)
+ENV_PREFIX = "ALERT_FLOW_"
+
+
+def read_config_file(path) -> dict:
+    """
+        Lit un fichier de configuration JSON, TOML ou YAML (selon son extension).
+
+        :param path: str - Le chemin du fichier (`.json`, `.toml`, `.yaml` ou `.yml`).
+        :return: dict - Les valeurs du fichier (sections imbriquées).
+        :raises ValueError: Si le contenu est invalide ou n'est pas une table, ou si PyYAML (YAML) ou tomli (TOML avant Python 3.11) n'est pas installé.
+    """
+    suffix = Path(path).suffix.lower()
+    with open(path, "rb") as f:
+        if suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"PyYAML est requis pour lire {path} (pip install pyyaml)") from None
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Fichier YAML invalide {path} : {e}") from e
+        elif suffix == ".toml":
+            try:
+                import tomllib
+            except ImportError:  # Python < 3.11
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ValueError(f"tomli est requis pour lire {path} avant Python 3.11 (pip install tomli)") from None
+            data = tomllib.load(f)
+        else:
+            data = json.load(f)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Le fichier de configuration {path} doit contenir une table de sections")
+    return data
+
+
+def env_overrides(environ) -> dict:
+    """
+        Extrait les surcharges de l'environnement.
+
+        Exemple : `ALERT_FLOW_PIPELINE__BATCH_SIZE=5000` donne `{"pipeline": {"batch_size": 5000}}`.
+        Les valeurs sont décodées en JSON si possible (`60`, `true`, `null`, `["ERROR"]`),
+        sinon conservées telles quelles.
+
+        :param environ: Mapping[str, str] - Les variables d'environnement.
+        :return: dict - Les surcharges (sections imbriquées).
+    """
+    overrides = {}
+    for name, raw in environ.items():
+        if not name.startswith(ENV_PREFIX) or "__" not in name:
+            continue
+        *sections, key = name[len(ENV_PREFIX):].lower().split("__")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        target = overrides
+        for section in sections:
+            target = target.setdefault(section, {})
+        target[key] = value
+    return overrides
+
+
+def merge(base: dict, override: dict) -> dict:
+    """
+        Fusionne récursivement deux configurations (les tables sont fusionnées, les autres valeurs remplacées).
+
+        :param base: dict - La configuration de départ (non modifiée).
+        :param override: dict - Les valeurs prioritaires.
+        :return: dict - La configuration fusionnée.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def flatten(config: dict, prefix: str = "", flat: dict | None = None) -> dict:
+    """
+        Aplatit une configuration : chaque section et chaque valeur est indexée par sa clé pointée.
+
+        :param config: dict - La configuration imbriquée.
+        :param prefix: str - Le préfixe des clés (section parente).
+        :param flat: dict | None - Le dictionnaire à compléter.
+        :return: dict - Les valeurs par clé pointée (par exemple "event_analyzer.window_seconds").
+    """
+    flat = {} if flat is None else flat
+    for key, value in config.items():
+        dotted = f"{prefix}{key}"
+        flat[dotted] = value
+        if isinstance(value, dict):
+            flatten(value, f"{dotted}.", flat)
+    return flat
+
+
 class Config:
     """
-        Initialise la configuration avec des valeurs par défaut.
+        Configuration de l'application, en couches.
 
-        Lors de l'initialisation de l'objet `Config`, une configuration par défaut est définie avec les
-        sections suivantes :
-        - event_analyzer : Paramètres liés à l'analyse des événements (fenêtre de temps, niveaux critiques).
-        - alert_storage : Paramètres liés au stockage des alertes (chemin du fichier des alertes).
-        - reports : Paramètres liés à la génération des rapports (répertoire de sortie, fichiers de rapports PDF et HTML).
+        Les valeurs par défaut sont surchargées par le fichier de l'utilisateur (JSON, TOML
+        ou YAML, désigné par `path` ou la variable `ALERT_FLOW_CONFIG`), puis par les
+        variables d'environnement `ALERT_FLOW_<SECTION>__<CLÉ>`. Le résultat est aplati une
+        fois pour toutes : `get` est une simple recherche dans un dictionnaire. `reload`
+        relit les couches et indique les clés modifiées (rechargement à chaud). Les sections
+        et leurs valeurs par défaut sont décrites dans `__init__`.
     """
-    def __init__(self):
+    def __init__(self, path: str | None = None, environ=None):
         """
-            Initialise la configuration avec des valeurs par défaut.
+            Initialise la configuration avec des valeurs par défaut, puis applique les surcharges.
 
             Lors de l'initialisation de l'objet `Config`, une configuration par défaut est définie avec les
             sections suivantes :
-            - event_analyzer : Paramètres liés à l'analyse des événements (fenêtre de temps, niveaux critiques).
-            - alert_storage : Paramètres liés au stockage des alertes (chemin du fichier des alertes).
-            - reports : Paramètres liés à la génération des rapports (répertoire de sortie, fichiers de rapports PDF et HTML).
+            - event_analyzer : Paramètres liés à l'analyse des événements (fenêtre de temps, niveaux critiques, règles de détection).
+            - alert_storage : Paramètres liés au stockage des alertes (chemin du fichier des alertes, synchronisation, indentation, références aux événements, taille des blocs de l'index des requêtes).
+            - reload : Paramètres du rechargement à chaud du fichier de configuration (activation, intervalle de surveillance).
+            - suppression : Paramètres du regroupement des alertes répétées (activation, période de silence, taille du cache des empreintes).
+            - snapshot : Paramètres des instantanés de l'analyseur (activation, chemin, intervalle) pour une reprise rapide.
+            - ingest : Paramètres de la lecture de plusieurs fichiers (motifs des fichiers d'un répertoire, taille des blocs de lecture).
+            - alert_sink : Paramètres du puits asynchrone des alertes (destinations fichier, SQLite ou webhook, lots, nouvelles tentatives).
+            - codec : Paramètres du décodage/encodage JSON (moteur : auto, msgspec, orjson ou json).
+            - event_loader : Paramètres du chargement des événements (nombre de processus, taille minimale d'une plage).
+            - event_store : Paramètres de l'index temporel des fichiers log (nombre de lignes par bloc).
+            - pipeline : Paramètres du pipeline asynchrone (taille des lots, profondeur maximale de la queue, délai simulé, processus d'analyse).
+            - follow : Paramètres du mode suivi continu (intervalle d'interrogation du fichier, délai entre deux points de reprise).
+            - aggregates : Paramètres des agrégats incrémentaux des rapports (fichier, durée des tranches, rafraîchissement).
+            - metrics : Paramètres de l'instrumentation du pipeline (activation, intervalle des statistiques, export Prometheus).
+            - reports : Paramètres liés à la génération des rapports (répertoire de sortie, fichiers de rapports PDF et HTML, cache et rendu des graphiques, pagination des alertes).
+
+            :param path: str | None - Le fichier de configuration de l'utilisateur (par défaut `ALERT_FLOW_CONFIG`).
+            :param environ: Mapping[str, str] | None - Les variables d'environnement (par défaut `os.environ`).
+            :raises ValueError: Si le fichier de configuration est illisible.
         """
 
         # Définition des valeurs par défaut
         self.config = {
             "event_analyzer": {
                 "window_seconds": 30,
-                "critical_levels": ["CRITICAL"]
+                "critical_levels": ["CRITICAL"],
+                "group_by": None,
+                "max_keys": 10000,
+                "key_ttl_seconds": None,
+                "default_rule": True,
+                "rules": []
             },
             "alert_storage": {
-                "alerts_file_path": "alerts.json"
+                "alerts_file_path": "alerts.json",
+                "fsync_every": 64,
+                "fsync_interval": 1.0,
+                "indent": None,
+                "event_refs": False,
+                "index_block_records": 256
+            },
+            "reload": {
+                "enabled": True,
+                "interval": 1.0
+            },
+            "suppression": {
+                "enabled": False,
+                "cooldown_seconds": 60,
+                "max_entries": 10000
+            },
+            "snapshot": {
+                "enabled": False,
+                "path": None,
+                "interval": 5.0
+            },
+            "ingest": {
+                "patterns": ["*.log", "*.log.[0-9]*", "*.gz"],
+                "chunk_size": 1048576
+            },
+            "alert_sink": {
+                "backends": ["file"],
+                "batch_size": 100,
+                "flush_interval": 0.5,
+                "max_pending": 10000,
+                "retries": 5,
+                "backoff": 0.1,
+                "max_backoff": 5.0,
+                "sqlite_path": "alerts.db",
+                "webhook_url": None,
+                "webhook_timeout": 5.0,
+                "webhook_pool_size": 2,
+                "webhook_headers": None
+            },
+            "codec": {
+                "backend": "auto"
+            },
+            "event_loader": {
+                "workers": 1,
+                "min_chunk_bytes": 1048576
+            },
+            "event_store": {
+                "block_lines": 256
+            },
+            "pipeline": {
+                "batch_size": 1000,
+                "max_queue_depth": 100,
+                "read_delay": 0.0,
+                "workers": 1,
+                "shard_key": None
+            },
+            "follow": {
+                "poll_interval": 0.5,
+                "checkpoint_interval": 5.0
+            },
+            "aggregates": {
+                "path": "aggregates.json",
+                "bucket_seconds": 60,
+                "refresh_interval": 30
+            },
+            "metrics": {
+                "enabled": False,
+                "stats_interval": 10,
+                "queue_sample_interval": 1.0,
+                "prometheus_file": None,
+                "http_port": None
             },
             "reports": {
                 "output_directory": "reports",
                 "pdf_report_file": "report.pdf",
-                "html_report_file": "report.html"
+                "html_report_file": "report.html",
+                "chart_cache_max_bytes": 52428800,
+                "chart_workers": 2,
+                "html_page_size": 500
             }
         }
+        self.defaults = self.config
+        self.environ = os.environ if environ is None else environ
+        self.path = path or self.environ.get(CONFIG_ENV) or None
+        self.mtime = None
+        self._flat = {}
+        self.reload()
+
+    def _layers(self) -> dict:
+        """Fusionne les valeurs par défaut, le fichier de l'utilisateur et l'environnement"""
+        config = self.defaults
+        if self.path:
+            self.mtime = os.stat(self.path).st_mtime_ns  # Lu avant le contenu : un fichier invalide n'est signalé qu'une fois
+            config = merge(config, read_config_file(self.path))
+        return merge(config, env_overrides(self.environ))
+
+    def reload(self) -> list[str]:
+        """
+            Relit le fichier de configuration et l'environnement, puis reconstruit le cache des clés.
+
+            En cas d'erreur (fichier absent ou invalide), la configuration courante est conservée.
+
+            :return: list[str] - Les clés pointées dont la valeur a changé (triées).
+            :raises ValueError: Si le fichier de configuration est illisible.
+            :raises OSError: Si le fichier de configuration est introuvable.
+        """
+        config = self._layers()
+        flat = flatten(config)
+        changed = sorted(key for key in flat.keys() | self._flat.keys()
+                         if flat.get(key) != self._flat.get(key) and not isinstance(flat.get(key), dict))
+        self.config, self._flat = config, flat
+        return changed
+
+    def file_changed(self) -> bool:
+        """
+            Indique si le fichier de configuration a été modifié depuis sa dernière lecture.
+
+            :return: bool - True si sa date de modification a changé (False sans fichier ou s'il a disparu).
+        """
+        if not self.path:
+            return False
+        try:
+            return os.stat(self.path).st_mtime_ns != self.mtime
+        except FileNotFoundError:
+            return False
 
     def get(self, key: str, default=None):
         """
             Accède à une valeur dans la configuration en utilisant une clé.
 
             Cette méthode permet d'accéder à une valeur de configuration en utilisant une clé sous forme de chaîne.
-            La clé peut contenir des sous-clés séparées par des points (par exemple "event_analyzer.window_seconds").
+            La clé peut contenir des sous-clés séparées par des points (par exemple "event_analyzer.window_seconds") :
+            elle est recherchée directement dans le cache aplati, sans découpage.
 
             :param key: Clé de la configuration (peut être une chaîne avec des sous-clés séparées par des points).
             :param default: Valeur par défaut à retourner si la clé n'est pas trouvée.
             :return: La valeur de la configuration associée à la clé, ou la valeur par défaut si la clé est introuvable.
         """
-        keys = key.split(".")
-        config_value = self.config
-        for key in keys:
-            config_value = config_value.get(key, default)
-        return config_value
+        return self._flat.get(key, default)
 
     def __repr__(self):
         """
@@ -62,3 +307,34 @@ class Config:
             :return: Chaîne représentant la configuration.
         """
         return f"<Config {self.config}>"
+
+
+_shared: Config | None = None
+
+
+def get_config() -> Config:
+    """
+        Retourne la configuration partagée de l'application, chargée une seule fois.
+
+        :return: Config - La configuration partagée.
+    """
+    global _shared
+    if _shared is None:
+        _shared = Config()
+    return _shared
+
+
+def use_config(path: str) -> Config:
+    """
+        Charge un fichier de configuration dans la configuration partagée.
+
+        Le chemin est aussi placé dans `ALERT_FLOW_CONFIG`, afin que les processus de
+        travail (chargement parallèle, analyse répartie) lisent le même fichier.
+
+        :param path: str - Le fichier de configuration (JSON, TOML ou YAML).
+        :return: Config - La configuration partagée.
+    """
+    config = get_config()
+    config.path = os.environ[CONFIG_ENV] = os.path.abspath(path)
+    config.reload()
+    return config
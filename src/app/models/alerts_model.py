@@ -13,16 +13,37 @@ class Alert:
         Attributs :
         - triggered_at : datetime - Le moment où l'alerte a été déclenchée.
         - events : list[Event] - Liste des événements associés à l'alerte.
+        - rule : str | None - Le nom de la règle ayant déclenché l'alerte.
+        - key : str | None - La clé de regroupement (par exemple l'hôte) de la fenêtre concernée.
+        - source : str | None - Le fichier log des événements ; s'il est connu, ainsi que la position de chaque
+          événement, l'alerte référence ses événements au lieu de les recopier.
+        - count : int - Nombre d'occurrences regroupées dans l'alerte (voir `Suppressor`), 1 par défaut.
+        - first_triggered_at : datetime | None - Déclenchement de la première occurrence regroupée.
+        - fingerprint : str | None - L'empreinte de l'alerte (règle, clé, niveaux et gabarit du message).
     """
-    def __init__(self, triggered_at: datetime, events: list[Event]):
+    def __init__(self, triggered_at: datetime, events: list[Event], rule: str | None = None, key=None,
+                 source: str | None = None, count: int = 1, first_triggered_at: datetime | None = None,
+                 fingerprint: str | None = None):
         """
             Initialise une nouvelle alerte.
 
             :param triggered_at: datetime - La date et l'heure auxquelles l'alerte a été déclenchée.
             :param events: list[Event] - La liste des événements associés à l'alerte.
+            :param rule: str | None - Le nom de la règle ayant déclenché l'alerte.
+            :param key: str | None - La clé de regroupement de la fenêtre concernée.
+            :param source: str | None - Le fichier log contenant les événements.
+            :param count: int - Nombre d'occurrences regroupées dans l'alerte.
+            :param first_triggered_at: datetime | None - Déclenchement de la première occurrence regroupée.
+            :param fingerprint: str | None - L'empreinte de l'alerte.
         """
         self.triggered_at = triggered_at
         self.events = events
+        self.rule = rule
+        self.key = key
+        self.source = source
+        self.count = count
+        self.first_triggered_at = first_triggered_at
+        self.fingerprint = fingerprint
 
     def to_dict(self):
         """
@@ -30,11 +51,26 @@ class Alert:
 
             Cette méthode permet de convertir l'objet `Alert` en un dictionnaire afin de faciliter la sérialisation
             de l'alerte en JSON. Les objets `datetime` sont convertis en chaînes ISO 8601 et les événements sont
-            convertis en leurs représentations brutes (raw).
+            convertis en leurs représentations brutes (raw). Si le fichier source et la position de chaque
+            événement sont connus, seules les positions sont enregistrées (`source` et `event_refs`). Les niveaux
+            des événements (`levels`) sont recopiés pour que l'index des alertes n'ait pas à relire le fichier log.
 
             :return: dict - Représentation de l'alerte sous forme de dictionnaire.
         """
-        return {
-            "triggered_at": self.triggered_at.isoformat(), # Convertit datetime en chaîne ISO 8601
-            "events": [e.raw for e in self.events] # Sérialisation des événements associés
-        }
+        data = {"triggered_at": self.triggered_at.isoformat()} # Convertit datetime en chaîne ISO 8601
+        if self.source and all(e.offset is not None for e in self.events):
+            data["source"] = self.source
+            data["event_refs"] = [e.offset for e in self.events] # Références vers le fichier log
+        else:
+            data["events"] = [e.raw for e in self.events] # Sérialisation des événements associés
+        data["levels"] = sorted({e.level for e in self.events})
+        if self.rule is not None:
+            data["rule"] = self.rule
+        if self.key is not None:
+            data["key"] = self.key
+        if self.fingerprint is not None:
+            data["fingerprint"] = self.fingerprint
+        if self.count != 1:
+            data["count"] = self.count
+            data["first_triggered_at"] = self.first_triggered_at.isoformat()
+        return data
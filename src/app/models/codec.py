@@ -0,0 +1,144 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Dépendance optionnelle
+    msgspec = None
+
+# Ordre de préférence du mode "auto" (du plus rapide au plus lent)
+BACKENDS = ("msgspec", "orjson", "json")
+
+# Erreurs de décodage de tous les moteurs (`orjson.JSONDecodeError` dérive de `ValueError`)
+DecodeError = (ValueError, msgspec.DecodeError) if msgspec else (ValueError,)
+
+backend = "json"
+
+
+def _json_loads(data):
+    if data.__class__ is bytes:
+        data = data.decode()  # Plus rapide que la détection d'encodage de `json.loads` sur des octets
+    return json.loads(data)
+
+
+def has_non_finite(data) -> bool:
+    """
+        Indique si une valeur JSON contient les jetons non standard `NaN` ou `Infinity`.
+
+        `json.loads` les accepte, msgspec et orjson les refusent : une ligne refusée par ces
+        moteurs qui en contient est relue par le module `json`, afin que le résultat ne
+        dépende pas des moteurs installés.
+
+        :param data: bytes | str - La valeur JSON.
+        :return: bool - True si l'un des jetons apparaît dans la valeur.
+    """
+    if data.__class__ is str:
+        return "NaN" in data or "Infinity" in data
+    return b"NaN" in data or b"Infinity" in data
+
+
+def _orjson_loads(data):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        if not has_non_finite(data):
+            raise
+    return _json_loads(data)  # Jetons `NaN`/`Infinity` : relue par le module `json`
+
+
+def _msgspec_loads(data):
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError:
+        if not has_non_finite(data):
+            raise
+    return _json_loads(data)  # Jetons `NaN`/`Infinity` : relue par le module `json`
+
+
+def _json_dumps(obj, indent: int | None = None) -> str:
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+
+def _orjson_dumps(obj, indent: int | None = None) -> str:
+    if indent not in (None, 2):
+        return _json_dumps(obj, indent)  # orjson ne sait indenter qu'avec deux espaces
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    except TypeError:
+        return _json_dumps(obj, indent)  # Types non pris en charge (entiers > 64 bits...)
+
+
+def _msgspec_dumps(obj, indent: int | None = None) -> str:
+    try:
+        encoded = msgspec.json.encode(obj)
+    except TypeError:
+        return _json_dumps(obj, indent)
+    if indent is not None:
+        encoded = msgspec.json.format(encoded, indent=indent)
+    return encoded.decode()
+
+
+loads = _json_loads
+dumps = _json_dumps
+
+
+def use(name: str | None = "auto") -> str:
+    """
+        Sélectionne le moteur JSON utilisé par `loads` et `dumps`.
+
+        "auto" choisit le premier moteur installé parmi msgspec, orjson et le module `json`
+        de la bibliothèque standard. Un moteur demandé mais absent est remplacé par le
+        suivant disponible. Les valeurs non standard `NaN`, `Infinity` et `-Infinity`,
+        refusées par msgspec et orjson, sont relues par le module `json` : le résultat du
+        décodage est le même quel que soit le moteur. Les appelants doivent passer par `codec.loads` / `codec.dumps`
+        (attributs du module) pour suivre le moteur courant.
+
+        :param name: str | None - "auto", "orjson", "msgspec" ou "json".
+        :return: str - Le moteur effectivement sélectionné.
+    """
+    global backend, loads, dumps
+    available = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    if name in BACKENDS and available[name]:
+        backend = name
+    else:
+        backend = next(b for b in BACKENDS if available[b])
+    if backend == "orjson":
+        loads, dumps = _orjson_loads, _orjson_dumps
+    elif backend == "msgspec":
+        loads, dumps = _msgspec_loads, _msgspec_dumps
+    else:
+        loads, dumps = _json_loads, _json_dumps
+    return backend
+
+
+use("auto")
+
+
+if msgspec is not None:
+    class EventSchema(msgspec.Struct):
+        """Schéma typé des champs d'un événement, décodés sans dictionnaire intermédiaire"""
+        timestamp: str | int | float
+        level: str = ""
+        message: Any = ""
+
+    _event_decoder = msgspec.json.Decoder(EventSchema)
+
+    def decode_event_fields(data) -> EventSchema:
+        """
+            Décode uniquement l'horodatage, le niveau et le message d'une ligne JSON.
+
+            :param data: bytes | str - La ligne JSON.
+            :return: EventSchema - Les champs typés (les autres champs sont ignorés).
+            :raises msgspec.DecodeError: Si la ligne est invalide ou ne respecte pas le schéma.
+        """
+        return _event_decoder.decode(data)
+else:
+    EventSchema = None
+    decode_event_fields = None
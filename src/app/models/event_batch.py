@@ -0,0 +1,163 @@
+from array import array
+
+from . import codec
+from .event_model import Event
+
+
+class EventBatch:
+    """
+        Stockage en colonnes d'un ensemble d'événements.
+
+        Au lieu d'un objet `Event` par ligne, le lot conserve des colonnes compactes :
+        - timestamps : array('q') - Horodatages en nanosecondes depuis l'epoch (UTC si absent).
+        - level_codes : array('H') - Code du niveau de chaque événement (index dans `level_names`).
+        - messages : bytearray + array('Q') - Messages encodés en UTF-8 et leurs positions de fin.
+        - lignes brutes : bytearray + array('Q') - Lignes JSON d'origine, décodées seulement à la demande.
+
+        Les objets `Event` et les dictionnaires `raw` ne sont reconstruits qu'à l'accès
+        (`batch[i]`, `batch.raw(i)`), par exemple pour la sérialisation.
+
+        Attributs :
+        - level_names : list[str] - Niveaux rencontrés, dans l'ordre de leur code.
+    """
+    def __init__(self):
+        """
+            Initialise un lot vide.
+        """
+        self.timestamps = array("q")
+        self.level_codes = array("H")
+        self.level_names: list[str] = []
+        self._level_index: dict[str, int] = {}
+        self._messages = bytearray()
+        self._message_ends = array("Q")
+        self._lines = bytearray()
+        self._line_ends = array("Q")
+
+    @classmethod
+    def from_lines(cls, lines) -> "EventBatch":
+        """
+            Construit un lot à partir de lignes JSON.
+
+            Les lignes invalides sont ignorées, comme dans `load_events`.
+
+            :param lines: Iterable[str | bytes] - Les lignes du fichier log.
+            :return: EventBatch - Le lot construit.
+        """
+        batch = cls()
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    batch.append_line(line)
+                except Exception:
+                    continue
+        return batch
+
+    @classmethod
+    def from_events(cls, events: list[Event]) -> "EventBatch":
+        """
+            Construit un lot à partir d'objets `Event` existants.
+
+            :param events: list[Event] - Les événements à stocker.
+            :return: EventBatch - Le lot construit.
+        """
+        batch = cls()
+        for event in events:
+            batch._append(codec.dumps(event.raw).encode(), event)
+        return batch
+
+    def append_line(self, line: str | bytes):
+        """
+            Ajoute un événement à partir de sa ligne JSON.
+
+            :param line: str | bytes - La ligne JSON de l'événement.
+        """
+        if isinstance(line, str):
+            line = line.encode()
+        self._append(line, Event.from_line(line))
+
+    def _append(self, line: bytes, event: Event):
+        """
+            Ajoute les colonnes d'un événement décodé.
+
+            :param line: bytes - La ligne JSON d'origine.
+            :param event: Event - L'événement décodé correspondant.
+        """
+        code = self._level_index.get(event.level)
+        if code is None:
+            code = self._level_index[event.level] = len(self.level_names)
+            self.level_names.append(event.level)
+        self.timestamps.append(event.epoch_ns)
+        self.level_codes.append(code)
+        self._messages += str(event.message).encode()
+        self._message_ends.append(len(self._messages))
+        self._lines += line
+        self._line_ends.append(len(self._lines))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _slice(self, buffer: bytearray, ends: array, i: int) -> bytes:
+        """Retourne le i-ème élément d'un tampon délimité par ses positions de fin"""
+        start = ends[i - 1] if i else 0
+        return bytes(buffer[start:ends[i]])
+
+    def level(self, i: int) -> str:
+        """Retourne le niveau du i-ème événement"""
+        return self.level_names[self.level_codes[i]]
+
+    def message(self, i: int) -> str:
+        """Retourne le message du i-ème événement"""
+        return self._slice(self._messages, self._message_ends, i).decode()
+
+    def raw(self, i: int) -> dict:
+        """Décode et retourne les données brutes du i-ème événement"""
+        return codec.loads(self._slice(self._lines, self._line_ends, i))
+
+    def __getitem__(self, i: int) -> Event:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return Event(self.raw(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def level_counts(self) -> dict[str, int]:
+        """
+            Compte les événements par niveau sans reconstruire d'objet `Event`.
+
+            :return: dict[str, int] - Nombre d'événements par niveau.
+        """
+        counts = [0] * len(self.level_names)
+        for code in self.level_codes:
+            counts[code] += 1
+        return dict(zip(self.level_names, counts))
+
+    def to_numpy(self) -> dict:
+        """
+            Expose les colonnes numériques sous forme de tableaux NumPy.
+
+            Les colonnes sont copiées : une vue (`np.frombuffer`) verrouillerait les tampons
+            des `array` et empêcherait d'ajouter des événements au lot (`BufferError`).
+
+            :return: dict - Les colonnes `timestamps` (int64) et `level_codes` (uint16).
+        """
+        try:
+            import numpy as np  # Optionnel, et importé seulement ici : les colonnes restent des `array`
+        except ImportError:
+            raise ImportError("NumPy est requis pour EventBatch.to_numpy()") from None
+        return {
+            "timestamps": np.array(self.timestamps, dtype=np.int64),
+            "level_codes": np.array(self.level_codes, dtype=np.uint16),
+        }
+
+    def nbytes(self) -> int:
+        """Retourne la taille mémoire approximative des colonnes, en octets"""
+        columns = (self.timestamps, self.level_codes, self._message_ends, self._line_ends)
+        return sum(c.itemsize * len(c) for c in columns) + len(self._messages) + len(self._lines)
+
+    def __repr__(self):
+        return f"<EventBatch {len(self)} événements, niveaux={self.level_names}>"
@@ -1,5 +1,12 @@
+import sys
 from datetime import datetime
 
+from . import codec
+from .timestamps import TimestampParser, ns_to_datetime
+
+# Décodeur partagé : le format est détecté par valeur, les caches servent à tous les flux
+default_parser = TimestampParser()
+
 class Event:
     """
         Classe représentant un événement.
@@ -8,12 +15,21 @@ class Event:
         L'événement est créé à partir de données brutes sous forme de dictionnaire.
 
         Attributs :
-        - raw : dict - Dictionnaire contenant les données brutes de l'événement.
-        - timestamp : datetime - Le moment où l'événement s'est produit.
+        - raw : dict - Dictionnaire contenant les données brutes de l'événement (décodé à la demande
+          pour un événement créé par `from_line` avec le schéma typé).
+        - timestamp : datetime - Le moment où l'événement s'est produit (construit à la demande).
+        - epoch_ns : int - Le même moment en nanosecondes depuis l'epoch (UTC si aucun fuseau n'est indiqué).
         - level : str - Le niveau de l'événement (par exemple, "INFO", "ERROR", "CRITICAL").
         - message : str - Le message associé à l'événement.
+        - offset : int | None - La position (en octets) de la ligne de l'événement dans le fichier log, si elle est connue.
+
+        La classe utilise `__slots__` (pas de `__dict__` par instance) et les niveaux sont
+        internés : tous les événements d'un même niveau partagent la même chaîne.
     """
-    def __init__(self, raw: dict, timestamp_key="timestamp", level_key="level", message_key="message"):
+    __slots__ = ("epoch_ns", "level", "message", "offset", "_raw", "_line", "_timestamp_value", "_timestamp")
+
+    def __init__(self, raw: dict, timestamp_key="timestamp", level_key="level", message_key="message",
+                 parser: TimestampParser | None = None, offset: int | None = None):
         """
             Initialise un événement à partir des données brutes.
 
@@ -24,11 +40,81 @@ class Event:
             :param timestamp_key: str - La clé du dictionnaire qui contient l'horodatage de l'événement (par défaut "timestamp").
             :param level_key: str - La clé du dictionnaire qui contient le niveau de l'événement (par défaut "level").
             :param message_key: str - La clé du dictionnaire qui contient le message de l'événement (par défaut "message").
+            :param parser: TimestampParser | None - Le décodeur d'horodatages du flux (par défaut le décodeur partagé).
+            :param offset: int | None - La position de la ligne de l'événement dans le fichier log.
         """
-        self.raw = raw
-        self.timestamp = datetime.fromisoformat(raw[timestamp_key].replace("Z", "+00:00"))
-        self.level = raw.get(level_key, "").upper()
+        self._raw = raw
+        self._line = None
+        self._timestamp_value = raw[timestamp_key]
+        self._timestamp = None
+        self.epoch_ns = (parser or default_parser).parse_ns(self._timestamp_value)
+        self.level = sys.intern(raw.get(level_key, "").upper())
         self.message = raw.get(message_key, "")
+        self.offset = offset
+
+    @classmethod
+    def from_line(cls, line, parser: TimestampParser | None = None, offset: int | None = None) -> "Event":
+        """
+            Crée un événement à partir d'une ligne JSON, avec les clés par défaut.
+
+            Avec le moteur msgspec, seuls l'horodatage, le niveau et le message sont décodés,
+            directement dans un schéma typé : le dictionnaire `raw` n'est construit qu'au
+            premier accès. Avec les autres moteurs, la ligne est décodée par `codec.loads`.
+
+            :param line: bytes | str - La ligne JSON.
+            :param parser: TimestampParser | None - Le décodeur d'horodatages du flux.
+            :param offset: int | None - La position de la ligne dans le fichier log.
+            :return: Event - L'événement créé.
+            :raises Exception: Si la ligne est invalide (erreur de décodage, horodatage absent...).
+        """
+        if codec.backend != "msgspec":
+            return cls(codec.loads(line), parser=parser, offset=offset)
+        try:
+            fields = codec.decode_event_fields(line)
+        except codec.DecodeError:
+            if not codec.has_non_finite(line):
+                raise
+            return cls(codec.loads(line), parser=parser, offset=offset)  # `NaN`/`Infinity` : relue par `json`
+        event = cls.__new__(cls)
+        event._raw = None
+        event._line = line
+        event._timestamp_value = fields.timestamp
+        event._timestamp = None
+        event.epoch_ns = (parser or default_parser).parse_ns(fields.timestamp)
+        event.level = sys.intern(fields.level.upper())
+        event.message = fields.message
+        event.offset = offset
+        return event
+
+    @property
+    def raw(self) -> dict:
+        """
+            Retourne les données brutes de l'événement, décodées au premier accès si nécessaire.
+
+            :return: dict - Le dictionnaire des données brutes.
+        """
+        raw = self._raw
+        if raw is None:
+            raw = self._raw = codec.loads(self._line)
+        return raw
+
+    @property
+    def timestamp(self) -> datetime:
+        """
+            Retourne l'horodatage sous forme de `datetime`, construit au premier accès.
+
+            Un horodatage ISO 8601 conserve son fuseau horaire (ou son absence) ; un horodatage
+            epoch numérique est converti en `datetime` UTC.
+
+            :return: datetime - Le moment où l'événement s'est produit.
+        """
+        if self._timestamp is None:
+            value = self._timestamp_value
+            if isinstance(value, str):
+                self._timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            else:
+                self._timestamp = ns_to_datetime(self.epoch_ns)
+        return self._timestamp
 
     def __repr__(self):
         """
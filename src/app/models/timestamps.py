@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+
+NS_PER_SECOND = 1_000_000_000
+
+# Zéros à ajouter à une fraction de seconde de n chiffres pour l'exprimer en nanosecondes
+_PADDING = tuple("0" * (9 - n) for n in range(10))
+
+# Bornes (en valeur absolue) permettant de deviner l'unité d'un horodatage epoch
+_EPOCH_UNITS = (
+    (1e11, NS_PER_SECOND),   # secondes
+    (1e14, 1_000_000),       # millisecondes
+    (1e17, 1_000),           # microsecondes
+)
+
+
+def _epoch_to_ns(value: int | float) -> int:
+    """
+        Convertit un horodatage epoch numérique en nanosecondes, en devinant son unité.
+
+        :param value: int | float - Horodatage en secondes, millisecondes, microsecondes ou nanosecondes.
+        :return: int - L'horodatage en nanosecondes depuis l'epoch.
+    """
+    magnitude = abs(value)
+    for bound, factor in _EPOCH_UNITS:
+        if magnitude < bound:
+            return round(value * factor)
+    return int(value)
+
+
+class TimestampParser:
+    """
+        Décodeur rapide d'horodatages vers des nanosecondes depuis l'epoch.
+
+        Le format (epoch numérique ou ISO 8601) est déterminé pour chaque valeur hors cache :
+        un même décodeur peut donc être partagé par des flux de formats différents, toute
+        chaîne non numérique suivant le chemin rapide ISO. Pour l'ISO 8601, la partie
+        « date + heure à la seconde » (par exemple `2025-07-11T10:00:05`) est convertie une
+        seule fois puis mise en cache, tout comme les suffixes de fuseau horaire ; seule la
+        fraction de seconde est décodée à chaque appel. Les horodatages sans fuseau horaire
+        sont considérés en UTC. Toute valeur hors du chemin rapide est décodée avec
+        `datetime.fromisoformat`.
+
+        Attributs :
+        - kind : str | None - Format de la première valeur ("epoch" ou "iso"), None avant elle.
+        - cache_size : int - Nombre maximal de préfixes conservés en cache.
+    """
+    def __init__(self, cache_size: int = 4096):
+        """
+            Initialise un décodeur sans format détecté.
+
+            :param cache_size: int - Nombre maximal de préfixes conservés en cache.
+        """
+        self.kind = None
+        self.cache_size = cache_size
+        self._seconds: dict[str, int] = {}
+        self._offsets: dict[str, int] = {}
+
+    def parse_ns(self, value) -> int:
+        """
+            Décode un horodatage en nanosecondes depuis l'epoch (UTC).
+
+            :param value: str | int | float - L'horodatage brut.
+            :return: int - L'horodatage en nanosecondes.
+            :raises ValueError: Si la valeur n'est pas un horodatage reconnu.
+        """
+        # Chemin rapide, écrit en ligne : seconde déjà en cache, fuseau connu ou fraction + `Z`
+        if value.__class__ is str:
+            base = self._seconds.get(value[:19])
+            if base is not None:
+                if len(value) == 19:
+                    return base
+                tail = value[19:]
+                offset = self._offsets.get(tail)
+                if offset is not None:
+                    return base - offset
+                if tail[0] == "." and tail[-1] == "Z":
+                    digits = tail[1:-1]
+                    if digits.isdigit() and len(digits) <= 9:
+                        return base + int(digits + _PADDING[len(digits)])
+        return self._parse(value)
+
+    def _parse(self, value) -> int:
+        """
+            Chemin complet : détection du format, mise en cache puis décodage.
+
+            :param value: str | int | float - L'horodatage brut.
+            :return: int - L'horodatage en nanosecondes.
+        """
+        kind = self._detect(value)
+        if self.kind is None:
+            self.kind = kind
+        if isinstance(value, str):
+            if kind == "iso":  # Selon la valeur, pas le flux : un décodeur partagé garde son cache
+                try:
+                    return self._parse_iso(value)
+                except (ValueError, IndexError):
+                    return self._parse_slow(value)
+            return self._parse_slow(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return _epoch_to_ns(value)
+        raise ValueError(f"Horodatage invalide : {value!r}")
+
+    @staticmethod
+    def _detect(value) -> str:
+        """Détermine le format d'un horodatage brut"""
+        if isinstance(value, str) and not value.lstrip("-").replace(".", "", 1).isdigit():
+            return "iso"
+        return "epoch"
+
+    def _parse_iso(self, value: str) -> int:
+        """
+            Chemin rapide : `YYYY-MM-DD[T ]HH:MM:SS[.fraction][Z|±HH:MM]`.
+
+            :param value: str - L'horodatage ISO 8601.
+            :return: int - L'horodatage en nanosecondes.
+        """
+        head = value[:19]
+        base = self._seconds.get(head)
+        if base is None:
+            if len(head) != 19:
+                raise ValueError(value)
+            base = int(datetime.fromisoformat(head).replace(tzinfo=timezone.utc).timestamp()) * NS_PER_SECOND
+            if len(self._seconds) >= self.cache_size:
+                self._seconds.clear()
+            self._seconds[head] = base
+        if len(value) == 19:
+            return base
+        tail = value[19:]
+        offset = self._offsets.get(tail)
+        if offset is not None:
+            return base - offset
+        if tail[0] != ".":
+            offset = self._offsets[tail] = self._parse_suffix(tail)  # Suffixe de fuseau seul
+            return base - offset
+        # Fraction de seconde suivie d'un éventuel fuseau (`Z`, `±HH:MM` ou `±HHMM`)
+        if tail[-1] == "Z":
+            digits, suffix = tail[1:-1], "Z"
+        elif len(tail) > 6 and tail[-6] in "+-":
+            digits, suffix = tail[1:-6], tail[-6:]
+        elif len(tail) > 5 and tail[-5] in "+-":
+            digits, suffix = tail[1:-5], tail[-5:]
+        else:
+            digits, suffix = tail[1:], ""
+        if not digits.isdigit():
+            raise ValueError(value)
+        offset = self._offsets.get(suffix)
+        if offset is None:
+            offset = self._offsets[suffix] = self._parse_suffix(suffix)
+        return base + int(digits[:9] + _PADDING[min(len(digits), 9)]) - offset
+
+    def _parse_suffix(self, suffix: str) -> int:
+        """
+            Décode un suffixe de fuseau horaire (`Z`, `+02:00`, `-0530`, vide).
+
+            :param suffix: str - Le suffixe de l'horodatage ISO.
+            :return: int - Le décalage en nanosecondes par rapport à UTC.
+        """
+        if not suffix or suffix == "Z":
+            return 0
+        digits = suffix[1:].replace(":", "")
+        if suffix[0] not in "+-" or len(digits) != 4 or not digits.isdigit():
+            raise ValueError(f"Fuseau horaire invalide : {suffix}")
+        sign = -1 if suffix[0] == "-" else 1
+        return sign * (int(digits[:2]) * 3600 + int(digits[2:]) * 60) * NS_PER_SECOND
+
+    @staticmethod
+    def _parse_slow(value: str) -> int:
+        """Chemin générique : epoch sous forme de texte ou ISO 8601 via `datetime.fromisoformat`"""
+        try:
+            return _epoch_to_ns(float(value) if "." in value else int(value))
+        except ValueError:
+            pass
+        timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp()) * NS_PER_SECOND + timestamp.microsecond * 1000
+
+
+def to_epoch_ns(value) -> int:
+    """
+        Convertit une borne de recherche en nanosecondes depuis l'epoch.
+
+        :param value: datetime | str | int | float - Une date (sans fuseau : UTC), un horodatage ISO 8601 ou epoch.
+        :return: int - L'horodatage en nanosecondes.
+        :raises ValueError: Si la valeur n'est pas un horodatage reconnu.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp()) * NS_PER_SECOND + value.microsecond * 1000
+    return TimestampParser().parse_ns(value)
+
+
+def ns_to_datetime(value: int) -> datetime:
+    """
+        Convertit des nanosecondes depuis l'epoch en `datetime` UTC.
+
+        :param value: int - L'horodatage en nanosecondes.
+        :return: datetime - La date correspondante, avec le fuseau UTC.
+    """
+    seconds, remainder = divmod(value, NS_PER_SECOND)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=remainder // 1000)
@@ -0,0 +1,209 @@
+import http.client
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from app.models import codec
+from .alert_store import append_records, scan_records, sync_records
+
+
+class FileBackend:
+    """
+        Destination des alertes : le fichier JSON Lines (voir `alert_store`).
+
+        Chaque destination expose aussi `sync` (écriture sur disque), `mark` (position
+        courante) et `records_since` (alertes écrites après une position) : un instantané
+        du pipeline note la position de chaque destination pour ne pas réécrire, après une
+        reprise, les alertes déjà enregistrées.
+
+        Attributs :
+        - name : str - Le nom de la destination (métriques, messages).
+        - path : str - Le chemin du fichier d'alertes.
+    """
+    name = "file"
+
+    def __init__(self, path: str = "alerts.json"):
+        self.path = path
+
+    def write(self, records: list[dict]):
+        """Ajoute un lot d'alertes en fin de fichier"""
+        append_records(records, self.path)
+
+    def sync(self):
+        sync_records(self.path)
+
+    def mark(self) -> int:
+        """Taille actuelle du fichier d'alertes"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def records_since(self, mark: int) -> list[dict]:
+        """Alertes écrites après la position `mark`"""
+        if not os.path.exists(self.path):
+            return []
+        return [record for record, _ in scan_records(self.path, mark)]
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """
+        Destination des alertes : une base SQLite.
+
+        Chaque lot est inséré en une transaction par `executemany` ; la requête préparée est
+        réutilisée d'un lot à l'autre (cache d'instructions de `sqlite3`). L'enregistrement
+        complet est conservé en JSON, à côté de colonnes indexables.
+
+        Attributs :
+        - name : str - Le nom de la destination.
+        - path : str - Le chemin de la base.
+    """
+    name = "sqlite"
+    INSERT = "INSERT INTO alerts (triggered_at, rule, key, event_count, record) VALUES (?, ?, ?, ?, ?)"
+
+    def __init__(self, path: str = "alerts.db"):
+        """
+            Ouvre (et crée au besoin) la base.
+
+            :param path: str - Le chemin de la base.
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Les écritures sont sérialisées par le vidage du puits, depuis des threads différents
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS alerts (id INTEGER PRIMARY KEY, triggered_at TEXT NOT NULL, "
+                "rule TEXT, key TEXT, event_count INTEGER NOT NULL, record TEXT NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS alerts_triggered_at ON alerts (triggered_at)")
+
+    def write(self, records: list[dict]):
+        """Insère un lot d'alertes en une transaction"""
+        rows = [
+            (r["triggered_at"], r.get("rule"), None if r.get("key") is None else str(r["key"]),
+             len(r.get("events", r.get("event_refs", ()))), codec.dumps(r))
+            for r in records
+        ]
+        with self._connection:
+            self._connection.executemany(self.INSERT, rows)
+
+    def sync(self):
+        pass  # Chaque lot est validé (commit) dans sa propre transaction
+
+    def mark(self) -> int:
+        """Identifiant de la dernière alerte insérée"""
+        return self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM alerts").fetchone()[0]
+
+    def records_since(self, mark: int) -> list[dict]:
+        """Alertes insérées après l'identifiant `mark`"""
+        rows = self._connection.execute("SELECT record FROM alerts WHERE id > ? ORDER BY id", (mark,))
+        return [codec.loads(record) for record, in rows]
+
+    def close(self):
+        self._connection.close()
+
+
+class WebhookError(OSError):
+    """Réponse HTTP en erreur d'un webhook"""
+
+
+class WebhookBackend:
+    """
+        Destination des alertes : un webhook HTTP (POST d'un lot `{"alerts": [...]}` en JSON).
+
+        Les connexions HTTP sont conservées ouvertes (keep-alive) dans un pool et réutilisées
+        d'un lot à l'autre. Une connexion en erreur est fermée et n'est pas remise dans le pool.
+
+        Attributs :
+        - name : str - Le nom de la destination.
+        - url : str - L'URL du webhook.
+        - timeout : float - Délai maximal d'une requête, en secondes.
+        - connections_opened : int - Nombre de connexions ouvertes depuis la création.
+    """
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0, pool_size: int = 2, headers: dict | None = None):
+        """
+            Prépare le pool de connexions (ouvertes à la demande).
+
+            :param url: str - L'URL du webhook (http ou https).
+            :param timeout: float - Délai maximal d'une requête, en secondes.
+            :param pool_size: int - Nombre maximal de connexions conservées ouvertes.
+            :param headers: dict | None - En-têtes HTTP supplémentaires (authentification...).
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"URL de webhook invalide : {url}")
+        self.url = url
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._headers = {"Content-Type": "application/json", **(headers or {})}
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        """Connexion libre du pool, ou nouvelle connexion"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.connections_opened += 1
+            return self._connection_class(self._netloc, timeout=self.timeout)
+
+    def _release(self, connection: http.client.HTTPConnection):
+        """Remet une connexion dans le pool (ou la ferme si le pool est plein)"""
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def write(self, records: list[dict]):
+        """
+            Envoie un lot d'alertes.
+
+            :param records: list[dict] - Les alertes sérialisées.
+            :raises WebhookError: Si le webhook répond par un code d'erreur.
+            :raises OSError: En cas d'erreur réseau.
+        """
+        body = codec.dumps({"alerts": records}).encode()
+        connection = self._acquire()
+        try:
+            connection.request("POST", self._target, body, self._headers)
+            response = connection.getresponse()
+            response.read()  # Lire la réponse en entier pour pouvoir réutiliser la connexion
+        except Exception:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        if response.status >= 300:
+            raise WebhookError(f"Webhook {self.url} : HTTP {response.status} {response.reason}")
+
+    def sync(self):
+        pass
+
+    def mark(self):
+        return None
+
+    def records_since(self, mark) -> list[dict]:
+        return []  # Les alertes envoyées ne peuvent pas être relues : livraison au moins une fois
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,161 @@
+import os
+from itertools import islice
+
+from app.models.timestamps import to_epoch_ns
+from .alert_store import is_legacy_file, iter_records, scan_records
+from .event_store import EventIndex, index_path_for, read_events_at
+
+
+def record_ns(record: dict) -> int | None:
+    """Instant de déclenchement d'une alerte sérialisée, en nanosecondes (None s'il est absent ou illisible)"""
+    try:
+        return to_epoch_ns(record["triggered_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def record_levels(record: dict) -> list[str]:
+    """
+        Niveaux des événements d'une alerte sérialisée.
+
+        Les alertes récentes portent leurs niveaux (`levels`) ; pour les plus anciennes, ils
+        sont lus dans les événements recopiés, ou relus dans le fichier log (`event_refs`).
+
+        :param record: dict - L'alerte sérialisée.
+        :return: list[str] - Les niveaux (en majuscules) des événements de l'alerte.
+    """
+    if "levels" in record:
+        return record["levels"]
+    if "event_refs" not in record:
+        return sorted({str(e.get("level", "")).upper() for e in record.get("events", [])})
+    try:
+        return sorted({e.level for e in read_events_at(record["source"], record["event_refs"])})
+    except OSError:
+        return []
+
+
+def _matches(record: dict, epoch_ns: int | None, since_ns: int | None, until_ns: int | None, wanted) -> bool:
+    """Indique si une alerte sérialisée appartient à l'intervalle et porte l'un des niveaux demandés"""
+    if epoch_ns is None:
+        return False
+    if (since_ns is not None and epoch_ns < since_ns) or (until_ns is not None and epoch_ns > until_ns):
+        return False
+    return wanted is None or not wanted.isdisjoint(record_levels(record))
+
+
+class AlertIndex(EventIndex):
+    """
+        Index creux du fichier d'alertes, par date de déclenchement et par niveau.
+
+        Le fichier est découpé en blocs de `block_lines` alertes ; pour chaque bloc, l'index
+        conserve sa position en octets, les dates de déclenchement minimale et maximale (en
+        nanosecondes), le nombre d'alertes et les niveaux de leurs événements. La recherche
+        par intervalle est celle de `EventIndex` ; les blocs ne contenant aucun des niveaux
+        demandés sont ensuite écartés sans être lus, et une pagination sans filtre de niveau
+        saute les blocs entièrement compris dans l'intervalle grâce à leur nombre d'alertes.
+
+        Attributs :
+        - blocks : list[list] - Les blocs : [position, date min, date max, nombre d'alertes, niveaux].
+    """
+    def update(self) -> bool:
+        """
+            Indexe les alertes ajoutées au fichier depuis la dernière mise à jour.
+
+            Le dernier bloc, s'il est incomplet, est relu. Un fichier remplacé (compaction) ou
+            tronqué est entièrement réindexé. Seuls les enregistrements complets sont indexés.
+
+            :return: bool - True si l'index a été modifié.
+            :raises FileNotFoundError: Si le fichier d'alertes n'existe pas.
+        """
+        stat = os.stat(self.file_path)
+        if stat.st_ino != self.inode or stat.st_size < self.size:
+            self.inode, self.size, self.blocks = stat.st_ino, 0, []
+        elif stat.st_size == self.size:
+            return False
+        if self.blocks and self.blocks[-1][3] < self.block_lines:
+            self.size = self.blocks.pop()[0]  # Bloc incomplet : il est relu en entier
+        blocks, block_lines = self.blocks, self.block_lines
+
+        position = self.size
+        for record, end in scan_records(self.file_path, self.size):
+            epoch_ns = record_ns(record)
+            if epoch_ns is not None:
+                if not blocks or blocks[-1][3] >= block_lines:
+                    blocks.append([position, epoch_ns, epoch_ns, 0, []])
+                block = blocks[-1]
+                block[3] += 1
+                if epoch_ns < block[1]:
+                    block[1] = epoch_ns
+                elif epoch_ns > block[2]:
+                    block[2] = epoch_ns
+                for level in record_levels(record):
+                    if level not in block[4]:
+                        block[4].append(level)
+            position = end
+        self.size = position
+        self._prefix_max = self._suffix_min = None
+        return True
+
+    def query(self, since_ns: int | None = None, until_ns: int | None = None, levels=None, skip: int = 0):
+        """
+            Parcourt les alertes sérialisées de l'intervalle [since, until], dans l'ordre du fichier.
+
+            :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+            :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+            :param levels: Iterable[str] | None - Niveaux retenus : une alerte est retenue si l'un de ses événements porte l'un d'eux (tous si None).
+            :param skip: int - Nombre d'alertes correspondantes à sauter (pagination).
+            :return: Iterator[dict] - Les alertes sérialisées correspondantes.
+        """
+        wanted = {level.upper() for level in levels} if levels else None
+        first, last = self.block_range(since_ns, until_ns)
+        for i in range(first, last):
+            start, low, high, count, block_levels = self.blocks[i]
+            if wanted is not None and wanted.isdisjoint(block_levels):
+                continue  # Aucune alerte du bloc ne porte l'un des niveaux demandés
+            if skip >= count and wanted is None and (since_ns is None or low >= since_ns) \
+                    and (until_ns is None or high <= until_ns):
+                skip -= count  # Bloc entièrement retenu : sauté sans être lu
+                continue
+            end = self.blocks[i + 1][0] if i + 1 < len(self.blocks) else self.size
+            for record, position in scan_records(self.file_path, start):
+                if not _matches(record, record_ns(record), since_ns, until_ns, wanted):
+                    if position >= end:
+                        break
+                    continue
+                if skip:
+                    skip -= 1
+                else:
+                    yield record
+                if position >= end:
+                    break
+
+
+def query_records(path, since_ns: int | None = None, until_ns: int | None = None, levels=None,
+                  limit: int | None = None, offset: int = 0, block_records: int = 256):
+    """
+        Parcourt en flux une page des alertes sérialisées d'un fichier, filtrées par date et par niveau.
+
+        L'index (`<fichier>.idx`) est mis à jour incrémentalement et sauvegardé à côté du
+        fichier d'alertes : seuls les blocs pouvant contenir des alertes correspondantes sont
+        lus. Un fichier historique (tableau JSON) est filtré sans index.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+        :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+        :param limit: int | None - Nombre maximal d'alertes produites (toutes si None).
+        :param offset: int - Nombre d'alertes correspondantes à sauter.
+        :param block_records: int - Nombre d'alertes par bloc d'index.
+        :return: Iterator[dict] - Les alertes sérialisées correspondantes.
+        :raises FileNotFoundError: Si le fichier d'alertes n'existe pas.
+    """
+    if is_legacy_file(path):
+        wanted = {level.upper() for level in levels} if levels else None
+        records = (r for r in iter_records(path) if _matches(r, record_ns(r), since_ns, until_ns, wanted))
+        yield from islice(records, offset, offset + limit if limit is not None else None)
+        return
+    index_path = index_path_for(str(path))
+    index = AlertIndex.load(str(path), index_path, block_records)
+    if index.update():
+        index.save(index_path)
+    yield from islice(index.query(since_ns, until_ns, levels, offset), limit)
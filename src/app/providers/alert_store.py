@@ -0,0 +1,346 @@
+import atexit
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from threading import Lock
+
+from app.configs.config import get_config
+from app.models import codec
+
+# Verrou protégeant le registre des écrivains ouverts
+_writers_lock = Lock()
+_writers: dict[str, "AlertLogWriter"] = {}
+
+
+def is_legacy_file(path) -> bool:
+    """
+        Indique si le fichier d'alertes est encore au format historique (tableau JSON).
+
+        Le format historique commence par `[` alors que le format JSON Lines commence
+        directement par un objet `{`. Seul le premier caractère non blanc est lu.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :return: bool - True si le fichier contient un tableau JSON.
+    """
+    try:
+        with open(path, "r") as f:
+            while True:
+                char = f.read(1)
+                if not char:
+                    return False
+                if not char.isspace():
+                    return char == "["
+    except FileNotFoundError:
+        return False
+
+
+def scan_records(path, offset: int = 0, complete_only: bool = True):
+    """
+        Parcourt les enregistrements JSON Lines du fichier d'alertes à partir d'une position.
+
+        Un enregistrement occupe normalement une ligne ; un enregistrement indenté
+        (`alert_storage.indent`) commence par une ligne `{` et se termine par une ligne `}`
+        en première colonne. Les lignes ou enregistrements corrompus sont ignorés.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :param offset: int - Position de départ (début d'enregistrement).
+        :param complete_only: bool - S'arrêter à une dernière ligne sans saut de ligne (en cours d'écriture).
+        :return: Iterator[tuple[dict, int]] - Chaque enregistrement et la position qui le suit.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        pending = []
+        for line in f:
+            if complete_only and not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if pending:
+                pending.append(line)
+                if line.rstrip() != b"}":
+                    continue
+                data, pending = b"".join(pending), []
+            else:
+                data = line.strip()
+                if not data:
+                    continue
+                if data == b"{":
+                    pending.append(line)  # Début d'un enregistrement indenté
+                    continue
+            try:
+                yield codec.loads(data), offset
+            except codec.DecodeError:
+                continue
+
+
+def iter_records(path):
+    """
+        Parcourt les enregistrements bruts du fichier d'alertes en flux.
+
+        Le fichier JSON Lines est lu ligne par ligne, sans jamais être chargé en entier.
+        Une ligne corrompue (par exemple un enregistrement tronqué après un arrêt brutal)
+        est ignorée. Un fichier au format historique est relu en une fois.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :return: Iterator[dict] - Les enregistrements d'alertes décodés.
+    """
+    if is_legacy_file(path):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+
+    for record, _ in scan_records(path, complete_only=False):
+        yield record
+
+
+def repair_tail(path, block_size: int = 1 << 16) -> int:
+    """
+        Supprime un enregistrement tronqué en fin de fichier (arrêt brutal pendant une écriture).
+
+        Seule la fin du fichier est lue : s'il ne se termine pas par un saut de ligne, il est
+        tronqué juste après le dernier saut de ligne, afin que le prochain enregistrement ne
+        soit pas ajouté à la suite du fragment (ce qui le rendrait illisible).
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :param block_size: int - Nombre d'octets lus à chaque pas, en remontant depuis la fin.
+        :return: int - Le nombre d'octets supprimés.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        end = size
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+        return size - end
+
+
+def _rewrite(path, records):
+    """
+        Réécrit atomiquement le fichier d'alertes au format JSON Lines.
+
+        Les enregistrements sont écrits dans un fichier temporaire, synchronisé sur disque,
+        puis substitué au fichier d'origine avec `os.replace`.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :param records: Iterable[dict] - Les enregistrements à écrire.
+        :return: int - Le nombre d'enregistrements écrits.
+    """
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(codec.dumps(record) + "\n")
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def migrate_alerts(path) -> int:
+    """
+        Convertit un fichier d'alertes historique (tableau JSON) au format JSON Lines.
+
+        La conversion est atomique : en cas d'échec, le fichier d'origine reste intact.
+        Un fichier déjà au format JSON Lines n'est pas modifié.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :return: int - Le nombre d'alertes migrées (0 si aucune migration n'était nécessaire).
+    """
+    with _writers_lock:
+        if not is_legacy_file(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        return _rewrite(path, records)
+
+
+def compact_alerts(path, keep_last: int | None = None) -> int:
+    """
+        Compacte le fichier d'alertes.
+
+        Les lignes vides ou corrompues sont supprimées et, si `keep_last` est fourni,
+        seules les `keep_last` alertes les plus récentes sont conservées. Les écrivains
+        ouverts sur ce fichier sont fermés pour reprendre sur le nouveau fichier.
+
+        :param path: str - Le chemin du fichier d'alertes.
+        :param keep_last: int | None - Nombre d'alertes à conserver (toutes par défaut).
+        :return: int - Le nombre d'alertes restantes après compaction.
+    """
+    with _writers_lock:
+        writer = _writers.pop(str(path), None)
+        if writer:
+            writer.close()
+        records = iter_records(path)
+        if keep_last is not None:
+            records = deque(records, maxlen=keep_last)
+        return _rewrite(path, records)
+
+
+class AlertLogWriter:
+    """
+        Écrivain append-only pour le fichier d'alertes au format JSON Lines.
+
+        Chaque alerte est ajoutée en fin de fichier, en JSON compact sur une seule ligne
+        (ou indenté si `indent` est fourni) : le coût d'une sauvegarde ne dépend plus du
+        nombre d'alertes déjà stockées. Les données sont
+        transmises au système à chaque écriture, mais `fsync` n'est appelé que tous les
+        `fsync_every` enregistrements ou toutes les `fsync_interval` secondes.
+
+        Attributs :
+        - path : str - Le chemin du fichier d'alertes.
+        - fsync_every : int - Nombre d'enregistrements entre deux `fsync`.
+        - fsync_interval : float - Délai maximal (en secondes) entre deux `fsync`.
+        - indent : int | None - Indentation du JSON écrit (compact sur une ligne si None).
+    """
+    def __init__(self, path, fsync_every: int = 64, fsync_interval: float = 1.0, indent: int | None = None):
+        """
+            Ouvre le fichier d'alertes en ajout, en migrant au préalable un fichier historique.
+
+            :param path: str - Le chemin du fichier d'alertes.
+            :param fsync_every: int - Nombre d'enregistrements entre deux `fsync`.
+            :param fsync_interval: float - Délai maximal (en secondes) entre deux `fsync`.
+            :param indent: int | None - Indentation du JSON écrit (compact sur une ligne si None).
+        """
+        self.path = str(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.indent = indent
+        if is_legacy_file(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                _rewrite(self.path, json.load(f))
+        repair_tail(self.path)  # Un fragment laissé par un arrêt brutal absorberait l'enregistrement suivant
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """
+            Indique si le fichier ouvert n'est plus celui présent sur le disque.
+
+            C'est le cas lorsque le fichier a été supprimé, compacté ou remplacé.
+
+            :return: bool - True si l'écrivain doit être rouvert.
+        """
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    def append(self, record: dict):
+        """
+            Ajoute un enregistrement en fin de fichier.
+
+            :param record: dict - L'enregistrement à écrire.
+        """
+        self.append_many([record])
+
+    def append_many(self, records: list[dict]):
+        """
+            Ajoute un lot d'enregistrements en une seule écriture.
+
+            :param records: list[dict] - Les enregistrements à écrire.
+        """
+        indent = self.indent
+        self._file.write("".join(codec.dumps(record, indent) + "\n" for record in records))
+        self._file.flush()
+        self._pending += len(records)
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force l'écriture sur disque des enregistrements en attente."""
+        if self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Synchronise puis ferme le fichier."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def _writer(path: str) -> AlertLogWriter:
+    """Écrivain partagé d'un fichier, (r)ouvert si besoin (à appeler sous `_writers_lock`)"""
+    writer = _writers.get(path)
+    if writer is None or writer.is_stale():
+        if writer:
+            writer.close()
+        config = get_config()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        writer = AlertLogWriter(
+            path,
+            fsync_every=config.get("alert_storage.fsync_every", 64),
+            fsync_interval=config.get("alert_storage.fsync_interval", 1.0),
+            indent=config.get("alert_storage.indent"),
+        )
+        _writers[path] = writer
+    return writer
+
+
+def append_record(record: dict, path="alerts.json"):
+    """
+        Ajoute un enregistrement au fichier d'alertes via un écrivain partagé.
+
+        Un écrivain est conservé ouvert par fichier ; il est rouvert si le fichier a été
+        supprimé ou remplacé entre deux écritures.
+
+        :param record: dict - L'enregistrement à écrire.
+        :param path: str - Le chemin du fichier d'alertes (par défaut "alerts.json").
+    """
+    with _writers_lock:
+        _writer(str(path)).append(record)
+
+
+def append_records(records: list[dict], path="alerts.json"):
+    """
+        Ajoute un lot d'enregistrements au fichier d'alertes, sous une seule prise du verrou.
+
+        :param records: list[dict] - Les enregistrements à écrire.
+        :param path: str - Le chemin du fichier d'alertes (par défaut "alerts.json").
+    """
+    with _writers_lock:
+        _writer(str(path)).append_many(records)
+
+
+def sync_records(path="alerts.json"):
+    """
+        Force l'écriture sur disque des enregistrements en attente de l'écrivain partagé d'un fichier.
+
+        :param path: str - Le chemin du fichier d'alertes (par défaut "alerts.json").
+    """
+    with _writers_lock:
+        writer = _writers.get(str(path))
+        if writer:
+            writer.sync()
+
+
+@atexit.register
+def close_writers():
+    """Ferme tous les écrivains ouverts (appelé automatiquement à la sortie)."""
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
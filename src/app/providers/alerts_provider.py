@@ -1,72 +1,112 @@
 import json
 from datetime import datetime
-from pathlib import Path
-from threading import Lock
 
+from app.configs.config import get_config
 from app.models.alerts_model import Alert
+from app.models.timestamps import to_epoch_ns
+from .alert_index import query_records
+from .alert_store import append_record, iter_records
+from .event_store import read_events_at
 from .events_provider import Event
 
-# Création d'un verrou global
-lock = Lock()
 
+def iter_alerts(path="alerts.json"):
+    """
+        Parcourt les alertes d'un fichier en flux.
 
-def load_alerts(path="alerts.json") -> list[Alert]:
+        Les alertes sont lues une à une depuis le fichier JSON Lines, sans charger le
+        fichier complet en mémoire. Un fichier historique (tableau JSON) reste lisible.
+        Les événements référencés par position (`event_refs`) sont relus dans le fichier log
+        source ; si celui-ci n'existe plus, l'alerte est produite sans ses événements.
+        Si le fichier est introuvable ou illisible, aucun élément n'est produit.
+
+        :param path: str - Le chemin du fichier contenant les alertes (par défaut "alerts.json").
+        :return: Iterator[Alert] - Les alertes lues depuis le fichier.
+    """
+    try:
+        for d in iter_records(path):
+            yield _record_alert(d)
+    except FileNotFoundError:
+        print(f"\033[35m[-] Le fichier {path} est introuvable.\033[35m")
+    except json.JSONDecodeError as e:
+        print(f"\033[35m[-] Erreur de décodage JSON dans {path}: {e}\033[35m")
+
+
+def query_alerts(path="alerts.json", since=None, until=None, levels=None, limit: int | None = None, offset: int = 0):
     """
-        Charge les alertes depuis un fichier JSON.
+        Parcourt en flux une page des alertes d'un fichier, filtrées par date de déclenchement et par niveau.
 
-        Cette fonction lit le fichier spécifié, puis tente de décoder son contenu JSON
-        pour créer une liste d'objets `Alert`. Si le fichier est introuvable, vide ou
-        contient des erreurs de formatage, une liste vide est renvoyée.
+        Le filtrage et la pagination s'appuient sur l'index du fichier d'alertes
+        (`query_records`) et portent sur les enregistrements bruts : seules les alertes de
+        la page demandée sont construites, avec leurs événements.
+        Si le fichier est introuvable ou illisible, aucun élément n'est produit.
 
         :param path: str - Le chemin du fichier contenant les alertes (par défaut "alerts.json").
-        :return: List[Alert] - Une liste d'objets `Alert` chargés depuis le fichier.
+        :param since: datetime | str | int | None - Début de l'intervalle (inclus).
+        :param until: datetime | str | int | None - Fin de l'intervalle (inclus).
+        :param levels: Iterable[str] | None - Niveaux retenus : une alerte est retenue si l'un de ses événements porte l'un d'eux.
+        :param limit: int | None - Nombre maximal d'alertes produites (toutes si None).
+        :param offset: int - Nombre d'alertes correspondantes à sauter.
+        :return: Iterator[Alert] - Les alertes correspondantes, dans l'ordre du fichier.
     """
+    since_ns = to_epoch_ns(since) if since is not None else None
+    until_ns = to_epoch_ns(until) if until is not None else None
     try:
-        with open(path, "r") as f:
-            data = f.read().strip()  # Lire et retirer les espaces blancs
-            if not data:  # Vérifie si le fichier est vide
-                print(f"\033[35m[-] Le fichier {path} est vide.\033[35m")
-                return []  # Retourner une liste vide si le fichier est vide
-
-            alerts_data = json.loads(data)
-            return [Alert(triggered_at=datetime.fromisoformat(d["triggered_at"]),
-                          events=[Event(e) for e in d["events"]]) for d in alerts_data]
+        for d in query_records(path, since_ns, until_ns, levels, limit, offset,
+                               get_config().get("alert_storage.index_block_records", 256)):
+            yield _record_alert(d)
     except FileNotFoundError:
         print(f"\033[35m[-] Le fichier {path} est introuvable.\033[35m")
-        return []  # Retourner une liste vide si le fichier n'existe pas
     except json.JSONDecodeError as e:
         print(f"\033[35m[-] Erreur de décodage JSON dans {path}: {e}\033[35m")
-        return []  # Retourner une liste vide en cas d'erreur de parsing
+
+
+def _record_alert(record: dict) -> Alert:
+    """Alerte construite à partir d'un enregistrement du fichier d'alertes"""
+    first = record.get("first_triggered_at")
+    return Alert(triggered_at=datetime.fromisoformat(record["triggered_at"]), events=_record_events(record),
+                 rule=record.get("rule"), key=record.get("key"), source=record.get("source"),
+                 count=record.get("count", 1), first_triggered_at=datetime.fromisoformat(first) if first else None,
+                 fingerprint=record.get("fingerprint"))
+
+
+def _record_events(record: dict) -> list[Event]:
+    """Événements d'une alerte sérialisée : recopiés (`events`) ou référencés (`event_refs`)"""
+    if "event_refs" not in record:
+        return [Event(e) for e in record["events"]]
+    try:
+        return read_events_at(record["source"], record["event_refs"])
+    except OSError as e:
+        print(f"\033[35m[-] Événements de l'alerte illisibles ({record['source']}) : {e}\033[35m")
+        return []
+
+
+def load_alerts(path="alerts.json") -> list[Alert]:
+    """
+        Charge les alertes depuis un fichier JSON Lines.
+
+        Cette fonction matérialise en liste le flux produit par `iter_alerts`. Si le fichier
+        est introuvable, vide ou contient des erreurs de formatage, une liste vide est renvoyée.
+
+        :param path: str - Le chemin du fichier contenant les alertes (par défaut "alerts.json").
+        :return: List[Alert] - Une liste d'objets `Alert` chargés depuis le fichier.
+    """
+    return list(iter_alerts(path))
 
 
 def save_alerts(alert, path="alerts.json"):
     """
-        Sauvegarde une alerte dans un fichier JSON.
+        Sauvegarde une alerte dans le fichier d'alertes.
 
-        Cette fonction prend une alerte et l'ajoute au fichier spécifié. Si le fichier
-        existe déjà, les alertes existantes seront chargées et la nouvelle alerte y sera
-        ajoutée. Si le fichier n'existe pas, un nouveau fichier sera créé.
+        Cette fonction ajoute l'alerte en fin de fichier, sur une seule ligne JSON, sans
+        relire les alertes existantes. Un fichier historique (tableau JSON) est migré
+        automatiquement au format JSON Lines lors de la première écriture.
 
         :param alert: Alert - L'alerte à sauvegarder.
         :param path: str - Le chemin du fichier où les alertes seront sauvegardées (par défaut "alerts.json").
     """
     try:
-        # Acquérir le verrou avant de manipuler le fichier
-        with lock:
-            # Vérifier si le fichier existe déjà
-            if Path(path).exists():
-                with open(path, "r") as f:
-                    alerts = json.load(f)
-            else:
-                alerts = []
-
-            # Ajouter la nouvelle alerte à la liste
-            alerts.append(alert.to_dict())
-
-            # Sauvegarder les alertes dans le fichier
-            with open(path, "w") as f:
-                json.dump(alerts, f, indent=2)
-
-            print(f"\033[32m[+] Alerte sauvegardée à {path}\033[0m")
+        append_record(alert.to_dict(), path)
+        print(f"\033[32m[+] Alerte sauvegardée à {path}\033[0m")
     except Exception as e:
         print(f"\033[35mErreur lors de la sauvegarde de l'alerte: {e}\033[35m")
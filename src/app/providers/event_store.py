@@ -0,0 +1,234 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from app.models.event_model import Event
+from .log_scanner import scan_events, scan_levels
+
+INDEX_VERSION = 1
+
+
+def index_path_for(file_path: str) -> str:
+    """Chemin du fichier d'index associé à un fichier log"""
+    return f"{file_path}.idx"
+
+
+class EventIndex:
+    """
+        Index temporel creux d'un fichier log.
+
+        Le fichier est découpé en blocs de `block_lines` événements ; pour chaque bloc, l'index
+        conserve sa position en octets et les horodatages minimal et maximal de ses
+        événements. Le log n'étant pas forcément trié, la recherche s'appuie sur le maximum
+        cumulé des blocs (croissant) et le minimum des blocs suivants (croissant lui aussi) :
+        deux recherches dichotomiques délimitent les seuls blocs pouvant contenir des
+        événements de l'intervalle demandé.
+
+        Attributs :
+        - file_path : str - Le chemin du fichier log indexé.
+        - block_lines : int - Nombre d'événements par bloc.
+        - inode : int | None - L'inode du fichier au moment de l'indexation.
+        - size : int - Nombre d'octets indexés (fin de la dernière ligne complète).
+        - blocks : list[list[int]] - Les blocs : [position, horodatage min, horodatage max, nombre d'événements].
+    """
+    def __init__(self, file_path: str, block_lines: int = 256):
+        """
+            Initialise un index vide.
+
+            :param file_path: str - Le chemin du fichier log.
+            :param block_lines: int - Nombre d'événements par bloc.
+        """
+        self.file_path = file_path
+        self.block_lines = block_lines
+        self.inode = None
+        self.size = 0
+        self.blocks: list[list[int]] = []
+        self._prefix_max: list[int] | None = None
+        self._suffix_min: list[int] | None = None
+
+    def update(self) -> bool:
+        """
+            Indexe les lignes ajoutées au fichier depuis la dernière mise à jour.
+
+            Le dernier bloc, s'il est incomplet, est relu. Un fichier remplacé (rotation) ou
+            tronqué est entièrement réindexé. Les lignes sont parcourues par `scan_levels` :
+            seuls le niveau et l'horodatage sont extraits, sans décodage JSON complet.
+
+            :return: bool - True si l'index a été modifié.
+            :raises FileNotFoundError: Si le fichier log n'existe pas.
+        """
+        stat = os.stat(self.file_path)
+        if stat.st_ino != self.inode or stat.st_size < self.size:
+            self.inode, self.size, self.blocks = stat.st_ino, 0, []
+        elif stat.st_size == self.size:
+            return False
+        if self.blocks and self.blocks[-1][3] < self.block_lines:
+            self.size = self.blocks.pop()[0]  # Bloc incomplet : il est relu en entier
+        blocks, block_lines = self.blocks, self.block_lines
+
+        def handle(level: str, epoch_ns: int, offset: int):
+            if not blocks or blocks[-1][3] >= block_lines:
+                blocks.append([offset, epoch_ns, epoch_ns, 0])
+            block = blocks[-1]
+            block[3] += 1
+            if epoch_ns < block[1]:
+                block[1] = epoch_ns
+            elif epoch_ns > block[2]:
+                block[2] = epoch_ns
+
+        self.size = scan_levels(self.file_path, handle, self.size)
+        self._prefix_max = self._suffix_min = None
+        return True
+
+    def _bounds(self):
+        """Calcule (une fois) le maximum cumulé et le minimum des blocs suivants"""
+        if self._prefix_max is None:
+            lows = [b[1] if b[1] is not None else float("inf") for b in self.blocks]
+            highs = [b[2] if b[2] is not None else float("-inf") for b in self.blocks]
+            self._prefix_max = list(accumulate(highs, max))
+            self._suffix_min = list(accumulate(reversed(lows), min))[::-1]
+        return self._prefix_max, self._suffix_min
+
+    def block_range(self, since_ns: int | None = None, until_ns: int | None = None) -> tuple[int, int]:
+        """
+            Délimite les blocs pouvant contenir des événements de l'intervalle [since, until].
+
+            :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+            :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+            :return: tuple[int, int] - Les index du premier bloc et du bloc suivant le dernier.
+        """
+        prefix_max, suffix_min = self._bounds()
+        first = bisect_left(prefix_max, since_ns) if since_ns is not None else 0
+        last = bisect_right(suffix_min, until_ns) if until_ns is not None else len(self.blocks)
+        return first, max(first, last)
+
+    def byte_range(self, since_ns: int | None = None, until_ns: int | None = None) -> tuple[int, int]:
+        """
+            Plage d'octets à lire pour l'intervalle [since, until].
+
+            :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+            :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+            :return: tuple[int, int] - Positions de début et de fin (exclue) dans le fichier.
+        """
+        first, last = self.block_range(since_ns, until_ns)
+        if first >= last:
+            return self.size, self.size
+        end = self.blocks[last][0] if last < len(self.blocks) else self.size
+        return self.blocks[first][0], end
+
+    def to_dict(self) -> dict:
+        """
+            Convertit l'index en dictionnaire sérialisable en JSON.
+
+            :return: dict - Représentation de l'index.
+        """
+        return {
+            "version": INDEX_VERSION,
+            "file": os.path.abspath(self.file_path),
+            "inode": self.inode,
+            "size": self.size,
+            "block_lines": self.block_lines,
+            "blocks": self.blocks,
+        }
+
+    def save(self, path: str):
+        """
+            Sauvegarde atomiquement l'index.
+
+            :param path: str - Le chemin du fichier d'index.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, file_path: str, path: str, block_lines: int = 256) -> "EventIndex":
+        """
+            Charge l'index d'un fichier log.
+
+            Un index absent, illisible, d'une autre version, d'un autre fichier ou construit
+            avec une autre taille de bloc donne un index vide (réindexation complète).
+
+            :param file_path: str - Le chemin du fichier log.
+            :param path: str - Le chemin du fichier d'index.
+            :param block_lines: int - Taille de bloc attendue.
+            :return: EventIndex - L'index chargé.
+        """
+        index = cls(file_path, block_lines)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return index
+        if data.get("version") != INDEX_VERSION or data.get("block_lines") != block_lines \
+                or data.get("file") != os.path.abspath(file_path):
+            return index
+        index.inode, index.size, index.blocks = data["inode"], data["size"], data["blocks"]
+        return index
+
+
+class EventStore:
+    """
+        Accès indexé aux événements d'un fichier log.
+
+        L'index est mis à jour (incrémentalement) et sauvegardé à côté du log à l'ouverture
+        du magasin. Les requêtes par intervalle ne lisent que les blocs délimités par
+        l'index, et chaque événement retourné porte sa position (`Event.offset`), ce qui
+        permet de le relire plus tard sans parcourir le fichier.
+
+        Attributs :
+        - file_path : str - Le chemin du fichier log.
+        - index : EventIndex - L'index temporel du fichier.
+    """
+    def __init__(self, file_path: str, block_lines: int = 256, index_path: str | None = None):
+        """
+            Ouvre le magasin et met son index à jour.
+
+            :param file_path: str - Le chemin du fichier log.
+            :param block_lines: int - Nombre de lignes par bloc d'index.
+            :param index_path: str | None - Le chemin du fichier d'index (par défaut `<fichier>.idx`).
+        """
+        self.file_path = file_path
+        index_path = index_path or index_path_for(file_path)
+        self.index = EventIndex.load(file_path, index_path, block_lines)
+        if self.index.update():
+            self.index.save(index_path)
+
+    def query(self, since_ns: int | None = None, until_ns: int | None = None, levels=None):
+        """
+            Parcourt les événements de l'intervalle [since, until], dans l'ordre du fichier.
+
+            :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+            :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+            :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+            :return: Iterator[Event] - Les événements correspondants.
+        """
+        start, end = self.index.byte_range(since_ns, until_ns)
+        for event in scan_events(self.file_path, levels, start, end):
+            if since_ns is not None and event.epoch_ns < since_ns:
+                continue
+            if until_ns is not None and event.epoch_ns > until_ns:
+                continue
+            yield event
+
+
+def read_events_at(file_path: str, offsets: list[int]) -> list[Event]:
+    """
+        Relit des événements à partir de leurs positions dans le fichier log.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param offsets: list[int] - Les positions (début de ligne) des événements.
+        :return: list[Event] - Les événements relus (les lignes illisibles sont ignorées).
+        :raises FileNotFoundError: Si le fichier log n'existe plus.
+    """
+    events = []
+    with open(file_path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            try:
+                events.append(Event.from_line(f.readline(), offset=offset))
+            except Exception:
+                continue
+    return events
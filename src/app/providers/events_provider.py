@@ -1,25 +1,210 @@
-import json
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+from app.configs.config import get_config
 from app.models.event_model import Event
+from app.models.timestamps import to_epoch_ns
+from .event_store import EventStore
+from .log_scanner import scan_events
+from .log_sources import DEFAULT_PATTERNS, is_compressed, iter_events, resolve_sources
 
 
-def load_events(file_path="events.log") -> list[Event]:
+def load_events(file_path="events.log", workers: int | None = None, since=None, until=None,
+                levels=None) -> list[Event]:
     """
-        Charge les événements depuis un fichier log.
+        Charge les événements depuis un fichier log, un répertoire de logs ou un motif glob.
 
-        Cette fonction lit un fichier log ligne par ligne et tente de décoder chaque ligne
-        en format JSON. Chaque ligne qui est correctement décodée est ensuite utilisée pour
-        créer un objet `Event`, qui est ajouté à une liste d'événements.
+        Cette fonction parcourt le fichier log projeté en mémoire (`scan_events`) et tente de
+        décoder chaque ligne en format JSON. Chaque ligne qui est correctement décodée est
+        ensuite utilisée pour créer un objet `Event`, qui est ajouté à une liste d'événements.
+        Les lignes d'un niveau non demandé (`levels`) sont écartées avant tout décodage.
 
-        :param file_path: str - Le chemin du fichier log à lire (par défaut "events.log").
+        Si plus d'un processus est demandé (paramètre `workers` ou `event_loader.workers`
+        dans la configuration), le chargement est délégué à `load_events_parallel`.
+
+        Si un intervalle (`since`, `until`) est fourni, la lecture passe par l'index temporel
+        du fichier (`EventStore`) : seuls les blocs pouvant contenir des événements de
+        l'intervalle sont lus, et les événements portent leur position (`Event.offset`).
+
+        Quel que soit le chemin emprunté (séquentiel, parallèle, filtré ou fusionné), les
+        événements sont retournés par ordre chronologique ; à horodatage égal, l'ordre du
+        fichier est conservé : le résultat ne dépend pas du nombre de processus.
+
+        Un répertoire, un motif glob ou un fichier compressé par gzip est délégué à
+        `load_events_merged` : les fichiers sont fusionnés par ordre chronologique.
+
+        :param file_path: str - Le chemin du fichier log, du répertoire ou le motif glob (par défaut "events.log").
+        :param workers: int | None - Nombre de processus de décodage (par défaut celui de la configuration).
+        :param since: datetime | str | int | None - Début de l'intervalle (inclus).
+        :param until: datetime | str | int | None - Fin de l'intervalle (incluse).
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
         :return: List[Event] - Liste des objets `Event` créés à partir des données du fichier log.
     """
-    events = []
-    with open(file_path, "r") as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                events.append(Event(data))
-            except:
-                continue
+    sources = resolve_sources(file_path, get_config().get("ingest.patterns", DEFAULT_PATTERNS))
+    if len(sources) != 1 or sources[0] != file_path or is_compressed(file_path):
+        return load_events_merged(sources, workers, since, until, levels)
+    if since is not None or until is not None:
+        store = EventStore(file_path, get_config().get("event_store.block_lines", 256))
+        return _chronological(store.query(to_epoch_ns(since) if since is not None else None,
+                                          to_epoch_ns(until) if until is not None else None, levels))
+    if workers is None:
+        workers = get_config().get("event_loader.workers", 1)
+    if workers > 1 and not levels:
+        return load_events_parallel(file_path, workers)
+    return _chronological(scan_events(file_path, levels))
+
+
+def _sort_key(event: Event) -> int:
+    """
+        Clé de tri chronologique d'un événement.
+
+        :param event: Event - L'événement à trier.
+        :return: int - L'horodatage en nanosecondes depuis l'epoch.
+    """
+    return event.epoch_ns
+
+
+def _chronological(events) -> list[Event]:
+    """Trie des événements par horodatage ; le tri est stable : à horodatage égal, l'ordre d'origine est conservé"""
+    events = list(events)
+    events.sort(key=_sort_key)  # Linéaire sur un log déjà (presque) chronologique
     return events
+
+
+def split_ranges(file_path, parts: int, min_size: int = 1 << 20) -> list[tuple[int, int]]:
+    """
+        Découpe un fichier en plages d'octets alignées sur les fins de ligne.
+
+        Chaque plage commence au début d'une ligne et se termine juste après un saut de
+        ligne (ou à la fin du fichier), de sorte qu'aucune ligne n'est coupée en deux.
+
+        :param file_path: str - Le chemin du fichier à découper.
+        :param parts: int - Nombre de plages souhaitées.
+        :param min_size: int - Taille minimale d'une plage en octets.
+        :return: list[tuple[int, int]] - Les plages (début, fin) couvrant tout le fichier.
+    """
+    size = os.path.getsize(file_path)
+    parts = max(1, min(parts, size // max(min_size, 1)))
+    step = size // parts
+    bounds = [0]
+    with open(file_path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(i * step, bounds[-1]))
+            f.readline()  # Avancer jusqu'à la fin de la ligne courante
+            position = f.tell()
+            if position >= size:
+                break
+            bounds.append(position)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def parse_range(file_path, start: int, end: int) -> list[Event]:
+    """
+        Décode les événements d'une plage d'octets et les trie chronologiquement.
+
+        Fonction exécutée dans un processus de travail. Le tri est stable : deux événements
+        de même horodatage conservent leur ordre d'apparition dans le fichier.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param start: int - Position de début de la plage (début de ligne).
+        :param end: int - Position de fin de la plage (exclue).
+        :return: list[Event] - Les événements de la plage, triés par horodatage.
+    """
+    events = list(scan_events(file_path, start=start, end=end))
+    events.sort(key=_sort_key)
+    return events
+
+
+def load_events_parallel(file_path="events.log", workers: int | None = None,
+                         min_chunk_bytes: int | None = None) -> list[Event]:
+    """
+        Charge les événements d'un fichier log en parallèle sur plusieurs processus.
+
+        Le fichier est découpé en plages d'octets alignées sur les lignes, décodées dans un
+        `ProcessPoolExecutor`, puis les résultats sont fusionnés par ordre chronologique.
+        À horodatage égal, l'ordre du fichier est conservé : le résultat est identique
+        quel que soit le nombre de processus.
+
+        :param file_path: str - Le chemin du fichier log à lire (par défaut "events.log").
+        :param workers: int | None - Nombre de processus (par défaut `event_loader.workers`).
+        :param min_chunk_bytes: int | None - Taille minimale d'une plage (par défaut `event_loader.min_chunk_bytes`).
+        :return: List[Event] - Les événements triés par horodatage.
+    """
+    config = get_config()
+    if workers is None:
+        workers = config.get("event_loader.workers", 1)
+    if min_chunk_bytes is None:
+        min_chunk_bytes = config.get("event_loader.min_chunk_bytes", 1 << 20)
+    ranges = split_ranges(file_path, max(workers, 1), min_chunk_bytes)
+    if len(ranges) <= 1:
+        return [event for start, end in ranges for event in parse_range(file_path, start, end)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(parse_range, [file_path] * len(ranges), *zip(*ranges)))
+    # heapq.merge est stable : à clé égale, la plage la plus en amont passe en premier
+    return list(heapq.merge(*chunks, key=_sort_key))
+
+
+def load_file_events(file_path: str, since_ns: int | None = None, until_ns: int | None = None,
+                     levels=None) -> list[Event]:
+    """
+        Charge les événements d'un fichier d'un ensemble de logs (fonction exécutée dans un processus de travail).
+
+        L'intervalle passe par l'index temporel pour un fichier non compressé ; les
+        événements d'un fichier compressé sont filtrés au fil de la décompression.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param since_ns: int | None - Début de l'intervalle, en nanosecondes (inclus).
+        :param until_ns: int | None - Fin de l'intervalle, en nanosecondes (incluse).
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+        :return: list[Event] - Les événements du fichier, dans l'ordre du fichier.
+    """
+    return list(_file_events(file_path, since_ns, until_ns, levels))
+
+
+def _file_events(file_path: str, since_ns: int | None, until_ns: int | None, levels):
+    """Parcourt paresseusement les événements d'un fichier, restreints à l'intervalle"""
+    if since_ns is None and until_ns is None:
+        return iter_events(file_path, levels)
+    if not is_compressed(file_path):
+        return EventStore(file_path, get_config().get("event_store.block_lines", 256)).query(since_ns, until_ns, levels)
+    return (
+        event for event in iter_events(file_path, levels)
+        if (since_ns is None or event.epoch_ns >= since_ns) and (until_ns is None or event.epoch_ns <= until_ns)
+    )
+
+
+def load_events_merged(sources: list[str], workers: int | None = None, since=None, until=None,
+                       levels=None) -> list[Event]:
+    """
+        Charge les événements de plusieurs fichiers log et les fusionne par ordre chronologique.
+
+        Chaque fichier (compressé par gzip ou non) est supposé chronologique, comme le sont
+        des logs en rotation ou par machine : les flux sont fusionnés par `heapq.merge`
+        sur l'horodatage. En séquentiel, les fichiers sont parcourus paresseusement (un
+        bloc de lecture par fichier) ; avec plusieurs processus, chaque fichier est chargé
+        par un processus de travail. À horodatage égal, l'ordre des fichiers (par nom) est
+        conservé.
+
+        :param sources: list[str] - Les fichiers log (voir `resolve_sources`).
+        :param workers: int | None - Nombre de processus (par défaut `event_loader.workers`).
+        :param since: datetime | str | int | None - Début de l'intervalle (inclus).
+        :param until: datetime | str | int | None - Fin de l'intervalle (incluse).
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+        :return: list[Event] - Les événements de tous les fichiers, triés par horodatage.
+    """
+    if workers is None:
+        workers = get_config().get("event_loader.workers", 1)
+    since_ns = to_epoch_ns(since) if since is not None else None
+    until_ns = to_epoch_ns(until) if until is not None else None
+    if workers > 1 and len(sources) > 1:
+        count = len(sources)
+        with ProcessPoolExecutor(max_workers=min(workers, count)) as executor:
+            streams = list(executor.map(load_file_events, sources, [since_ns] * count, [until_ns] * count,
+                                        [levels] * count))
+    else:
+        streams = [_file_events(path, since_ns, until_ns, levels) for path in sources]
+    # Un fichier désordonné n'est pas trié par la fusion : le tri final (linéaire sur un flux déjà trié) le garantit
+    return _chronological(heapq.merge(*streams, key=_sort_key))
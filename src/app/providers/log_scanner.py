@@ -0,0 +1,213 @@
+import mmap
+import re
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+
+from app.models import codec
+from app.models.event_model import Event
+from app.models.timestamps import TimestampParser
+
+
+@contextmanager
+def open_map(file_path: str):
+    """
+        Projette un fichier en mémoire, en lecture seule.
+
+        :param file_path: str - Le chemin du fichier.
+        :return: ContextManager[mmap.mmap | bytes] - La projection (des octets vides pour un fichier vide).
+    """
+    with open(file_path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""  # Un fichier vide ne peut pas être projeté
+            return
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def line_bounds(buffer, start: int = 0, end: int | None = None, complete_only: bool = False):
+    """
+        Parcourt les limites des lignes d'un tampon, sans copier leur contenu.
+
+        :param buffer: mmap.mmap | bytes - Le tampon à parcourir.
+        :param start: int - Position de départ (début de ligne).
+        :param end: int | None - Position de fin (exclue), la fin du tampon par défaut.
+        :param complete_only: bool - Ignorer une dernière ligne sans saut de ligne (en cours d'écriture).
+        :return: Iterator[tuple[int, int]] - Début et fin (saut de ligne exclu) de chaque ligne.
+    """
+    end = len(buffer) if end is None else end
+    find = buffer.find
+    position = start
+    while position < end:
+        newline = find(b"\n", position, end)
+        if newline < 0:
+            if not complete_only:
+                yield position, end
+            return
+        yield position, newline
+        position = newline + 1
+
+
+@lru_cache(maxsize=None)
+def _field_pattern(needle: bytes) -> re.Pattern:
+    """Expression régulière d'un champ JSON : chaîne sans échappement (groupe 1) ou nombre (groupe 2)"""
+    return re.compile(re.escape(needle) + rb'[ \t]*:[ \t]*(?:"([^"\\]*)"|(-?[0-9][0-9.eE+-]*))')
+
+
+def chunk_bounds(buffer, start: int = 0, end: int | None = None, size: int = 1 << 20):
+    """
+        Découpe un tampon en blocs d'environ `size` octets, alignés sur les fins de ligne.
+
+        :param buffer: mmap.mmap | bytes - Le tampon à découper.
+        :param start: int - Position de départ (début de ligne).
+        :param end: int | None - Position de fin (exclue), la fin du tampon par défaut.
+        :param size: int - Taille visée d'un bloc.
+        :return: Iterator[tuple[int, int]] - Début et fin de chaque bloc.
+    """
+    end = len(buffer) if end is None else end
+    position = start
+    while position < end:
+        stop = min(position + size, end)
+        if stop < end:
+            newline = buffer.rfind(b"\n", position, stop)
+            if newline < 0:  # Ligne plus longue qu'un bloc
+                newline = buffer.find(b"\n", stop, end)
+            stop = end if newline < 0 else newline + 1
+        yield position, stop
+        position = stop
+
+
+def field_value(buffer, needle: bytes, start: int, end: int) -> bytes | int | float | None:
+    """
+        Extrait la valeur brute d'un champ JSON de premier niveau par simple recherche d'octets.
+
+        La valeur n'est retournée que si l'extraction est sans ambiguïté : clé présente une
+        seule fois, chaîne sans séquence d'échappement ou nombre. Dans tous les autres cas,
+        None est retourné et la ligne doit être entièrement décodée.
+
+        :param buffer: mmap.mmap | bytes - Le tampon contenant la ligne.
+        :param needle: bytes - La clé entre guillemets, par exemple `b'"level"'`.
+        :param start: int - Début de la ligne.
+        :param end: int - Fin de la ligne.
+        :return: bytes | int | float | None - La chaîne (sans guillemets) ou le nombre, ou None.
+    """
+    return _extract(buffer, _field_pattern(needle), needle, start, end)
+
+
+def _extract(buffer, pattern: re.Pattern, needle: bytes, start: int, end: int):
+    """Corps de `field_value`, avec l'expression régulière déjà compilée (boucles de parcours)"""
+    key = buffer.find(needle, start, end)
+    if key < 0:
+        return None
+    match = pattern.match(buffer, key, end)  # La première occurrence doit être la clé...
+    if match is None or buffer.find(needle, match.end(), end) >= 0:  # ... et la seule
+        return None
+    value = match.group(1)
+    if value is not None:
+        return value
+    value = match.group(2)
+    try:
+        return float(value) if b"." in value or b"e" in value or b"E" in value else int(value)
+    except ValueError:
+        return None
+
+
+def scan_events(file_path: str, levels=None, start: int = 0, end: int | None = None,
+                level_key: str = "level"):
+    """
+        Parcourt les événements d'un fichier projeté en mémoire.
+
+        Les lignes sont délimitées directement sur les octets. Si `levels` est fourni, le
+        niveau de chaque ligne est d'abord extrait par une recherche d'octets : les lignes
+        d'un autre niveau sont écartées sans être décodées, seules les autres sont copiées
+        puis décodées (`Event.from_line`). Chaque événement porte sa position dans le fichier.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+        :param start: int - Position de départ (début de ligne).
+        :param end: int | None - Position de fin (exclue), la fin du fichier par défaut.
+        :param level_key: str - Le nom du champ de niveau.
+        :return: Iterator[Event] - Les événements décodés.
+    """
+    wanted = {level.upper() for level in levels} if levels else None
+    parser = TimestampParser()
+    if level_key == "level":
+        make = Event.from_line  # Clés par défaut : décodage typé possible
+    else:
+        def make(line, parser, offset):
+            return Event(codec.loads(line), "timestamp", level_key, "message", parser, offset)
+    with open_map(file_path) as buffer:
+        if wanted is None:
+            # Sans filtre, toutes les lignes sont décodées : le tampon est copié par blocs entiers
+            for chunk_start, chunk_end in chunk_bounds(buffer, start, end):
+                position = chunk_start
+                for line in buffer[chunk_start:chunk_end].split(b"\n"):
+                    line_start = position
+                    position += len(line) + 1
+                    try:
+                        yield make(line, parser, line_start)
+                    except Exception:
+                        continue
+            return
+        wanted_bytes = {level.encode() for level in wanted}
+        needle = f'"{level_key}"'.encode()
+        pattern = _field_pattern(needle)
+        for line_start, line_end in line_bounds(buffer, start, end):
+            level = _extract(buffer, pattern, needle, line_start, line_end)
+            if level.__class__ is bytes and level.upper() not in wanted_bytes:
+                continue  # Niveau écarté sans décodage de la ligne
+            try:
+                event = make(buffer[line_start:line_end], parser, line_start)
+            except Exception:
+                continue
+            if event.level in wanted:
+                yield event
+
+
+def scan_levels(file_path: str, handle, start: int = 0, level_key: str = "level",
+                timestamp_key: str = "timestamp") -> int:
+    """
+        Parcourt le niveau et l'horodatage des lignes complètes d'un fichier, sans les décoder.
+
+        Le niveau et l'horodatage sont extraits par recherche d'octets ; une ligne dont
+        l'extraction est ambiguë, ou qui n'a pas la forme d'un objet JSON, est entièrement
+        décodée. Les lignes illisibles sont ignorées.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param handle: Callable[[str, int, int], None] - Traitement du niveau, de l'horodatage (ns) et de la position d'une ligne.
+        :param start: int - Position de départ (début de ligne).
+        :param level_key: str - Le nom du champ de niveau.
+        :param timestamp_key: str - Le nom du champ d'horodatage.
+        :return: int - La position suivant la dernière ligne complète lue.
+    """
+    level_needle = f'"{level_key}"'.encode()
+    timestamp_needle = f'"{timestamp_key}"'.encode()
+    level_pattern, timestamp_pattern = _field_pattern(level_needle), _field_pattern(timestamp_needle)
+    parser = TimestampParser()
+    levels: dict[bytes, str] = {}
+    offset = start
+    with open_map(file_path) as buffer:
+        for line_start, line_end in line_bounds(buffer, start, complete_only=True):
+            offset = line_end + 1
+            if line_start == line_end:
+                continue
+            level = timestamp = None
+            if buffer[line_start] == 123 and buffer[line_end - 1] == 125:  # "{ ... }"
+                level = _extract(buffer, level_pattern, level_needle, line_start, line_end)
+                timestamp = _extract(buffer, timestamp_pattern, timestamp_needle, line_start, line_end)
+            try:
+                if level.__class__ is not bytes or timestamp is None:
+                    event = Event(codec.loads(buffer[line_start:line_end]), timestamp_key, level_key, parser=parser)
+                    handle(event.level, event.epoch_ns, line_start)
+                    continue
+                name = levels.get(level)
+                if name is None:
+                    name = levels[level] = sys.intern(level.decode().upper())
+                handle(name, parser.parse_ns(timestamp.decode() if timestamp.__class__ is bytes else timestamp), line_start)
+            except Exception:
+                continue
+    return offset
@@ -0,0 +1,139 @@
+import glob
+import gzip
+import os
+from fnmatch import fnmatch
+
+from app.models import codec
+from app.models.event_model import Event
+from app.models.timestamps import TimestampParser
+from .log_scanner import field_value, scan_events
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Fichiers d'un répertoire de logs retenus par défaut : logs, rotations (events.log.1, events.log.2.gz) et archives
+DEFAULT_PATTERNS = ("*.log", "*.log.[0-9]*", "*.gz")
+
+# Fichiers annexes écrits à côté des logs (index, points de reprise, fichiers temporaires)
+SIDECAR_SUFFIXES = (".idx", ".checkpoint", ".tmp")
+
+
+def resolve_sources(path: str, patterns=DEFAULT_PATTERNS) -> list[str]:
+    """
+        Liste les fichiers log désignés par un chemin, un répertoire ou un motif glob.
+
+        Un répertoire donne ses fichiers correspondant à l'un des `patterns` (sans
+        parcourir les sous-répertoires), un motif glob les fichiers correspondants ; les
+        fichiers annexes (index, points de reprise) sont écartés. Un chemin simple est
+        retourné tel quel, même s'il n'existe pas.
+
+        :param path: str - Le chemin du fichier, du répertoire ou le motif glob.
+        :param patterns: Iterable[str] - Les motifs des fichiers retenus dans un répertoire.
+        :return: list[str] - Les fichiers, triés par nom.
+    """
+    if os.path.isdir(path):
+        names = [
+            os.path.join(path, name) for name in os.listdir(path)
+            if any(fnmatch(name, pattern) for pattern in patterns)
+        ]
+    elif glob.has_magic(path):
+        names = glob.glob(path)
+    else:
+        return [path]
+    return sorted(name for name in names if os.path.isfile(name) and not name.endswith(SIDECAR_SUFFIXES))
+
+
+def is_compressed(file_path: str) -> bool:
+    """Indique si un fichier est compressé par gzip (d'après sa signature, pas son extension)"""
+    with open(file_path, "rb") as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def open_log(file_path: str):
+    """
+        Ouvre un fichier log en lecture binaire, en le décompressant à la volée s'il est compressé par gzip.
+
+        :param file_path: str - Le chemin du fichier log.
+        :return: BinaryIO - Le fichier ouvert.
+    """
+    return gzip.open(file_path, "rb") if is_compressed(file_path) else open(file_path, "rb")
+
+
+def read_lines_chunked(file_path: str, chunk_size: int = 1 << 20):
+    """
+        Parcourt les lignes complètes d'un fichier log (compressé ou non), bloc par bloc.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param chunk_size: int - Nombre d'octets (décompressés) lus à chaque lecture.
+        :return: Iterator[list[bytes]] - Les lignes non vides de chaque bloc.
+    """
+    remainder = b""
+    with open_log(file_path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            *complete, remainder = (remainder + chunk).split(b"\n")
+            lines = [line for line in complete if line.strip()]
+            if lines:
+                yield lines
+    if remainder.strip():
+        yield [remainder]
+
+
+def read_keyed_chunks(file_path: str, chunk_size: int = 1 << 20, timestamp_key: str = "timestamp"):
+    """
+        Parcourt les lignes d'un fichier log bloc par bloc, chacune accompagnée de son horodatage.
+
+        L'horodatage est extrait par recherche d'octets, sans décoder la ligne (décodage
+        complet seulement si l'extraction est ambiguë). Une ligne sans horodatage lisible
+        reçoit celui de la ligne précédente : elle reste à sa place dans le flux et c'est
+        le consommateur qui la signale comme invalide.
+
+        :param file_path: str - Le chemin du fichier log.
+        :param chunk_size: int - Nombre d'octets (décompressés) lus à chaque lecture.
+        :param timestamp_key: str - Le nom du champ d'horodatage.
+        :return: Iterator[list[tuple[int, bytes]]] - Les couples (horodatage en ns, ligne) de chaque bloc.
+    """
+    needle = f'"{timestamp_key}"'.encode()
+    parser = TimestampParser()
+    last = 0
+    for lines in read_lines_chunked(file_path, chunk_size):
+        keyed = []
+        for line in lines:
+            try:
+                value = field_value(line, needle, 0, len(line))
+                if value is None:
+                    value = codec.loads(line)[timestamp_key]
+                last = parser.parse_ns(value.decode() if value.__class__ is bytes else value)
+            except Exception:
+                pass
+            keyed.append((last, line))
+        yield keyed
+
+
+def iter_events(file_path: str, levels=None, chunk_size: int = 1 << 20):
+    """
+        Parcourt les événements d'un fichier log, compressé ou non, dans l'ordre du fichier.
+
+        Un fichier non compressé est projeté en mémoire (`scan_events`) ; un fichier
+        compressé est décompressé bloc par bloc. Les événements d'un fichier compressé ne
+        portent pas de position (elle n'aurait pas de sens dans le fichier compressé).
+
+        :param file_path: str - Le chemin du fichier log.
+        :param levels: Iterable[str] | None - Niveaux retenus (tous si None).
+        :param chunk_size: int - Nombre d'octets décompressés lus à chaque lecture.
+        :return: Iterator[Event] - Les événements décodés.
+    """
+    if not is_compressed(file_path):
+        yield from scan_events(file_path, levels)
+        return
+    wanted = {level.upper() for level in levels} if levels else None
+    parser = TimestampParser()
+    for lines in read_lines_chunked(file_path, chunk_size):
+        for line in lines:
+            try:
+                event = Event.from_line(line, parser)
+            except Exception:
+                continue
+            if wanted is None or event.level in wanted:
+                yield event
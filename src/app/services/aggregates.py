@@ -0,0 +1,229 @@
+import json
+import os
+from datetime import datetime, timezone
+
+from app.models.event_model import Event
+from app.models.timestamps import NS_PER_SECOND
+from app.providers.alert_store import is_legacy_file, iter_records, scan_records
+from app.providers.log_scanner import scan_levels
+
+
+class Aggregates:
+    """
+        Agrégats incrémentaux des événements et des alertes, persistés dans un fichier annexe.
+
+        Les agrégats mémorisent, pour le fichier log et le fichier d'alertes, la position en
+        octets jusqu'à laquelle ils ont été calculés. `refresh` ne lit donc que les données
+        ajoutées depuis le dernier calcul, et les rapports sont produits en O(nombre de
+        tranches de temps) au lieu d'une relecture complète du log.
+
+        Attributs :
+        - bucket_seconds : int - Durée d'une tranche de temps, en secondes.
+        - total_events : int - Nombre total d'événements.
+        - level_counts : dict[str, int] - Nombre d'événements par niveau.
+        - buckets : dict[int, dict[str, int]] - Nombre d'événements par tranche (epoch en secondes) et par niveau.
+        - total_alerts : int - Nombre total d'alertes.
+        - alert_counts : dict[str, int] - Nombre d'alertes par règle.
+        - alert_buckets : dict[int, int] - Nombre d'alertes par tranche de temps.
+        - sources : dict[str, dict] - Position de lecture (chemin, inode, octets) de chaque fichier source.
+    """
+    def __init__(self, bucket_seconds: int = 60):
+        """
+            Initialise des agrégats vides.
+
+            :param bucket_seconds: int - Durée d'une tranche de temps, en secondes.
+        """
+        self.bucket_seconds = bucket_seconds
+        self.total_events = 0
+        self.level_counts: dict[str, int] = {}
+        self.buckets: dict[int, dict[str, int]] = {}
+        self.total_alerts = 0
+        self.alert_counts: dict[str, int] = {}
+        self.alert_buckets: dict[int, int] = {}
+        self.sources: dict[str, dict] = {}
+
+    def _bucket(self, epoch_ns: int) -> int:
+        """Retourne le début (epoch en secondes) de la tranche contenant un horodatage"""
+        seconds = epoch_ns // NS_PER_SECOND
+        return seconds - seconds % self.bucket_seconds
+
+    def add_event(self, event: Event):
+        """
+            Comptabilise un événement.
+
+            :param event: Event - L'événement à comptabiliser.
+        """
+        self.add_level(event.level, event.epoch_ns)
+
+    def add_level(self, level: str, epoch_ns: int, offset: int | None = None):
+        """
+            Comptabilise un événement à partir de son seul niveau et de son horodatage.
+
+            :param level: str - Le niveau de l'événement.
+            :param epoch_ns: int - L'horodatage de l'événement, en nanosecondes.
+            :param offset: int | None - Position de la ligne (ignorée, signature de `scan_levels`).
+        """
+        self.total_events += 1
+        self.level_counts[level] = self.level_counts.get(level, 0) + 1
+        bucket = self.buckets.setdefault(self._bucket(epoch_ns), {})
+        bucket[level] = bucket.get(level, 0) + 1
+
+    def add_alert(self, record: dict):
+        """
+            Comptabilise une alerte sérialisée (telle qu'écrite dans le fichier d'alertes).
+
+            :param record: dict - L'alerte sérialisée.
+        """
+        triggered_at = datetime.fromisoformat(record["triggered_at"])
+        if triggered_at.tzinfo is None:
+            triggered_at = triggered_at.replace(tzinfo=timezone.utc)
+        bucket = self._bucket(int(triggered_at.timestamp()) * NS_PER_SECOND)
+        rule = record.get("rule") or "default"
+        self.total_alerts += 1
+        self.alert_counts[rule] = self.alert_counts.get(rule, 0) + 1
+        self.alert_buckets[bucket] = self.alert_buckets.get(bucket, 0) + 1
+
+    def _scan(self, name: str, path: str, scan) -> bool:
+        """
+            Lit les lignes complètes ajoutées à un fichier depuis la dernière lecture.
+
+            :param name: str - Le nom de la source ("events" ou "alerts").
+            :param path: str - Le chemin du fichier source.
+            :param scan: Callable[[str, int], int] - Lecture depuis une position ; retourne la position atteinte.
+            :return: bool - False si le fichier a été remplacé ou tronqué (recalcul nécessaire).
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        source = self.sources.get(name)
+        offset = 0
+        if source:
+            if source["path"] != os.path.abspath(path) or source["inode"] != stat.st_ino \
+                    or source["offset"] > stat.st_size:
+                return False
+            offset = source["offset"]
+        offset = scan(path, offset)
+        self.sources[name] = {"path": os.path.abspath(path), "inode": stat.st_ino, "offset": offset}
+        return True
+
+    def _scan_alerts(self, path: str, offset: int) -> int:
+        """Comptabilise les alertes complètes ajoutées au fichier d'alertes à partir de `offset`"""
+        # Un enregistrement en cours d'écriture sera lu au prochain rafraîchissement
+        for record, end in scan_records(path, offset):
+            try:
+                self.add_alert(record)
+            except Exception:
+                pass
+            offset = end
+        return offset
+
+    def refresh(self, events_path: str, alerts_path: str | None = None) -> "Aggregates":
+        """
+            Met à jour les agrégats avec les données ajoutées depuis le dernier calcul.
+
+            Si un fichier source a été remplacé (rotation) ou tronqué, les agrégats sont
+            entièrement recalculés.
+
+            :param events_path: str - Le chemin du fichier log.
+            :param alerts_path: str | None - Le chemin du fichier d'alertes (JSON Lines).
+            :return: Aggregates - Les agrégats à jour (`self`, ou une nouvelle instance après recalcul).
+        """
+        # Le log est parcouru par `scan_levels` : seuls le niveau et l'horodatage sont extraits
+        consistent = self._scan("events", events_path, lambda path, offset: scan_levels(path, self.add_level, offset))
+        if consistent and alerts_path and is_legacy_file(alerts_path):
+            # Format historique (tableau JSON) : pas de lecture incrémentale, les alertes sont recomptées
+            self.total_alerts, self.alert_counts, self.alert_buckets = 0, {}, {}
+            self.sources.pop("alerts", None)
+            for record in iter_records(alerts_path):
+                self.add_alert(record)
+        elif consistent and alerts_path:
+            consistent = self._scan("alerts", alerts_path, self._scan_alerts)
+        if not consistent:
+            return Aggregates(self.bucket_seconds).refresh(events_path, alerts_path)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+            Convertit les agrégats en dictionnaire sérialisable en JSON.
+
+            :return: dict - Représentation des agrégats.
+        """
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "total_events": self.total_events,
+            "level_counts": self.level_counts,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "total_alerts": self.total_alerts,
+            "alert_counts": self.alert_counts,
+            "alert_buckets": {str(k): v for k, v in self.alert_buckets.items()},
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Aggregates":
+        """
+            Reconstruit des agrégats depuis leur représentation JSON.
+
+            :param data: dict - Représentation produite par `to_dict`.
+            :return: Aggregates - Les agrégats reconstruits.
+        """
+        aggregates = cls(data.get("bucket_seconds", 60))
+        aggregates.total_events = data.get("total_events", 0)
+        aggregates.level_counts = data.get("level_counts", {})
+        aggregates.buckets = {int(k): v for k, v in data.get("buckets", {}).items()}
+        aggregates.total_alerts = data.get("total_alerts", 0)
+        aggregates.alert_counts = data.get("alert_counts", {})
+        aggregates.alert_buckets = {int(k): v for k, v in data.get("alert_buckets", {}).items()}
+        aggregates.sources = data.get("sources", {})
+        return aggregates
+
+    def save(self, path: str):
+        """
+            Sauvegarde atomiquement les agrégats.
+
+            :param path: str - Le chemin du fichier d'agrégats.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, bucket_seconds: int = 60) -> "Aggregates":
+        """
+            Charge les agrégats depuis le disque.
+
+            Un fichier absent, illisible ou calculé avec une autre durée de tranche donne des
+            agrégats vides (recalcul complet au prochain rafraîchissement).
+
+            :param path: str - Le chemin du fichier d'agrégats.
+            :param bucket_seconds: int - Durée de tranche attendue, en secondes.
+            :return: Aggregates - Les agrégats chargés.
+        """
+        try:
+            with open(path, "r") as f:
+                aggregates = cls.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(bucket_seconds)
+        if aggregates.bucket_seconds != bucket_seconds:
+            return cls(bucket_seconds)
+        return aggregates
+
+
+def refresh_aggregates(events_path: str, alerts_path: str, path: str, bucket_seconds: int = 60,
+                       rebuild: bool = False) -> Aggregates:
+    """
+        Charge, met à jour puis sauvegarde les agrégats persistés.
+
+        :param events_path: str - Le chemin du fichier log.
+        :param alerts_path: str - Le chemin du fichier d'alertes.
+        :param path: str - Le chemin du fichier d'agrégats.
+        :param bucket_seconds: int - Durée d'une tranche de temps, en secondes.
+        :param rebuild: bool - Ignorer les agrégats existants et tout recalculer depuis les fichiers bruts.
+        :return: Aggregates - Les agrégats à jour.
+    """
+    aggregates = Aggregates(bucket_seconds) if rebuild else Aggregates.load(path, bucket_seconds)
+    aggregates = aggregates.refresh(events_path, alerts_path)
+    aggregates.save(path)
+    return aggregates
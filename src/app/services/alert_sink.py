@@ -0,0 +1,280 @@
+import asyncio
+from collections import Counter
+
+from app.models import codec
+from app.services.metrics import NULL_METRICS, Metrics
+
+
+class SinkChannel:
+    """
+        File et tâche de vidage d'une destination d'alertes.
+
+        Les alertes sont regroupées par lots de `batch_size` ou au plus tard après
+        `flush_interval` secondes, puis écrites dans un thread (`asyncio.to_thread`) : la
+        boucle d'événements n'est jamais bloquée par une écriture. Un lot en échec est
+        retenté avec un délai exponentiel ; pendant ce temps, les nouvelles alertes
+        s'accumulent dans la file, et celles qui dépassent `max_pending` sont abandonnées
+        et comptées plutôt que de ralentir l'ingestion.
+
+        Attributs :
+        - backend : FileBackend | SQLiteBackend | WebhookBackend - La destination.
+        - written : int - Nombre d'alertes écrites.
+        - dropped : int - Nombre d'alertes abandonnées (file pleine).
+        - failed : int - Nombre d'alertes perdues après épuisement des tentatives.
+        - skipped : int - Nombre d'alertes écartées car déjà écrites avant une reprise (voir `resume`).
+    """
+    def __init__(self, backend, batch_size: int = 100, flush_interval: float = 0.5, max_pending: int = 10000,
+                 retries: int = 5, backoff: float = 0.1, max_backoff: float = 5.0, metrics: Metrics = NULL_METRICS):
+        """
+            Initialise la file de la destination.
+
+            :param backend: La destination (méthodes `write(records)` et `close()`, attribut `name`).
+            :param batch_size: int - Nombre maximal d'alertes par écriture.
+            :param flush_interval: float - Délai maximal avant l'écriture d'un lot incomplet, en secondes.
+            :param max_pending: int - Nombre maximal d'alertes en attente.
+            :param retries: int - Nombre de nouvelles tentatives d'un lot en échec.
+            :param backoff: float - Délai avant la première nouvelle tentative, doublé à chaque échec (secondes).
+            :param max_backoff: float - Délai maximal entre deux tentatives, en secondes.
+            :param metrics: Metrics - Les métriques du pipeline.
+        """
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics
+        self.written = self.dropped = self.failed = self.skipped = 0
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._task = None
+        self._replayed = Counter()
+
+    def start(self):
+        """Démarre la tâche de vidage (dans la boucle d'événements courante)"""
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def submit(self, record: dict) -> bool:
+        """
+            Place une alerte en attente d'écriture, sans jamais attendre.
+
+            :param record: dict - L'alerte sérialisée.
+            :return: bool - False si la file est pleine (alerte abandonnée).
+        """
+        if self._replayed:
+            identity = codec.dumps(record)
+            if identity in self._replayed:
+                # Alerte rejouée après une reprise, déjà écrite
+                self._replayed[identity] -= 1
+                if not self._replayed[identity]:
+                    del self._replayed[identity]
+                self.skipped += 1
+                self.metrics.inc("alerts_deduplicated_total")
+                return True
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.metrics.inc("alerts_dropped_total")
+            return False
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'alertes en attente d'écriture"""
+        return self._queue.qsize()
+
+    async def _next_batch(self) -> list[dict]:
+        """Attend une alerte puis complète le lot jusqu'à `batch_size` ou `flush_interval`"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush_loop(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: list[dict]):
+        """Écrit un lot, avec nouvelles tentatives espacées exponentiellement"""
+        name = self.backend.name
+        for attempt in range(self.retries + 1):
+            start = self.metrics.clock()
+            try:
+                await asyncio.to_thread(self.backend.write, batch)
+            except Exception as e:
+                self.metrics.inc("sink_errors_total")
+                if attempt == self.retries:
+                    self.failed += len(batch)
+                    self.metrics.inc("alerts_failed_total", len(batch))
+                    print(f"\033[35m[-] {len(batch)} alerte(s) perdue(s) ({name}) : {e}\033[35m")
+                    return
+                await asyncio.sleep(min(self.backoff * 2 ** attempt, self.max_backoff))
+                continue
+            self.metrics.since("sink_flush_seconds", start, name)
+            self.written += len(batch)
+            return
+
+    def resume(self, mark):
+        """
+            Prépare la reprise depuis un instantané : les alertes écrites après `mark` seront rejouées
+            par l'analyseur, elles ne sont donc pas réécrites.
+
+            :param mark: La position de la destination au moment de l'instantané (`backend.mark()`).
+        """
+        self._replayed = Counter(codec.dumps(record) for record in self.backend.records_since(mark))
+
+    async def flush(self):
+        """Attend l'écriture des alertes en attente puis leur écriture sur disque"""
+        if self._task is not None:
+            await self._queue.join()
+        await asyncio.to_thread(self.backend.sync)
+
+    async def close(self):
+        """Écrit les alertes en attente, arrête la tâche de vidage et ferme la destination"""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.backend.close)
+
+
+class AlertSink:
+    """
+        Puits asynchrone des alertes : chaque alerte est transmise à toutes les destinations.
+
+        Chaque destination possède sa propre file et sa propre tâche de vidage
+        (`SinkChannel`) : un webhook indisponible, en attente de nouvelle tentative, ne
+        retarde ni le fichier ni la base. Les consommateurs du pipeline appellent
+        `submit`, qui ne bloque jamais.
+
+        Attributs :
+        - channels : list[SinkChannel] - Les files des destinations.
+    """
+    def __init__(self, backends: list, metrics: Metrics = NULL_METRICS, **options):
+        """
+            Initialise le puits.
+
+            :param backends: list - Les destinations des alertes.
+            :param metrics: Metrics - Les métriques du pipeline.
+            :param options: Options de `SinkChannel` (batch_size, flush_interval, max_pending, retries, backoff, max_backoff).
+        """
+        self.channels = [SinkChannel(backend, metrics=metrics, **options) for backend in backends]
+
+    def start(self):
+        """Démarre les tâches de vidage"""
+        for channel in self.channels:
+            channel.start()
+
+    def submit(self, record: dict):
+        """
+            Transmet une alerte sérialisée à toutes les destinations, sans attendre.
+
+            :param record: dict - L'alerte sérialisée (`Alert.to_dict()`).
+        """
+        for channel in self.channels:
+            channel.submit(record)
+
+    @property
+    def pending(self) -> int:
+        """Nombre d'alertes en attente, toutes destinations confondues"""
+        return sum(channel.pending for channel in self.channels)
+
+    @property
+    def dropped(self) -> int:
+        """Nombre d'alertes abandonnées, toutes destinations confondues"""
+        return sum(channel.dropped for channel in self.channels)
+
+    async def flush(self):
+        """Attend que toutes les alertes transmises soient écrites sur disque"""
+        await asyncio.gather(*(channel.flush() for channel in self.channels))
+
+    def marks(self) -> dict:
+        """
+            Positions courantes des destinations (à prendre après `flush`).
+
+            :return: dict - La position de chaque destination, par nom.
+        """
+        return {channel.backend.name: channel.backend.mark() for channel in self.channels}
+
+    def resume(self, marks: dict):
+        """
+            Prépare la reprise depuis un instantané : les alertes déjà écrites après les positions
+            sauvegardées ne sont pas écrites une seconde fois.
+
+            :param marks: dict - Les positions des destinations au moment de l'instantané (`marks`).
+        """
+        for channel in self.channels:
+            if channel.backend.name in marks:
+                channel.resume(marks[channel.backend.name])
+
+    async def close(self):
+        """Vide toutes les files puis ferme les destinations"""
+        await asyncio.gather(*(channel.close() for channel in self.channels))
+
+
+def build_backends(config) -> list:
+    """
+        Construit les destinations déclarées dans la section `alert_sink` de la configuration.
+
+        :param config: Config - La configuration.
+        :return: list - Les destinations (le fichier d'alertes par défaut).
+        :raises ValueError: Si une destination est inconnue ou incomplète.
+    """
+    from app.providers.alert_backends import FileBackend, SQLiteBackend, WebhookBackend
+    backends = []
+    for name in config.get("alert_sink.backends") or ["file"]:
+        if name == "file":
+            backends.append(FileBackend(config.get("alert_storage.alerts_file_path", "alerts.json")))
+        elif name == "sqlite":
+            backends.append(SQLiteBackend(config.get("alert_sink.sqlite_path", "alerts.db")))
+        elif name == "webhook":
+            url = config.get("alert_sink.webhook_url")
+            if not url:
+                raise ValueError("alert_sink.webhook_url est requis pour la destination 'webhook'")
+            backends.append(WebhookBackend(url, config.get("alert_sink.webhook_timeout", 5.0),
+                                           config.get("alert_sink.webhook_pool_size", 2),
+                                           config.get("alert_sink.webhook_headers")))
+        else:
+            raise ValueError(f"Destination d'alertes inconnue : {name}")
+    return backends
+
+
+def build_sink(config, metrics: Metrics = NULL_METRICS) -> AlertSink:
+    """
+        Construit le puits d'alertes décrit par la configuration.
+
+        :param config: Config - La configuration.
+        :param metrics: Metrics - Les métriques du pipeline.
+        :return: AlertSink - Le puits (à démarrer avec `start()` dans la boucle d'événements).
+    """
+    return AlertSink(
+        build_backends(config),
+        metrics,
+        batch_size=config.get("alert_sink.batch_size", 100),
+        flush_interval=config.get("alert_sink.flush_interval", 0.5),
+        max_pending=config.get("alert_sink.max_pending", 10000),
+        retries=config.get("alert_sink.retries", 5),
+        backoff=config.get("alert_sink.backoff", 0.1),
+        max_backoff=config.get("alert_sink.max_backoff", 5.0),
+    )
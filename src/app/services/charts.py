@@ -0,0 +1,189 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Incrémenté à chaque changement du rendu : les images en cache deviennent alors obsolètes
+CHART_VERSION = 1
+
+
+def _pyplot():
+    """Importe pyplot avec le moteur Agg (rendu sans affichage, utilisable hors session graphique)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _render_distribution(data: dict, output: str):
+    plt = _pyplot()
+    fig = plt.figure(figsize=(8, 6))
+    try:
+        plt.bar(data["levels"], data["counts"], color='#3498db', edgecolor='black')
+        plt.title("Distribution des niveaux d'événements")
+        plt.xlabel("Niveau")
+        plt.ylabel("Nombre")
+        plt.xticks(rotation=0)
+        plt.tight_layout()
+        fig.savefig(output, format="png")
+    finally:
+        plt.close(fig)  # Sans fermeture, pyplot conserve chaque figure en mémoire
+
+
+def _render_rate(data: dict, output: str):
+    plt = _pyplot()
+    times = np.asarray(data["times"]).astype("datetime64[s]")
+    fig = plt.figure(figsize=(8, 4))
+    try:
+        plt.plot(times, data["rate"], color='#3498db', label="Événements / min")
+        plt.plot(times, data["alert_rate"], color='#c0392b', label="Alertes / min")
+        plt.title("Débit par minute")
+        plt.ylabel("Par minute")
+        plt.legend()
+        plt.tight_layout()
+        fig.savefig(output, format="png")
+    finally:
+        plt.close(fig)
+
+
+RENDERERS = {
+    "distribution": _render_distribution,
+    "rate": _render_rate,
+}
+
+
+def chart_key(kind: str, data: dict) -> str:
+    """
+        Empreinte du contenu d'un graphique : type, version du rendu et données d'entrée.
+
+        :param kind: str - Le type de graphique (clé de `RENDERERS`).
+        :param data: dict - Les données agrégées du graphique (listes, nombres ou tableaux NumPy).
+        :return: str - L'empreinte hexadécimale.
+    """
+    digest = hashlib.sha256(f"{kind}:{CHART_VERSION}".encode())
+    for name in sorted(data):
+        value = data[name]
+        digest.update(name.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(value.dtype.str.encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+
+def _render(kind: str, data: dict, output: str) -> str:
+    """Rend un graphique dans un fichier temporaire puis le publie atomiquement"""
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        RENDERERS[kind](data, tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output
+
+
+class ChartCache:
+    """
+        Cache des graphiques rendus, adressés par le contenu de leurs données.
+
+        Chaque image est nommée d'après l'empreinte de ses données (`chart_key`) : un rapport
+        dont les données n'ont pas changé réutilise les images existantes sans relancer
+        matplotlib. Au-delà de `max_bytes`, les images les moins récemment utilisées
+        (date de modification, rafraîchie à chaque réutilisation) sont supprimées.
+
+        Attributs :
+        - directory : Path - Le répertoire du cache.
+        - max_bytes : int - Taille maximale du cache, en octets.
+        - workers : int - Nombre de processus de rendu.
+    """
+    def __init__(self, directory: str = "reports/charts", max_bytes: int = 50 * 1024 * 1024, workers: int = 2):
+        """
+            Initialise le cache.
+
+            :param directory: str - Le répertoire du cache (créé au premier rendu).
+            :param max_bytes: int - Taille maximale du cache, en octets.
+            :param workers: int - Nombre de processus de rendu (1 : rendu dans le processus courant).
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.workers = workers
+
+    def path_for(self, kind: str, data: dict) -> Path:
+        """
+            Chemin de l'image d'un graphique dans le cache.
+
+            :param kind: str - Le type de graphique.
+            :param data: dict - Les données du graphique.
+            :return: Path - Le chemin de l'image.
+        """
+        return self.directory / f"{kind}_{chart_key(kind, data)}.png"
+
+    def render(self, charts: list[tuple[str, dict]]) -> list[str]:
+        """
+            Retourne les images des graphiques demandés, en ne rendant que celles absentes du cache.
+
+            Les graphiques manquants sont rendus en parallèle dans un pool de processus
+            lorsqu'il y en a plusieurs, puis le cache est réduit à sa taille maximale.
+
+            :param charts: list[tuple[str, dict]] - Les graphiques : (type, données).
+            :return: list[str] - Les chemins des images, dans l'ordre de la demande.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = [self.path_for(kind, data) for kind, data in charts]
+        missing = {}
+        for (kind, data), path in zip(charts, paths):
+            if path.exists():
+                os.utime(path)  # Image réutilisée : elle devient la plus récente
+            else:
+                missing.setdefault(path, (kind, data))
+
+        if len(missing) > 1 and self.workers > 1:
+            # `fork` évite de réimporter le programme principal dans chaque processus
+            method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(missing)),
+                                     mp_context=multiprocessing.get_context(method)) as executor:
+                futures = [executor.submit(_render, kind, data, str(path)) for path, (kind, data) in missing.items()]
+                for future in futures:
+                    future.result()
+        else:
+            for path, (kind, data) in missing.items():
+                _render(kind, data, str(path))
+
+        self.evict(keep=set(paths))
+        return [str(path) for path in paths]
+
+    def evict(self, keep=()) -> int:
+        """
+            Supprime les images les moins récemment utilisées jusqu'à respecter `max_bytes`.
+
+            :param keep: Iterable[Path] - Images à conserver quoi qu'il arrive (celles du rapport en cours).
+            :return: int - Le nombre d'images supprimées.
+        """
+        keep = {Path(p) for p in keep}
+        entries = []
+        for path in self.directory.glob("*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
@@ -1,29 +1,71 @@
-from collections import deque
-from datetime import timedelta
-
-from app.configs.config import Config
+from app.configs.config import Config, get_config
 from app.models.alerts_model import Alert
 from app.models.event_model import Event
+from app.services.rules import Rule, RuleEngine, ThresholdRule, build_rule
+
+
+def load_rules(config: Config) -> list[Rule]:
+    """
+        Construit les règles de détection déclarées dans la configuration.
+
+        La règle historique (`event_analyzer.critical_levels`, 3 événements en
+        `event_analyzer.window_seconds`) est placée en tête, sauf si `event_analyzer.default_rule`
+        vaut False. Les règles de `event_analyzer.rules` sont ajoutées à sa suite.
+
+        :param config: Config - La configuration de l'application.
+        :return: list[Rule] - Les règles à évaluer.
+    """
+    rules = []
+    if config.get("event_analyzer.default_rule", True):
+        rules.append(ThresholdRule(
+            "default",
+            count=3,
+            window_seconds=config.get("event_analyzer.window_seconds", 30),
+            levels=config.get("event_analyzer.critical_levels", ["CRITICAL"]),
+            group_by=config.get("event_analyzer.group_by"),
+            max_keys=config.get("event_analyzer.max_keys", 10000),
+            key_ttl_seconds=config.get("event_analyzer.key_ttl_seconds"),
+        ))
+    rules.extend(build_rule(spec) for spec in config.get("event_analyzer.rules", []) or [])
+    return rules
 
 
 class EventAnalyzer:
-    def __init__(self):
-        config = Config()
-        window_seconds = config.get("event_analyzer.window_seconds", 30)
-        critical_levels = config.get("event_analyzer.critical_levels", ["CRITICAL"])
+    def __init__(self, rules: list[Rule] | None = None):
+        self.engine = RuleEngine(rules if rules is not None else load_rules(get_config()))
 
-        self.window = timedelta(seconds=window_seconds)
-        self.buffer = deque()
-        self.critical_levels = set(critical_levels)
+    def evaluate(self, event: Event) -> list[Alert]:
+        return self.engine.evaluate(event)
 
     def analyze(self, event: Event) -> Alert | None:
-        if event.level not in self.critical_levels:
-            return None
-        self.buffer.append(event)
-        while self.buffer and (event.timestamp - self.buffer[0].timestamp) > self.window:
-            self.buffer.popleft()
-        if len(self.buffer) >= 3:
-            group = list(self.buffer)
-            self.buffer.clear()
-            return Alert(triggered_at=event.timestamp, events=group)
-        return None
+        # Compatibilité : seule la première alerte est retournée, utiliser `evaluate` pour toutes
+        alerts = self.engine.evaluate(event)
+        return alerts[0] if alerts else None
+
+    def metrics(self) -> dict:
+        return self.engine.metrics()
+
+    def snapshot(self) -> list:
+        # État des fenêtres de chaque règle, dans l'ordre des règles : [nom, état]
+        return [[rule.name, rule.snapshot()] for rule in self.engine.rules]
+
+    def restore(self, state: list):
+        # Une règle renommée, ajoutée ou retirée depuis l'instantané repart d'une fenêtre vide
+        for rule, (name, rule_state) in zip(self.engine.rules, state):
+            if rule.name == name and rule_state is not None:
+                rule.restore(rule_state)
+
+    def retune(self, rules: list[Rule]):
+        # Rechargement à chaud : une règle de même nom reprend les fenêtres de celle qu'elle remplace
+        previous = {rule.name: rule for rule in self.engine.rules}
+        for rule in rules:
+            if rule.name in previous:
+                rule.adopt(previous[rule.name])
+        self.engine = RuleEngine(rules)
+
+    def analyze_batch(self, events: list[Event]) -> list[Alert]:
+        alerts = []
+        evaluate = self.engine.evaluate
+        for event in events:
+            alerts.extend(evaluate(event))
+        return alerts
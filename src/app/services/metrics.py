@@ -0,0 +1,305 @@
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes (en secondes) des histogrammes de latence : de 1 µs à environ 8 s, en puissances de 2
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(24))
+
+
+class Histogram:
+    """
+        Histogramme de latences à bornes fixes, compatible avec le format Prometheus.
+
+        Attributs :
+        - bounds : tuple[float, ...] - Les bornes supérieures des intervalles, en secondes.
+        - counts : list[int] - Nombre d'observations par intervalle (le dernier pour `+Inf`).
+        - count : int - Nombre total d'observations.
+        - sum : float - Somme des observations.
+    """
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+            Enregistre une observation.
+
+            :param value: float - La valeur observée, en secondes.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+            Estime un quantile à partir des intervalles (borne supérieure de l'intervalle atteint).
+
+            :param q: float - Le quantile, entre 0 et 1.
+            :return: float - L'estimation, en secondes (0 sans observation).
+        """
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+        return self.bounds[-1]
+
+
+class Metrics:
+    """
+        Compteurs, jauges et histogrammes de latence du pipeline.
+
+        Les noms suivent la convention Prometheus (`events_total`, `stage_seconds`...) ; un
+        histogramme peut porter une étiquette `stage` pour distinguer les étapes du pipeline.
+        Les jauges peuvent aussi être calculées à l'export via `register_gauge`.
+
+        Attributs :
+        - enabled : bool - True : les mesures sont enregistrées.
+        - started_at : float - Instant de création (horloge monotone), pour le calcul des débits.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[tuple[str, str | None], Histogram] = {}
+        self._callbacks = {}
+
+    @staticmethod
+    def clock() -> float:
+        """Horloge monotone utilisée pour les mesures de latence"""
+        return time.perf_counter()
+
+    def inc(self, name: str, value: int = 1):
+        """Incrémente un compteur"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Fixe la valeur d'une jauge"""
+        self.gauges[name] = value
+
+    def register_gauge(self, name: str, callback):
+        """
+            Déclare une jauge calculée au moment de l'export.
+
+            :param name: str - Le nom de la jauge.
+            :param callback: Callable[[], float] - La fonction retournant la valeur courante.
+        """
+        self._callbacks[name] = callback
+
+    def observe(self, name: str, value: float, stage: str | None = None):
+        """
+            Enregistre une latence dans un histogramme.
+
+            :param name: str - Le nom de l'histogramme.
+            :param value: float - La latence, en secondes.
+            :param stage: str | None - L'étape du pipeline (étiquette `stage`).
+        """
+        histogram = self.histograms.get((name, stage))
+        if histogram is None:
+            histogram = self.histograms[(name, stage)] = Histogram()
+        histogram.observe(value)
+
+    def since(self, name: str, start: float, stage: str | None = None) -> float:
+        """
+            Enregistre la latence écoulée depuis `start` et retourne l'instant courant.
+
+            :param name: str - Le nom de l'histogramme.
+            :param start: float - L'instant de début, obtenu par `clock()`.
+            :param stage: str | None - L'étape du pipeline.
+            :return: float - L'instant courant, utilisable comme début de l'étape suivante.
+        """
+        now = time.perf_counter()
+        self.observe(name, now - start, stage)
+        return now
+
+    def snapshot_gauges(self) -> dict[str, float]:
+        """Retourne toutes les jauges, y compris celles calculées à l'export"""
+        gauges = dict(self.gauges)
+        for name, callback in self._callbacks.items():
+            try:
+                gauges[name] = callback()
+            except Exception:
+                continue
+        return gauges
+
+    def stats_line(self) -> str:
+        """
+            Résumé d'une ligne : débit, profondeur de la queue et latences p50/p99 par étape.
+
+            :return: str - La ligne de statistiques.
+        """
+        elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+        events = self.counters.get("events_total", 0)
+        parts = [f"{events} événements ({events / elapsed:.0f}/s)",
+                 f"{self.counters.get('alerts_total', 0)} alertes"]
+        gauges = self.snapshot_gauges()
+        if "queue_depth" in gauges:
+            parts.append(f"queue {gauges['queue_depth']:.0f} (max {gauges.get('queue_depth_max', 0):.0f})")
+        for (name, stage), histogram in sorted(self.histograms.items(), key=lambda item: str(item[0])):
+            label = stage or name
+            parts.append(f"{label} p50 {histogram.quantile(0.5) * 1e3:.3f} ms p99 {histogram.quantile(0.99) * 1e3:.3f} ms")
+        return " | ".join(parts)
+
+    def to_prometheus(self) -> str:
+        """
+            Exporte les métriques au format texte Prometheus.
+
+            :return: str - Les métriques, préfixées par `alert_flow_`.
+        """
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines += [f"# TYPE alert_flow_{name} counter", f"alert_flow_{name} {value}"]
+        for name, value in sorted(self.snapshot_gauges().items()):
+            lines += [f"# TYPE alert_flow_{name} gauge", f"alert_flow_{name} {value}"]
+        declared = set()
+        for (name, stage), histogram in sorted(self.histograms.items(), key=lambda item: str(item[0])):
+            if name not in declared:
+                lines.append(f"# TYPE alert_flow_{name} histogram")
+                declared.add(name)
+            label = f'stage="{stage}",' if stage else ""
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'alert_flow_{name}_bucket{{{label}le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'alert_flow_{name}_bucket{{{label}le="+Inf"}} {histogram.count}')
+            suffix = f"{{{label[:-1]}}}" if label else ""
+            lines.append(f"alert_flow_{name}_sum{suffix} {histogram.sum}")
+            lines.append(f"alert_flow_{name}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+            Écrit atomiquement les métriques dans un fichier texte (collecteur « textfile »).
+
+            :param path: str - Le chemin du fichier.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+            Expose les métriques en HTTP (`GET /metrics`) dans un thread en arrière-plan.
+
+            :param port: int - Le port d'écoute.
+            :param host: str - L'adresse d'écoute (locale par défaut).
+            :return: ThreadingHTTPServer - Le serveur démarré (`shutdown()` pour l'arrêter).
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class NullMetrics(Metrics):
+    """
+        Métriques désactivées : chaque méthode est sans effet.
+
+        Les consommateurs du pipeline testent `enabled` une fois pour toutes et évitent
+        alors jusqu'aux lectures d'horloge ; le coût résiduel est négligeable.
+    """
+    enabled = False
+
+    @staticmethod
+    def clock() -> float:
+        return 0.0
+
+    def inc(self, name: str, value: int = 1):
+        pass
+
+    def set_gauge(self, name: str, value: float):
+        pass
+
+    def register_gauge(self, name: str, callback):
+        pass
+
+    def observe(self, name: str, value: float, stage: str | None = None):
+        pass
+
+    def since(self, name: str, start: float, stage: str | None = None) -> float:
+        return 0.0
+
+
+NULL_METRICS = NullMetrics()
+
+
+class TimedQueue(asyncio.Queue):
+    """
+        Queue du pipeline qui horodate chaque élément à sa mise en queue.
+
+        L'instant de mise en queue (horloge de `Metrics.clock`) de l'élément retiré par le
+        dernier `get` est exposé par `enqueued_at`, pour mesurer la latence de bout en bout
+        (attente dans la queue comprise). L'attribut est lu juste après `await queue.get()`,
+        sans point d'attente intermédiaire.
+
+        Attributs :
+        - enqueued_at : float - Instant de mise en queue du dernier élément retiré.
+    """
+    def _init(self, maxsize):
+        self._queue = deque()
+        self.enqueued_at = 0.0
+
+    def _put(self, item):
+        self._queue.append((time.perf_counter(), item))
+
+    def _get(self):
+        self.enqueued_at, item = self._queue.popleft()
+        return item
+
+
+async def sample_queue(queue: asyncio.Queue, metrics: Metrics, interval: float = 1.0):
+    """
+        Échantillonne périodiquement la profondeur de la queue (jauges `queue_depth` et `queue_depth_max`).
+
+        :param queue: asyncio.Queue - La queue du pipeline.
+        :param metrics: Metrics - Les métriques à alimenter.
+        :param interval: float - L'intervalle d'échantillonnage, en secondes.
+    """
+    peak = 0
+    while True:
+        depth = queue.qsize()
+        peak = max(peak, depth)
+        metrics.set_gauge("queue_depth", depth)
+        metrics.set_gauge("queue_depth_max", peak)
+        await asyncio.sleep(interval)
+
+
+async def report_periodically(metrics: Metrics, interval: float = 10.0, prometheus_file: str | None = None):
+    """
+        Affiche une ligne de statistiques et met à jour le fichier Prometheus à intervalle régulier.
+
+        :param metrics: Metrics - Les métriques à exporter.
+        :param interval: float - L'intervalle entre deux exports, en secondes.
+        :param prometheus_file: str | None - Le fichier texte Prometheus (aucun si None).
+    """
+    while True:
+        await asyncio.sleep(interval)
+        print(f"\033[36m[~] Stats : {metrics.stats_line()}\033[0m")
+        if prometheus_file:
+            await asyncio.to_thread(metrics.write_prometheus, prometheus_file)
@@ -0,0 +1,34 @@
+import json
+import os
+
+
+def load_checkpoint(path: str) -> dict | None:
+    """
+        Charge un point de reprise depuis le disque.
+
+        :param path: str - Le chemin du fichier de point de reprise.
+        :return: dict | None - L'état sauvegardé, ou None si le fichier est absent ou illisible.
+    """
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_checkpoint(path: str, state: dict):
+    """
+        Sauvegarde atomiquement un point de reprise.
+
+        L'état est écrit dans un fichier temporaire puis substitué au précédent avec
+        `os.replace` : un arrêt brutal laisse toujours un point de reprise complet.
+
+        :param path: str - Le chemin du fichier de point de reprise.
+        :param state: dict - L'état à sauvegarder (fichier suivi, inode, position en octets).
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+from html import escape
+from pathlib import Path
+from string import Template
+
+from app.models.alerts_model import Alert
+
+HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>$title</title>
+    <style>
+        body { font-family: Arial, sans-serif; background: #f8f9fa; color: #333; margin: 20px; }
+        h1 { color: #c0392b; }
+        .stats-table, .alert-table { border-collapse: collapse; width: 50%; margin-top: 20px; }
+        .alert-table { width: 100%; background: #fff3cd; }
+        .stats-table th, .stats-table td, .alert-table th, .alert-table td { border: 1px solid #ccc; padding: 8px; text-align: left; }
+        .stats-table th, .alert-table th { background-color: #f1f1f1; }
+        img { border: 1px solid #ccc; margin-top: 20px; display: block; margin-left: auto; margin-right: auto; max-height: 600px; }
+        select, button { padding: 5px; margin: 10px 0; border-radius: 4px; border: 1px solid #ccc; }
+    </style>
+</head>
+<body>
+    <h1>$title</h1>
+""")
+
+FILTER = """
+    <h2>Filtrage interactif</h2>
+    <label for="filter">Afficher uniquement les événements de niveau :</label>
+    <select id="filter" onchange="filterTable()">
+        <option value="ALL">Tous</option>
+        <option value="INFO">INFO</option>
+        <option value="WARNING">WARNING</option>
+        <option value="ERROR">ERROR</option>
+        <option value="CRITICAL">CRITICAL</option>
+    </select>
+"""
+
+ALERTS_TITLE = """
+    <h2>Alertes détectées</h2>
+"""
+
+PAGER = """    <div class="pager">
+        <button type="button" onclick="showPage(reportPages.current - 1)">&larr;</button>
+        <span id="pageLabel">Page 1</span>
+        <button type="button" onclick="showPage(reportPages.current + 1)">&rarr;</button>
+    </div>
+"""
+
+ALERTS_HEAD = """    <table class="alert-table">
+    <thead><tr><th>Déclenchement</th><th>Règle</th><th>Clé</th><th>Événements</th><th>Niveaux</th></tr></thead>
+    <tbody id="alertRows">
+"""
+
+ALERTS_FOOT = """    </tbody>
+    </table>
+"""
+
+# Pages d'alertes chargées à la demande par une balise <script> (compatible avec file://, contrairement à fetch)
+SCRIPT = Template("""
+    <script>
+    var reportPages = {total: $pages, current: 1, directory: $directory};
+
+    function alertRow(row) {
+        var tr = document.createElement("tr");
+        tr.setAttribute("data-level", row[4]);
+        row.forEach(function(value) {
+            var td = document.createElement("td");
+            td.textContent = value;
+            tr.appendChild(td);
+        });
+        return tr;
+    }
+
+    function reportPage(number, rows) {
+        var body = document.getElementById("alertRows");
+        body.textContent = "";
+        rows.forEach(function(row) { body.appendChild(alertRow(row)); });
+        reportPages.current = number;
+        document.getElementById("pageLabel").textContent = "Page " + number + " / " + Math.max(reportPages.total, 1);
+        filterTable();
+    }
+
+    function showPage(number) {
+        if (number < 1 || number > reportPages.total) return;
+        var script = document.createElement("script");
+        script.src = reportPages.directory + "/alerts_" + String(number).padStart(5, "0") + ".js";
+        script.onload = function() { script.remove(); };
+        document.body.appendChild(script);
+    }
+
+    function filterTable() {
+        var select = document.getElementById("filter");
+        var filter = select ? select.value : "ALL";
+        document.querySelectorAll(".stats-table tbody tr").forEach(function(row) {
+            var level = row.cells[0].textContent.toUpperCase();
+            row.style.display = (filter === "ALL" || level === filter) ? "" : "none";
+        });
+        document.querySelectorAll("#alertRows tr").forEach(function(row) {
+            var levels = row.getAttribute("data-level").split(" ");
+            row.style.display = (filter === "ALL" || levels.indexOf(filter) >= 0) ? "" : "none";
+        });
+    }
+
+    document.getElementById("pageLabel").textContent = "Page 1 / " + Math.max(reportPages.total, 1);
+    </script>
+""")
+
+FOOT = """</body>
+</html>
+"""
+
+
+def alert_row(alert: Alert) -> list:
+    """
+        Ligne du tableau des alertes : déclenchement, règle, clé, nombre d'événements et niveaux.
+
+        :param alert: Alert - L'alerte.
+        :return: list - Les valeurs de la ligne (sérialisables en JSON).
+    """
+    levels = " ".join(sorted({e.level for e in alert.events}))
+    key = "" if alert.key is None else str(alert.key)
+    return [alert.triggered_at.isoformat(), alert.rule or "default", key, len(alert.events), levels]
+
+
+class HtmlReportWriter:
+    """
+        Écrivain de rapport HTML en flux.
+
+        Le document est écrit section par section dans un fichier temporaire, publié
+        atomiquement à la fermeture. Les alertes sont découpées en pages de `page_size`
+        lignes : la première page est écrite dans le document, et chaque page est aussi
+        écrite dans un segment JSON (`<rapport>_data/alerts_NNNNN.js`) chargé à la demande
+        par la page. Seule une page d'alertes est en mémoire pendant la génération et le
+        navigateur n'affiche jamais plus d'une page à la fois.
+
+        Attributs :
+        - output : Path - Le chemin du rapport HTML.
+        - data_dir : Path - Le répertoire des segments d'alertes.
+        - page_size : int - Nombre d'alertes par page.
+        - pages : int - Nombre de pages d'alertes écrites.
+        - alerts : int - Nombre d'alertes écrites.
+    """
+    def __init__(self, output: str, page_size: int = 500):
+        """
+            Initialise l'écrivain.
+
+            :param output: str - Le chemin du rapport HTML.
+            :param page_size: int - Nombre d'alertes par page.
+        """
+        self.output = Path(output)
+        self.data_dir = self.output.with_name(f"{self.output.stem}_data")
+        self.page_size = max(1, page_size)
+        self.pages = 0
+        self.alerts = 0
+        self._tmp_path = self.output.with_name(f"{self.output.name}.tmp")
+        self._file = None
+
+    def __enter__(self) -> "HtmlReportWriter":
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(self.data_dir, ignore_errors=True)  # Segments d'une génération précédente
+        self.data_dir.mkdir()
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.output)
+        else:
+            os.remove(self._tmp_path)
+
+    def write(self, section: Template | str, **values):
+        """
+            Écrit une section du document.
+
+            :param section: Template | str - Le gabarit de la section (ou du HTML déjà prêt).
+            :param values: Les valeurs du gabarit (échappées par l'appelant).
+        """
+        self._file.write(section.substitute(values) if isinstance(section, Template) else section)
+
+    def write_alerts(self, alerts, pager: bool = True):
+        """
+            Écrit le tableau des alertes en flux, page par page.
+
+            :param alerts: Iterable[Alert] - Les alertes (un générateur suffit, par exemple `iter_alerts`).
+            :param pager: bool - Afficher les boutons de navigation entre les pages.
+        """
+        self.write(ALERTS_TITLE)
+        if pager:
+            self.write(PAGER)
+        self.write(ALERTS_HEAD)
+        page = []
+        for alert in alerts:
+            page.append(alert_row(alert))
+            if len(page) >= self.page_size:
+                self._write_page(page)
+                page = []
+        if page or not self.pages:
+            self._write_page(page)
+        self.write(ALERTS_FOOT)
+
+    def _write_page(self, rows: list):
+        """Écrit un segment de page et, pour la première page, ses lignes dans le document"""
+        self.pages += 1
+        self.alerts += len(rows)
+        if self.pages == 1:
+            self.write("".join(
+                f'    <tr data-level="{escape(row[4])}">{"".join(f"<td>{escape(str(v))}</td>" for v in row)}</tr>\n'
+                for row in rows
+            ))
+        segment = self.data_dir / f"alerts_{self.pages:05d}.js"
+        with open(segment, "w", encoding="utf-8") as f:
+            f.write(f"reportPage({self.pages}, {json.dumps(rows)});\n")
+
+    def write_script(self):
+        """Écrit le script de pagination et de filtrage (après les alertes : le nombre de pages est connu)"""
+        directory = json.dumps(self.data_dir.name).replace("</", "<\\/")
+        self.write(SCRIPT, pages=self.pages, directory=directory)
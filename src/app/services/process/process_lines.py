@@ -1,25 +1,133 @@
 import asyncio
-import json
+import sys
 
 
 from app.models.event_model import Event
 from app.providers.alerts_provider import save_alerts
+from app.services.alert_sink import AlertSink
 from app.services.events_analyzer import EventAnalyzer
+from app.services.metrics import NULL_METRICS, Metrics
+from app.services.suppression import Suppressor
 
 
-async def process_lines(queue: asyncio.Queue, analyzer: EventAnalyzer, alert_path: str = "alerts.json"):
-    """Consomme les lignes de la queue, analyse les événements et sauvegarde les alertes"""
+def describe_alert(alert) -> str:
+    """Ligne affichée pour une alerte (avec le nombre d'occurrences d'une synthèse)"""
+    repeats = f", {alert.count} occurrences depuis {alert.first_triggered_at}" if alert.count != 1 else ""
+    return f"\033[32m[*] Alerte : {alert.triggered_at} ({len(alert.events)} événements{repeats})\033[0m"
+
+
+def emit_alert(alert, alert_path: str, sink: AlertSink | None):
+    """Transmet une alerte au puits asynchrone, ou la sauvegarde directement en l'absence de puits"""
+    if sink is None:
+        save_alerts(alert, alert_path)
+    else:
+        sink.submit(alert.to_dict())
+
+
+async def process_lines(queue: asyncio.Queue, analyzer: EventAnalyzer, alert_path: str = "alerts.json",
+                        metrics: Metrics = NULL_METRICS, source: str | None = None, sink: AlertSink | None = None,
+                        suppressor: Suppressor | None = None):
+    """
+        Consomme les lignes de la queue, analyse les événements et sauvegarde les alertes.
+
+        Si `source` est fourni, la queue contient des couples (position, ligne) et les alertes
+        référencent leurs événements par position dans ce fichier au lieu de les recopier.
+        Avec un puits (`sink`), les alertes sont écrites en arrière-plan, sans bloquer la boucle.
+        Avec `suppressor`, les alertes répétées sont regroupées avant d'être transmises ; chaque
+        événement fait avancer son horloge, si bien que la synthèse d'une rafale suivie d'un
+        silence est transmise dès la fin de la période, sans attendre une nouvelle alerte.
+    """
+    timed = metrics.enabled  # Métriques désactivées : aucune lecture d'horloge
     while True:
+        waiting = metrics.clock() if timed else 0.0
         line = await queue.get()
         try:
-            raw = json.loads(line)  # Convertir la ligne en JSON
-            event = Event(raw)  # Créer un événement à partir des données
+            if timed:
+                received = metrics.since("stage_seconds", waiting, "queue_wait")
+                enqueued = getattr(queue, "enqueued_at", received)  # Mise en queue (`TimedQueue`), sinon retrait
+            offset = None
+            if source:
+                offset, line = line
+            event = Event.from_line(line, offset=offset)  # Décoder la ligne JSON en événement
+            if timed:
+                start = metrics.since("stage_seconds", received, "decode")
             print(event)  # Afficher l'événement
-            alert = analyzer.analyze(event)  # Analyser l'événement pour détecter une alerte
-            if alert:
-                print(f"\033[32m[*] Alerte : {alert.triggered_at} ({len(alert.events)} événements)\033[0m")
-                save_alerts(alert, alert_path)  # Sauvegarder l'alerte
+            if timed:
+                start = metrics.since("stage_seconds", start, "output")
+            alerts = analyzer.evaluate(event)  # Analyser l'événement pour détecter des alertes
+            if suppressor:
+                alerts = suppressor.filter(alerts, event.epoch_ns)
+            if timed:
+                start = metrics.since("stage_seconds", start, "analyze")
+                metrics.inc("events_total")
+            for alert in alerts:
+                alert.source = source
+                print(describe_alert(alert))
+                emit_alert(alert, alert_path, sink)  # Sauvegarder l'alerte
+            if timed and alerts:
+                metrics.inc("alerts_total", len(alerts))
+                metrics.since("stage_seconds", start, "save")
+                metrics.since("alert_latency_seconds", enqueued)
         except Exception as e:
+            metrics.inc("errors_total")
             print(f"\033[35m[-] Erreur : {e}\033[35m")  # Afficher l'erreur en cas d'exception
         finally:
             queue.task_done()  # Marquer la tâche comme terminée
+
+
+async def process_batches(queue: asyncio.Queue, analyzer: EventAnalyzer, alert_path: str = "alerts.json", echo: bool = False,
+                          metrics: Metrics = NULL_METRICS, source: str | None = None, sink: AlertSink | None = None,
+                          suppressor: Suppressor | None = None):
+    """
+        Consomme des lots de lignes, les analyse en bloc et sauvegarde les alertes (mode débit).
+
+        Si `source` est fourni, les lots contiennent des couples (position, ligne), comme pour `process_lines`.
+        Avec un puits (`sink`), les alertes sont écrites en arrière-plan ; avec `suppressor`,
+        les alertes répétées sont regroupées.
+    """
+    timed = metrics.enabled
+    while True:
+        waiting = metrics.clock() if timed else 0.0
+        batch = await queue.get()
+        try:
+            if timed:
+                received = metrics.since("stage_seconds", waiting, "queue_wait")
+                enqueued = getattr(queue, "enqueued_at", received)  # Mise en queue (`TimedQueue`), sinon retrait
+            events = []
+            errors = 0
+            for item in batch:
+                try:
+                    if source:
+                        events.append(Event.from_line(item[1], offset=item[0]))
+                    else:
+                        events.append(Event.from_line(item))
+                except Exception:
+                    errors += 1  # Ligne invalide ignorée, comptée pour le résumé
+            if timed:
+                start = metrics.since("stage_seconds", received, "decode")
+            if echo:
+                sys.stdout.write("".join(f"{event}\n" for event in events))  # Une seule écriture par lot
+            if errors:
+                metrics.inc("errors_total", errors)
+                print(f"\033[35m[-] {errors} ligne(s) invalide(s) ignorée(s)\033[35m")
+            if timed:
+                start = metrics.since("stage_seconds", start, "output")
+            alerts = analyzer.analyze_batch(events)
+            if suppressor:
+                alerts = suppressor.filter(alerts, events[-1].epoch_ns if events else None)
+            if timed:
+                start = metrics.since("stage_seconds", start, "analyze")
+                metrics.inc("events_total", len(events))
+            for alert in alerts:
+                alert.source = source
+                print(describe_alert(alert))
+                emit_alert(alert, alert_path, sink)
+            if timed and alerts:
+                metrics.inc("alerts_total", len(alerts))
+                metrics.since("stage_seconds", start, "save")
+                metrics.since("alert_latency_seconds", enqueued)
+        except Exception as e:
+            metrics.inc("errors_total")
+            print(f"\033[35m[-] Erreur : {e}\033[35m")
+        finally:
+            queue.task_done()
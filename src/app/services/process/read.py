@@ -1,13 +1,340 @@
 import asyncio
+import heapq
+import os
+import time
 
 import aiofiles
 
+from app.providers.log_sources import read_keyed_chunks
+from .checkpoint import load_checkpoint, save_checkpoint
+from .snapshot import Snapshotter
 
-async def read_lines(file_path: str, queue: asyncio.Queue, delay: float = 2.0):
-    """Lit un fichier ligne par ligne avec un délai simulé entre chaque ligne"""
+
+async def read_lines(file_path: str, queue: asyncio.Queue, delay: float = 0.0, offsets: bool = False,
+                     start: int = 0, snapshot: Snapshotter | None = None):
+    """
+        Lit un fichier ligne par ligne, avec un délai simulé optionnel entre chaque ligne.
+
+        Avec `offsets`, chaque élément de la queue est un couple (position en octets, ligne),
+        afin que les alertes puissent référencer leurs événements dans le fichier.
+        Avec `snapshot`, la lecture commence à la position `start` (reprise) et un instantané
+        du pipeline est pris périodiquement, puis en fin de fichier.
+    """
+    if offsets or start or snapshot:
+        position = start
+        async with aiofiles.open(file_path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            await f.seek(start)
+            async for raw in f:
+                if delay:
+                    await asyncio.sleep(delay)
+                line_start, position = position, position + len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    await queue.put((line_start, line) if offsets else line)
+                if snapshot and snapshot.due():
+                    await snapshot.save(file_path, inode, position)
+            if snapshot:
+                await snapshot.save(file_path, inode, position)
+        return
     async with aiofiles.open(file_path, "r") as f:
         async for line in f:
-            await asyncio.sleep(delay)  # Introduire un délai entre chaque ligne
+            if delay:
+                await asyncio.sleep(delay)  # Introduire un délai entre chaque ligne
             line = line.strip()  # Retirer les espaces superflus
             if line:
                 await queue.put(line)  # Ajouter la ligne à la queue pour traitement
+
+
+async def read_batches(file_path: str, queue: asyncio.Queue, batch_size: int = 1000, chunk_size: int = 1 << 20,
+                       offsets: bool = False, start: int = 0, snapshot: Snapshotter | None = None):
+    """
+        Lit le fichier par blocs et place des lots de lignes dans la queue (mode débit).
+
+        Avec `offsets`, les lots contiennent des couples (position en octets, ligne). Avec
+        `snapshot`, la lecture commence à la position `start` et un instantané du pipeline
+        est pris périodiquement entre deux lots, puis en fin de fichier.
+    """
+    if offsets or start or snapshot:
+        await _read_batches_binary(file_path, queue, batch_size, chunk_size, offsets, start, snapshot)
+        return
+    remainder = ""
+    batch = []
+    async with aiofiles.open(file_path, "r") as f:
+        while True:
+            chunk = await f.read(chunk_size)  # Lire un bloc entier plutôt qu'une ligne
+            if not chunk:
+                break
+            lines = (remainder + chunk).split("\n")
+            remainder = lines.pop()  # La dernière ligne peut être incomplète
+            for line in lines:
+                line = line.strip()
+                if line:
+                    batch.append(line)
+                    if len(batch) >= batch_size:
+                        await queue.put(batch)  # Bloque si la queue est pleine (contre-pression)
+                        batch = []
+    remainder = remainder.strip()
+    if remainder:
+        batch.append(remainder)
+    if batch:
+        await queue.put(batch)
+
+
+async def _read_batches_binary(file_path: str, queue: asyncio.Queue, batch_size: int, chunk_size: int,
+                               offsets: bool, start: int, snapshot: Snapshotter | None):
+    """Variante binaire de `read_batches`, qui suit la position en octets des lignes"""
+    remainder = b""
+    position = start
+    batch = []
+    async with aiofiles.open(file_path, "rb") as f:
+        inode = os.fstat(f.fileno()).st_ino
+        await f.seek(start)
+        while True:
+            chunk = await f.read(chunk_size)
+            if not chunk:
+                break
+            *complete, remainder = (remainder + chunk).split(b"\n")
+            for raw in complete:
+                line_start, position = position, position + len(raw) + 1
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    batch.append((line_start, line) if offsets else line)
+                    if len(batch) >= batch_size:
+                        await queue.put(batch)
+                        batch = []
+                        if snapshot and snapshot.due():
+                            await snapshot.save(file_path, inode, position)  # Après le lot transmis
+    line = remainder.decode("utf-8", errors="replace").strip()
+    if line:
+        batch.append((position, line) if offsets else line)
+    if batch:
+        await queue.put(batch)
+    if snapshot:
+        await snapshot.save(file_path, inode, position + len(remainder))
+
+
+async def _enqueue(queue: asyncio.Queue, lines: list[str], batch_size: int | None):
+    """Place les lignes dans la queue, une par une ou par lots de `batch_size`"""
+    if batch_size:
+        for i in range(0, len(lines), batch_size):
+            await queue.put(lines[i:i + batch_size])
+    else:
+        for line in lines:
+            await queue.put(line)
+
+
+def _split_lines(buffer: bytes, chunk: bytes, offset: int, offsets: bool) -> tuple[list, bytes, int]:
+    """
+        Découpe un bloc lu en lignes complètes, la dernière ligne incomplète restant en attente.
+
+        :param buffer: bytes - La ligne incomplète du bloc précédent.
+        :param chunk: bytes - Le bloc lu.
+        :param offset: int - La position en octets du début de `buffer`.
+        :param offsets: bool - Produire des couples (position en octets, ligne) plutôt que des lignes.
+        :return: tuple[list, bytes, int] - Les lignes, la nouvelle ligne incomplète et la position qui la précède.
+    """
+    *complete, buffer = (buffer + chunk).split(b"\n")
+    lines = []
+    for raw in complete:
+        start, offset = offset, offset + len(raw) + 1
+        line = raw.decode("utf-8", errors="replace").strip()
+        if line:
+            lines.append((start, line) if offsets else line)
+    return lines, buffer, offset
+
+
+async def follow_lines(
+    file_path: str,
+    queue: asyncio.Queue,
+    poll_interval: float = 0.5,
+    checkpoint_path: str | None = None,
+    batch_size: int | None = None,
+    chunk_size: int = 1 << 16,
+    stop: asyncio.Event | None = None,
+    offsets: bool = False,
+    snapshot: Snapshotter | None = None,
+    resume: dict | None = None,
+    checkpoint_interval: float = 5.0,
+):
+    """
+        Suit un fichier log en continu, à la manière de `tail -F`.
+
+        Le fichier est interrogé toutes les `poll_interval` secondes lorsqu'aucune donnée
+        n'est disponible. Une rotation (changement d'inode ou suppression) provoque la
+        réouverture du nouveau fichier depuis le début, une fois l'ancien lu jusqu'au bout
+        (l'écrivain peut y ajouter des lignes après le renommage) ; une troncature provoque
+        la reprise à zéro. Si `checkpoint_path` est fourni, la position en octets de la
+        dernière ligne traitée est sauvegardée, après vidage de la queue, à chaque fois que la
+        fin du fichier est atteinte et au plus toutes les `checkpoint_interval` secondes
+        pendant la lecture : un redémarrage reprend là où le traitement s'était arrêté, même
+        si le fichier est alimenté sans interruption.
+
+        :param file_path: str - Le chemin du fichier log à suivre.
+        :param queue: asyncio.Queue - La queue recevant les lignes (ou les lots de lignes).
+        :param poll_interval: float - Délai d'attente (en secondes) en fin de fichier.
+        :param checkpoint_path: str | None - Le chemin du fichier de point de reprise.
+        :param batch_size: int | None - Taille des lots de lignes ; None pour des lignes seules.
+        :param chunk_size: int - Nombre d'octets lus à chaque lecture.
+        :param stop: asyncio.Event | None - Événement permettant d'arrêter le suivi.
+        :param offsets: bool - Transmettre des couples (position en octets, ligne) plutôt que des lignes.
+        :param snapshot: Snapshotter | None - Instantanés du pipeline, pris périodiquement et en fin de fichier.
+        :param resume: dict | None - Position de reprise d'un instantané restauré (prioritaire sur le point de reprise).
+        :param checkpoint_interval: float - Délai minimal entre deux points de reprise pendant la lecture, en secondes.
+    """
+    state = resume or (load_checkpoint(checkpoint_path) if checkpoint_path else None)
+    f = None
+    inode = None
+    offset = 0  # Position en octets après la dernière ligne complète transmise
+    saved_offset = None
+    saved_at = time.monotonic()
+    buffer = b""
+
+    async def save_position():
+        """Sauvegarde la position courante une fois les lignes transmises traitées"""
+        nonlocal saved_offset, saved_at
+        await queue.join()
+        save_checkpoint(checkpoint_path, {"file": os.path.abspath(file_path), "inode": inode, "offset": offset})
+        saved_offset, saved_at = offset, time.monotonic()
+
+    try:
+        while stop is None or not stop.is_set():
+            if f is None:
+                try:
+                    f = await aiofiles.open(file_path, "rb")
+                except FileNotFoundError:
+                    await asyncio.sleep(poll_interval)  # Fichier en cours de rotation
+                    continue
+                stat = os.fstat(f.fileno())
+                inode = stat.st_ino
+                offset = 0
+                if state and state.get("inode") == inode and state.get("offset", 0) <= stat.st_size:
+                    offset = state["offset"]  # Reprise depuis le point de sauvegarde
+                state = None
+                saved_offset = offset
+                buffer = b""
+                await f.seek(offset)
+
+            chunk = await f.read(chunk_size)
+            if chunk:
+                lines, buffer, offset = _split_lines(buffer, chunk, offset, offsets)
+                await _enqueue(queue, lines, batch_size)
+                if snapshot and snapshot.due():
+                    await snapshot.save(file_path, inode, offset)
+                if checkpoint_path and time.monotonic() - saved_at >= checkpoint_interval:
+                    await save_position()  # Lecture continue : la fin du fichier peut ne jamais être atteinte
+                continue
+
+            # Fin de fichier : sauvegarder la position une fois les lignes traitées
+            if (checkpoint_path or snapshot) and offset != saved_offset:
+                if checkpoint_path:
+                    await save_position()
+                if snapshot:
+                    await snapshot.save(file_path, inode, offset)
+                saved_offset = offset
+
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or stat.st_ino != inode:
+                # Rotation : l'écrivain a pu compléter l'ancien fichier depuis la dernière lecture
+                while chunk := await f.read(chunk_size):
+                    lines, buffer, offset = _split_lines(buffer, chunk, offset, offsets)
+                    await _enqueue(queue, lines, batch_size)
+                line = buffer.decode("utf-8", errors="replace").strip()
+                if line:
+                    await _enqueue(queue, [(offset, line) if offsets else line], batch_size)
+                await f.close()
+                f = None
+                continue
+            if stat.st_size < offset + len(buffer):
+                # Troncature : reprendre depuis le début du fichier
+                offset = 0
+                buffer = b""
+                await f.seek(0)
+                continue
+            await asyncio.sleep(poll_interval)
+    finally:
+        if f is not None:
+            await f.close()
+
+
+async def _read_source(chunks, inbox: asyncio.Queue):
+    """Lit les blocs d'un fichier dans un thread et les transmet à la fusion (None en fin de fichier)"""
+    while True:
+        try:
+            chunk = await asyncio.to_thread(next, chunks, None)  # Lecture et décompression hors de la boucle
+        except Exception as e:
+            await inbox.put(e)  # Fichier illisible (archive corrompue...) : l'erreur remonte à la fusion
+            return
+        await inbox.put(chunk)  # Un seul bloc d'avance par fichier
+        if chunk is None:
+            return
+
+
+async def _next_chunk(inbox: asyncio.Queue):
+    """Bloc suivant d'un fichier (None en fin de fichier)"""
+    chunk = await inbox.get()
+    if isinstance(chunk, Exception):
+        raise chunk
+    return chunk
+
+
+async def read_merged(file_paths: list[str], queue: asyncio.Queue, batch_size: int | None = None,
+                      chunk_size: int = 1 << 20):
+    """
+        Lit plusieurs fichiers log en parallèle et place leurs lignes dans la queue par ordre chronologique.
+
+        Chaque fichier (compressé par gzip ou non) est lu et décompressé par bloc dans un
+        thread (`read_keyed_chunks`), avec au plus un bloc d'avance : la mémoire reste
+        bornée à quelques blocs par fichier, quelle que soit leur taille. Les flux, supposés
+        chronologiques chacun, sont fusionnés par un tas (fusion k-voies sur l'horodatage)
+        avant d'atteindre l'analyseur, de sorte que les fenêtres de détection voient les
+        événements de tous les fichiers dans l'ordre. À horodatage égal, l'ordre des
+        fichiers est conservé.
+
+        :param file_paths: list[str] - Les fichiers log (voir `resolve_sources`).
+        :param queue: asyncio.Queue - La queue recevant les lignes (ou les lots de lignes).
+        :param batch_size: int | None - Taille des lots de lignes ; None pour des lignes seules.
+        :param chunk_size: int - Nombre d'octets (décompressés) lus à chaque lecture d'un fichier.
+    """
+    inboxes = [asyncio.Queue(maxsize=1) for _ in file_paths]
+    readers = [
+        asyncio.create_task(_read_source(read_keyed_chunks(path, chunk_size), inbox))
+        for path, inbox in zip(file_paths, inboxes)
+    ]
+    try:
+        chunks, heap = [], []
+        for source, inbox in enumerate(inboxes):
+            chunk = await _next_chunk(inbox)
+            chunks.append(chunk)
+            if chunk:
+                heap.append((chunk[0][0], source, 0))
+        heapq.heapify(heap)
+
+        batch = []
+        while heap:
+            _, source, position = heap[0]
+            chunk = chunks[source]
+            line = chunk[position][1].decode("utf-8", errors="replace").strip()
+            if batch_size:
+                batch.append(line)
+                if len(batch) >= batch_size:
+                    await queue.put(batch)  # Contre-pression : la fusion attend le consommateur
+                    batch = []
+            else:
+                await queue.put(line)
+            position += 1
+            if position == len(chunk):
+                chunk = chunks[source] = await _next_chunk(inboxes[source])
+                position = 0
+                if chunk is None:
+                    heapq.heappop(heap)  # Fichier épuisé
+                    continue
+            heapq.heapreplace(heap, (chunk[position][0], source, position))
+        if batch:
+            await queue.put(batch)
+    finally:
+        for reader in readers:
+            reader.cancel()
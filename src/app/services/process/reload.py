@@ -0,0 +1,76 @@
+import asyncio
+import signal
+
+from app.configs.config import Config
+from app.services.events_analyzer import EventAnalyzer, load_rules
+
+
+def apply_reload(config: Config, analyzer: EventAnalyzer | None = None) -> list[str]:
+    """
+        Recharge la configuration et recalibre l'analyseur si ses paramètres ont changé.
+
+        Les règles sont reconstruites depuis la section `event_analyzer` ; chaque règle
+        conservée (même nom, même type, même regroupement) reprend les fenêtres en cours, si
+        bien qu'aucun état n'est perdu. Les autres paramètres ne s'appliquent qu'au prochain
+        lancement. Un fichier invalide laisse la configuration courante en place.
+
+        :param config: Config - La configuration à recharger.
+        :param analyzer: EventAnalyzer | None - L'analyseur à recalibrer.
+        :return: list[str] - Les clés modifiées.
+    """
+    try:
+        changed = config.reload()
+    except (OSError, ValueError) as e:
+        print(f"\033[31m[-] Configuration non rechargée : {e}\033[0m")
+        return []
+    if not changed:
+        return changed
+    tuned = [key for key in changed if key.startswith("event_analyzer.")]
+    if tuned and analyzer is not None:
+        try:
+            analyzer.retune(load_rules(config))
+        except (TypeError, ValueError) as e:
+            print(f"\033[31m[-] Règles invalides, analyseur inchangé : {e}\033[0m")
+            tuned = []
+    if tuned:
+        print(f"\033[36m[~] Analyseur recalibré : {', '.join(tuned)}\033[0m")
+    pending = [key for key in changed if key not in tuned]
+    if pending:
+        print(f"\033[33m[~] Configuration rechargée, appliquée au prochain lancement : {', '.join(pending)}\033[0m")
+    return changed
+
+
+async def watch_config(config: Config, analyzer: EventAnalyzer | None = None, interval: float = 1.0):
+    """
+        Recharge la configuration à chaud, sur réception de SIGHUP ou modification du fichier.
+
+        Le fichier de configuration est surveillé toutes les `interval` secondes (date de
+        modification). Le rechargement a lieu dans la boucle d'événements, entre deux
+        événements analysés : l'analyseur n'est jamais recalibré au milieu d'un lot.
+
+        :param config: Config - La configuration à surveiller.
+        :param analyzer: EventAnalyzer | None - L'analyseur à recalibrer.
+        :param interval: float - Intervalle de surveillance du fichier, en secondes.
+    """
+    loop = asyncio.get_running_loop()
+    requested = asyncio.Event()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, requested.set)
+        handled = True
+    except (AttributeError, NotImplementedError, RuntimeError):
+        handled = False  # Pas de SIGHUP (Windows) ou boucle hors du thread principal
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(requested.wait(), interval)
+            except asyncio.TimeoutError:  # Distinct de TimeoutError avant Python 3.11
+                if not config.file_changed():
+                    continue
+            requested.clear()
+            try:
+                apply_reload(config, analyzer)
+            except Exception as e:  # La surveillance ne doit pas s'arrêter sur un rechargement raté
+                print(f"\033[31m[-] Rechargement de la configuration impossible : {e}\033[0m")
+    finally:
+        if handled:
+            loop.remove_signal_handler(signal.SIGHUP)
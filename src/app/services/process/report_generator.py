@@ -1,34 +1,49 @@
+import os
 import webbrowser
 from datetime import datetime
+from html import escape
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import pandas as pd
 from fpdf import FPDF
 
 from app.models.alerts_model import Alert
-from app.models.event_model import Event
+from app.services.charts import ChartCache
+from app.services.process.html_report import FILTER, FOOT, HEAD, HtmlReportWriter
+from app.services.report_stats import ReportStats
 
 
-def plot_event_distribution(events: list[Event], output="reports/event_distribution.png"):
-    df = pd.DataFrame([e.raw for e in events])
-    df['level'] = df['level'].str.upper()
-    counts = df['level'].value_counts()
-    plt.figure(figsize=(8, 6))
-    counts.plot(kind='bar', color='#3498db', edgecolor='black')
-    plt.title("Distribution des niveaux d'événements")
-    plt.xlabel("Niveau")
-    plt.ylabel("Nombre")
-    plt.xticks(rotation=0)
-    plt.tight_layout()
-    Path(output).parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output)
-
-def generate_pdf(events: list[Event], alerts: list[Alert], graph_path="reports/event_distribution.png", output_dir="reports"):
-    total = len(events)
-    critical = sum(1 for e in events if e.level == "CRITICAL")
+def report_charts(stats: ReportStats, cache: ChartCache) -> tuple[str, str]:
+    """
+        Rend (ou retrouve dans le cache) les graphiques d'un rapport.
 
-    plot_event_distribution(events, graph_path)
+        :param stats: ReportStats - Les statistiques du rapport.
+        :param cache: ChartCache - Le cache des graphiques.
+        :return: tuple[str, str] - Les images de la distribution des niveaux et du débit par minute.
+    """
+    distribution, rate = cache.render([
+        ("distribution", {"levels": stats.levels, "counts": stats.counts}),
+        ("rate", {"times": stats.times, "rate": stats.rate, "alert_rate": stats.alert_rate}),
+    ])
+    return distribution, rate
+
+def rate_summary(stats: ReportStats) -> list[str]:
+    """Lignes de synthèse du débit et de la densité d'alertes, communes aux rapports PDF et HTML"""
+    p = stats.rate_percentiles
+    sizes = stats.alert_size_percentiles
+    return [
+        f"Débit (événements/min) : p50 {p[50]:.1f} - p90 {p[90]:.1f} - p99 {p[99]:.1f} - max {stats.peak_rate:.1f}",
+        f"Densité d'alertes : {stats.alerts_per_1000_events:.2f} pour 1000 événements, {stats.alerts_per_hour:.2f} par heure",
+        f"Événements par alerte : p50 {sizes[50]:.0f} - p90 {sizes[90]:.0f} - p99 {sizes[99]:.0f}",
+    ]
+
+def stats_table_html(stats: ReportStats) -> str:
+    """Tableau HTML des statistiques par niveau"""
+    rows = "".join(f"<tr><td>{escape(level)}</td><td>{count}</td></tr>" for level, count in stats.level_rows())
+    return (f'<table class="stats-table"><thead><tr><th>Niveau</th><th>Nombre</th></tr></thead>'
+            f"<tbody>{rows}</tbody></table>")
+
+def generate_pdf(stats: ReportStats, alerts: list[Alert], output_dir="reports", cache: ChartCache | None = None):
+    distribution_path, rate_path = report_charts(stats, cache or ChartCache(f"{output_dir}/charts"))
 
     # Générer un nom de fichier basé sur la date actuelle
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -39,19 +54,15 @@ def generate_pdf(events: list[Event], alerts: list[Alert], graph_path="reports/e
     pdf.set_font("Arial", size=12)
     pdf.cell(200, 10, "Rapport de Surveillance", ln=True, align="C")
     pdf.ln(10)
-    pdf.cell(200, 10, f"Total événements : {total}", ln=True)
-    pdf.cell(200, 10, f"Événements critiques : {critical}", ln=True)
+    pdf.cell(200, 10, f"Total événements : {stats.total}", ln=True)
+    pdf.cell(200, 10, f"Événements critiques : {stats.critical}", ln=True)
     pdf.cell(200, 10, f"Alertes : {len(alerts)}", ln=True)
+    for line in rate_summary(stats):
+        pdf.cell(200, 10, line, ln=True)
     pdf.ln(10)
 
-    df = pd.DataFrame([e.raw for e in events])
-    df['level'] = df['level'].str.upper()
-    counts = df['level'].value_counts().reset_index()
-    counts.columns = ["Niveau", "Nombre"]
-    moyenne = round(counts["Nombre"].mean(), 2)
-
     pdf.set_font("Arial", style='B', size=12)
-    pdf.cell(0, 10, f"Statistiques par niveau (moyenne: {moyenne})", ln=True, align="C")
+    pdf.cell(0, 10, f"Statistiques par niveau (moyenne: {stats.mean})", ln=True, align="C")
     pdf.ln(5)
 
     # Table setup
@@ -66,10 +77,10 @@ def generate_pdf(events: list[Event], alerts: list[Alert], graph_path="reports/e
     pdf.ln()
 
     pdf.set_font("Arial", size=11)
-    for _, row in counts.iterrows():
+    for level, count in stats.level_rows():
         pdf.set_x(margin_left)
-        pdf.cell(col_width, 8, str(row["Niveau"]), border=1, align="C")
-        pdf.cell(col_width, 8, str(row["Nombre"]), border=1, align="C")
+        pdf.cell(col_width, 8, level, border=1, align="C")
+        pdf.cell(col_width, 8, str(count), border=1, align="C")
         pdf.ln()
 
     pdf.ln(10)
@@ -77,116 +88,58 @@ def generate_pdf(events: list[Event], alerts: list[Alert], graph_path="reports/e
     for alert in alerts:
         pdf.cell(200, 10, f"Alerte à {alert.triggered_at.isoformat()} ({len(alert.events)} événements)", ln=True)
 
-    pdf.image(graph_path, w=180)
+    pdf.image(distribution_path, w=180)
+    pdf.image(rate_path, w=180)
     pdf.output(output)
     print(f"\033[32m[+] Rapport PDF généré : {output}\033[0m")
 
 def generate_html(
-    events: list[Event],
-    alerts: list[Alert],
-    image_path="reports/event_distribution.png",
+    stats: ReportStats,
+    alerts,
     output="reports/report.html",
-    interactive: bool = True
+    interactive: bool = True,
+    cache: ChartCache | None = None,
+    page_size: int = 500
 ):
-    total = len(events)
-    critical = sum(1 for e in events if e.level == "CRITICAL")
-    df = pd.DataFrame([e.raw for e in events])
-    level_counts = df["level"].str.upper().value_counts()
-    stats_df = level_counts.to_frame().reset_index()
-    stats_df.columns = ["Niveau", "Nombre"]
-    moyenne = round(stats_df["Nombre"].mean(), 2)
-    stats_html = stats_df.to_html(index=False, classes="stats-table")
-
-    plot_event_distribution(events, image_path)
-
-    html = f"""
-    <html>
-    <head>
-        <title>Rapport</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; background: #f8f9fa; color: #333; margin: 20px; }}
-            h1 {{ color: #c0392b; }}
-            .stats-table {{ border-collapse: collapse; width: 50%; margin-top: 20px; }}
-            .stats-table th, .stats-table td {{ border: 1px solid #ccc; padding: 8px; text-align: left; }}
-            .stats-table th {{ background-color: #f1f1f1; }}
-            ul {{ background: #fff3cd; padding: 10px; border-radius: 5px; list-style-type: none; }}
-            ul li {{ margin: 5px 0; padding: 5px; }}
-            img {{ border: 1px solid #ccc; margin-top: 20px; display: block; margin-left: auto; margin-right: auto; max-height: 600px; }}
-            select {{ padding: 5px; margin: 10px 0; border-radius: 4px; border: 1px solid #ccc; }}
-            .fade-out {{ opacity: 0; transform: translateX(20px); transition: all 0.3s ease; }}
-            .fade-in {{ opacity: 1; transform: translateX(0); transition: all 0.3s ease; }}
-        </style>
-    </head>
-    <body>
-        <h1>Rapport de Surveillance</h1>
-        <p><b>Événements totaux :</b> {total}</p>
-        <p><b>Critiques :</b> {critical}</p>
-        <p><b>Alertes :</b> {len(alerts)}</p>
-
-        {'''
-        <h2>Filtrage interactif</h2>
-        <label for="filter">Afficher uniquement les événements de niveau :</label>
-        <select id="filter" onchange="filterTable()">
-            <option value="ALL">Tous</option>
-            <option value="INFO">INFO</option>
-            <option value="WARNING">WARNING</option>
-            <option value="ERROR">ERROR</option>
-            <option value="CRITICAL">CRITICAL</option>
-        </select>
-        ''' if interactive else ''}
-
-        <h2>Statistiques par niveau (Moyenne: {moyenne})</h2>
-        {stats_html}
-
-        <h2>Alertes détectées</h2>
-        <ul id="alertList">
-        {''.join(f"<li data-level='{e.level}'>{a.triggered_at.isoformat()} ({len(a.events)} événements)</li>" for a in alerts for e in a.events)}
-        </ul>
-
-        <h2>Graphique</h2>
-        <div style="text-align: center;">
-            <img src="{Path(image_path).name}" alt="Graphe"/>
-        </div>
-
-        {'''
-        <script>
-        function filterTable() {
-            var select = document.getElementById("filter");
-            var filter = select.value;
-
-            var rows = document.querySelectorAll(".stats-table tbody tr");
-            rows.forEach(function(row) {
-                var cell = row.cells[0].textContent.toUpperCase();
-                if (filter === "ALL" || cell === filter) {
-                    row.classList.remove("fade-out");
-                    row.classList.add("fade-in");
-                    row.style.display = "";
-                } else {
-                    row.classList.add("fade-out");
-                    setTimeout(() => { row.style.display = "none"; }, 300);
-                }
-            });
-
-            var alerts = document.querySelectorAll("#alertList li");
-            alerts.forEach(function(alert) {
-                var level = alert.getAttribute("data-level");
-                if (filter === "ALL" || level === filter) {
-                    alert.classList.remove("fade-out");
-                    alert.classList.add("fade-in");
-                    alert.style.display = "";
-                } else {
-                    alert.classList.add("fade-out");
-                    setTimeout(() => { alert.style.display = "none"; }, 300);
-                }
-            });
-        }
-        </script>
-        ''' if interactive else ''}
-    </body>
-    </html>
     """
-    Path(output).parent.mkdir(parents=True, exist_ok=True)
-    with open(output, "w") as f:
-        f.write(html)
+        Génère le rapport HTML en flux (voir `HtmlReportWriter`).
+
+        :param stats: ReportStats - Les statistiques du rapport.
+        :param alerts: Iterable[Alert] - Les alertes, parcourues une seule fois (un générateur suffit).
+        :param output: str - Le chemin du rapport HTML.
+        :param interactive: bool - Ajouter le filtrage par niveau et la navigation entre les pages d'alertes.
+        :param cache: ChartCache | None - Le cache des graphiques (par défaut `<répertoire du rapport>/charts`).
+        :param page_size: int - Nombre d'alertes par page.
+    """
+    output_dir = Path(output).parent
+    distribution_path, rate_path = report_charts(stats, cache or ChartCache(str(output_dir / "charts")))
+    # Chemins relatifs : le rapport reste lisible si le répertoire est déplacé
+    distribution_src = Path(os.path.relpath(distribution_path, output_dir)).as_posix()
+    rate_src = Path(os.path.relpath(rate_path, output_dir)).as_posix()
+
+    with HtmlReportWriter(output, page_size) as writer:
+        writer.write(HEAD, title="Rapport de Surveillance")
+        writer.write(f"""
+    <p><b>Événements totaux :</b> {stats.total}</p>
+    <p><b>Critiques :</b> {stats.critical}</p>
+    <p><b>Alertes :</b> {stats.total_alerts}</p>
+    {''.join(f"<p>{escape(line)}</p>" for line in rate_summary(stats))}
+""")
+        if interactive:
+            writer.write(FILTER)
+        writer.write(f"""
+    <h2>Statistiques par niveau (Moyenne: {stats.mean})</h2>
+    {stats_table_html(stats)}
+""")
+        writer.write_alerts(alerts, pager=interactive)
+        writer.write(f"""
+    <h2>Graphique</h2>
+    <div style="text-align: center;">
+        <img src="{escape(distribution_src)}" alt="Graphe"/>
+        <img src="{escape(rate_src)}" alt="Débit par minute"/>
+    </div>
+""")
+        if interactive:
+            writer.write_script()
+        writer.write(FOOT)
     webbrowser.open(f"file://{Path(output).resolve()}")
-
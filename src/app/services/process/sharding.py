@@ -0,0 +1,245 @@
+import asyncio
+import json
+import multiprocessing
+import queue as queue_module
+import re
+import zlib
+
+from app.configs.config import get_config
+from app.models.event_model import Event
+from app.providers.alert_store import append_record
+from app.services.alert_sink import AlertSink
+from app.services.events_analyzer import EventAnalyzer
+from app.services.metrics import NULL_METRICS, Metrics
+from app.services.rules import Rule
+from app.services.suppression import build_suppressor
+
+
+def shard_for(key, workers: int) -> int:
+    """
+        Calcule le shard d'une clé de regroupement.
+
+        `zlib.crc32` est utilisé plutôt que `hash()` : le résultat est identique d'un
+        processus et d'une exécution à l'autre. Les événements sans clé vont au shard 0.
+
+        :param key: str | None - La clé de regroupement de l'événement.
+        :param workers: int - Le nombre de shards.
+        :return: int - L'index du shard.
+    """
+    if key is None:
+        return 0
+    return zlib.crc32(str(key).encode()) % workers
+
+
+def unshardable_rules(rules: list[Rule], key_field: str | None) -> list[str]:
+    """
+        Liste les règles dont les alertes changeraient si les lignes étaient réparties selon `key_field`.
+
+        Une règle à fenêtres doit voir tous les événements de chacune de ses fenêtres : elle
+        n'est répartissable que si elle regroupe par le champ de routage. Sans champ de
+        routage, toutes les lignes vont au même shard et toutes les règles sont préservées.
+
+        :param rules: list[Rule] - Les règles de l'analyseur.
+        :param key_field: str | None - Le champ de regroupement utilisé pour le routage.
+        :return: list[str] - Les noms des règles incompatibles avec ce routage.
+    """
+    if not key_field:
+        return []
+    return [rule.name for rule in rules if rule.stateful and rule.group_by != key_field]
+
+
+def key_extractor(field: str | None):
+    """
+        Construit une fonction extrayant la valeur d'un champ d'une ligne JSON brute.
+
+        L'extraction se fait par expression régulière, sans décoder toute la ligne : le
+        décodage complet reste à la charge des processus de travail.
+
+        :param field: str | None - Le nom du champ de regroupement.
+        :return: Callable[[str], str | None] - La fonction d'extraction.
+    """
+    if not field:
+        return lambda line: None
+    pattern = re.compile(rf'"{re.escape(field)}"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}}\s]+)')
+
+    def extract(line: str):
+        match = pattern.search(line)
+        if match is None:
+            return None
+        value = match.group(1)
+        return json.loads(value) if value.startswith('"') else value
+    return extract
+
+
+def shard_worker(inbox, outbox):
+    """
+        Boucle d'un processus de travail : analyse les lots reçus avec son propre `EventAnalyzer`.
+
+        Chaque processus conserve l'état des fenêtres des clés qui lui sont attribuées. Les
+        alertes sont renvoyées sous forme de dictionnaires vers l'écrivain unique ; un `None`
+        signale la fin du flux.
+
+        :param inbox: multiprocessing.Queue - Les lots de lignes à analyser (None pour terminer).
+        :param outbox: multiprocessing.Queue - Les listes d'alertes sérialisées produites.
+    """
+    analyzer = EventAnalyzer()
+    # Les alertes d'une clé viennent toutes du même processus : la suppression y est locale
+    suppressor = build_suppressor(get_config())
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        events = []
+        for line in batch:
+            try:
+                events.append(Event.from_line(line))
+            except Exception:
+                continue
+        alerts = analyzer.analyze_batch(events)
+        if suppressor:
+            alerts = suppressor.filter(alerts, events[-1].epoch_ns if events else None)
+        if alerts:
+            outbox.put([alert.to_dict() for alert in alerts])
+    if suppressor:
+        summaries = suppressor.flush()
+        if summaries:
+            outbox.put([alert.to_dict() for alert in summaries])
+    outbox.put(None)
+
+
+class ShardRouter:
+    """
+        Répartit les lignes entre plusieurs processus d'analyse selon leur clé de regroupement.
+
+        Toutes les lignes d'une même clé sont envoyées au même processus, qui conserve seul
+        l'état de ses fenêtres : les alertes des règles regroupées par `key_field` sont
+        identiques à celles d'un seul processus. Une règle à fenêtres regroupée autrement
+        (ou sans regroupement) ne verrait qu'une partie des événements : `unshardable_rules`
+        permet de détecter ce cas avant de répartir. Les alertes sont écrites par une seule
+        tâche d'écriture dans le processus principal.
+
+        Attributs :
+        - workers : int - Le nombre de processus d'analyse.
+        - key_field : str | None - Le champ de regroupement utilisé pour le routage.
+        - batch_size : int - Nombre de lignes accumulées par shard avant envoi.
+        - alerts_written : int - Nombre d'alertes écrites.
+    """
+    def __init__(self, workers: int, key_field: str | None, batch_size: int = 1000, queue_depth: int = 100):
+        """
+            :param workers: int - Le nombre de processus d'analyse.
+            :param key_field: str | None - Le champ de regroupement utilisé pour le routage.
+            :param batch_size: int - Nombre de lignes accumulées par shard avant envoi.
+            :param queue_depth: int - Nombre maximal de lots en attente par processus.
+        """
+        self.workers = workers
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self.alerts_written = 0
+        self._extract = key_extractor(key_field)
+        # `fork` évite de réimporter le programme principal dans chaque processus ; `start()`
+        # doit être appelé avant la création de tout thread (le serveur HTTP des métriques est
+        # démarré après lui), un thread actif lors du fork pouvant laisser un verrou pris
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        self._inboxes = [context.Queue(maxsize=queue_depth) for _ in range(workers)]
+        self._outbox = context.Queue()
+        self._buffers = [[] for _ in range(workers)]
+        self._processes = [context.Process(target=shard_worker, args=(inbox, self._outbox), daemon=True)
+                           for inbox in self._inboxes]
+
+    def start(self):
+        """Démarre les processus d'analyse"""
+        for process in self._processes:
+            process.start()
+
+    async def route(self, lines: list[str]):
+        """
+            Répartit des lignes entre les shards et envoie les lots complets.
+
+            L'envoi attend si la file d'un processus est pleine (contre-pression).
+
+            :param lines: list[str] - Les lignes JSON à analyser.
+        """
+        extract, workers, buffers = self._extract, self.workers, self._buffers
+        for line in lines:
+            buffer = buffers[shard_for(extract(line), workers)]
+            buffer.append(line)
+        for shard, buffer in enumerate(buffers):
+            if len(buffer) >= self.batch_size:
+                await self._send(shard)
+
+    async def _send(self, shard: int):
+        """Envoie le lot en attente d'un shard à son processus"""
+        batch, self._buffers[shard] = self._buffers[shard], []
+        await asyncio.to_thread(self._inboxes[shard].put, batch)
+
+    async def flush(self):
+        """Envoie tous les lots partiellement remplis"""
+        for shard, buffer in enumerate(self._buffers):
+            if buffer:
+                await self._send(shard)
+
+    async def write_alerts(self, alert_path: str = "alerts.json", metrics: Metrics = NULL_METRICS,
+                           sink: AlertSink | None = None):
+        """
+            Écrivain unique : sauvegarde les alertes de tous les shards jusqu'à leur arrêt.
+
+            L'écriture s'arrête lorsque tous les processus ont signalé leur fin, ou lorsqu'ils
+            se sont tous arrêtés (par exemple à la suite d'une erreur) et que la file est vide.
+
+            :param alert_path: str - Le chemin du fichier d'alertes.
+            :param metrics: Metrics - Les métriques du pipeline (compteur `alerts_total`).
+            :param sink: AlertSink | None - Le puits asynchrone des alertes (écriture directe si None).
+        """
+        running = self.workers
+        while running:
+            try:
+                records = await asyncio.to_thread(self._outbox.get, timeout=0.5)
+            except queue_module.Empty:
+                if not any(process.is_alive() for process in self._processes):
+                    break
+                continue
+            if records is None:
+                running -= 1
+                continue
+            for record in records:
+                if sink is None:
+                    append_record(record, alert_path)
+                else:
+                    sink.submit(record)
+                self.alerts_written += 1
+                metrics.inc("alerts_total")
+                repeats = f", {record['count']} occurrences depuis {record['first_triggered_at']}" if "count" in record else ""
+                print(f"\033[32m[*] Alerte : {record['triggered_at']} ({len(record['events'])} événements{repeats})\033[0m")
+
+    async def close(self):
+        """Envoie les derniers lots, signale la fin du flux et attend l'arrêt des processus"""
+        await self.flush()
+        for inbox, process in zip(self._inboxes, self._processes):
+            if process.is_alive():
+                await asyncio.to_thread(inbox.put, None)
+        for process in self._processes:
+            await asyncio.to_thread(process.join)
+
+
+async def process_sharded(queue: asyncio.Queue, router: ShardRouter, metrics: Metrics = NULL_METRICS):
+    """Consomme les lignes (ou lots de lignes) de la queue et les répartit entre les shards"""
+    timed = metrics.enabled
+    while True:
+        waiting = metrics.clock() if timed else 0.0
+        item = await queue.get()
+        try:
+            lines = item if isinstance(item, list) else [item]
+            if timed:
+                start = metrics.since("stage_seconds", waiting, "queue_wait")
+            await router.route(lines)
+            if queue.empty():
+                await router.flush()  # Flux au repos (mode suivi) : ne pas retenir les lots partiels
+            if timed:
+                metrics.since("stage_seconds", start, "route")
+                metrics.inc("events_total", len(lines))
+        except Exception as e:
+            metrics.inc("errors_total")
+            print(f"\033[35m[-] Erreur : {e}\033[35m")
+        finally:
+            queue.task_done()
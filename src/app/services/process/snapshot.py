@@ -0,0 +1,168 @@
+import asyncio
+import os
+import struct
+import time
+import zlib
+
+from app.models import codec
+from app.services.alert_sink import AlertSink
+from app.services.events_analyzer import EventAnalyzer
+from app.services.suppression import Suppressor
+
+SNAPSHOT_MAGIC = b"AFSNAP"
+SNAPSHOT_VERSION = 1
+# En-tête : signature, version, somme de contrôle CRC-32 et taille du contenu compressé
+HEADER = struct.Struct("<6sHIQ")
+
+
+def encode_snapshot(state: dict) -> bytes:
+    """
+        Encode un instantané : en-tête binaire suivi du contenu JSON compressé par zlib.
+
+        :param state: dict - L'état à encoder (sérialisable en JSON).
+        :return: bytes - L'instantané encodé.
+    """
+    payload = zlib.compress(codec.dumps(state).encode(), 6)
+    return HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(payload), len(payload)) + payload
+
+
+def decode_snapshot(data: bytes) -> dict | None:
+    """
+        Décode un instantané encodé par `encode_snapshot`.
+
+        :param data: bytes - L'instantané encodé.
+        :return: dict | None - L'état, ou None si l'instantané est tronqué, corrompu ou d'une autre version.
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, crc, length = HEADER.unpack_from(data)
+    payload = data[HEADER.size:HEADER.size + length]
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or len(payload) != length or zlib.crc32(payload) != crc:
+        return None
+    try:
+        return codec.loads(zlib.decompress(payload))
+    except (zlib.error, codec.DecodeError):
+        return None
+
+
+def load_snapshot(path: str) -> dict | None:
+    """
+        Charge un instantané depuis le disque.
+
+        :param path: str - Le chemin du fichier d'instantané.
+        :return: dict | None - L'état sauvegardé, ou None si le fichier est absent ou illisible.
+    """
+    try:
+        with open(path, "rb") as f:
+            return decode_snapshot(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def save_snapshot(path: str, state: dict):
+    """
+        Sauvegarde atomiquement un instantané (fichier temporaire, `fsync` puis `os.replace`).
+
+        :param path: str - Le chemin du fichier d'instantané.
+        :param state: dict - L'état à sauvegarder.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_snapshot(state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Snapshotter:
+    """
+        Instantanés périodiques de l'état du pipeline, pour une reprise rapide après un arrêt.
+
+        Un instantané réunit la position du lecteur dans le fichier log (fichier, inode,
+        position en octets), l'état des fenêtres de l'analyseur, celui de la couche de
+        suppression et la position de chaque destination d'alertes. Il n'est pris qu'à un
+        point cohérent : le lecteur s'arrête, la queue est vidée (`queue.join`) et les
+        alertes déjà émises sont écrites sur disque.
+        À la reprise, la lecture repart de la position sauvegardée avec les fenêtres
+        restaurées, et les alertes écrites après l'instantané, rejouées par l'analyseur,
+        ne sont pas écrites une seconde fois : aucune alerte n'est manquée ni dupliquée.
+
+        Attributs :
+        - path : str - Le chemin du fichier d'instantané.
+        - interval : float - Délai minimal entre deux instantanés, en secondes.
+        - saved : int - Nombre d'instantanés écrits.
+    """
+    def __init__(self, path: str, analyzer: EventAnalyzer, queue: asyncio.Queue, sink: AlertSink | None = None,
+                 interval: float = 5.0, suppressor: Suppressor | None = None):
+        """
+            Initialise les instantanés du pipeline.
+
+            :param path: str - Le chemin du fichier d'instantané.
+            :param analyzer: EventAnalyzer - L'analyseur dont les fenêtres sont sauvegardées.
+            :param queue: asyncio.Queue - La queue entre le lecteur et le consommateur.
+            :param sink: AlertSink | None - Le puits des alertes (positions des destinations).
+            :param interval: float - Délai minimal entre deux instantanés, en secondes.
+            :param suppressor: Suppressor | None - La couche de suppression des alertes répétées.
+        """
+        self.path = path
+        self.analyzer = analyzer
+        self.queue = queue
+        self.sink = sink
+        self.interval = interval
+        self.suppressor = suppressor
+        self.saved = 0
+        self._last = time.monotonic()
+
+    def restore(self, file_path: str) -> dict | None:
+        """
+            Restaure l'état de l'analyseur et des destinations depuis le dernier instantané.
+
+            L'instantané n'est utilisé que s'il porte sur le même fichier (chemin et inode) et
+            que sa position est toujours dans le fichier (pas de troncature).
+
+            :param file_path: str - Le chemin du fichier log à traiter.
+            :return: dict | None - La position de reprise {file, inode, offset}, ou None.
+        """
+        state = load_snapshot(self.path)
+        if not state or state.get("file") != os.path.abspath(file_path):
+            return None
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        if stat.st_ino != state.get("inode") or state.get("offset", 0) > stat.st_size:
+            return None
+        self.analyzer.restore(state["analyzer"])
+        if self.suppressor is not None and state.get("suppression"):
+            self.suppressor.restore(state["suppression"])
+        if self.sink is not None:
+            self.sink.resume(state.get("alerts", {}))
+        return {"file": state["file"], "inode": state["inode"], "offset": state["offset"]}
+
+    def due(self) -> bool:
+        """Indique si le délai depuis le dernier instantané est écoulé"""
+        return time.monotonic() - self._last >= self.interval
+
+    async def save(self, file_path: str, inode: int, offset: int):
+        """
+            Prend un instantané une fois les lignes déjà lues traitées et leurs alertes écrites.
+
+            :param file_path: str - Le chemin du fichier log.
+            :param inode: int - L'inode du fichier log.
+            :param offset: int - La position suivant la dernière ligne transmise à la queue.
+        """
+        await self.queue.join()
+        if self.sink is not None:
+            await self.sink.flush()
+        state = {
+            "file": os.path.abspath(file_path),
+            "inode": inode,
+            "offset": offset,
+            "analyzer": self.analyzer.snapshot(),
+            "alerts": self.sink.marks() if self.sink is not None else {},
+        }
+        if self.suppressor is not None:
+            state["suppression"] = self.suppressor.snapshot()
+        await asyncio.to_thread(save_snapshot, self.path, state)
+        self.saved += 1
+        self._last = time.monotonic()
@@ -0,0 +1,163 @@
+from datetime import timezone
+
+import numpy as np
+
+from app.models.event_batch import EventBatch
+from app.models.timestamps import NS_PER_SECOND
+from app.services.aggregates import Aggregates
+
+# Quantiles publiés pour le débit par minute et la taille des alertes
+PERCENTILES = (50, 90, 99)
+
+
+def _alert_seconds(alerts) -> np.ndarray:
+    """Instants de déclenchement des alertes, en secondes epoch (UTC si aucun fuseau n'est indiqué)"""
+    seconds = [
+        (a.triggered_at if a.triggered_at.tzinfo else a.triggered_at.replace(tzinfo=timezone.utc)).timestamp()
+        for a in alerts
+    ]
+    return np.asarray(seconds, dtype=np.float64).astype(np.int64)
+
+
+def _percentiles(values: np.ndarray) -> dict[int, float]:
+    """Quantiles `PERCENTILES` d'un tableau (0 pour un tableau vide)"""
+    if not values.size:
+        return {p: 0.0 for p in PERCENTILES}
+    return dict(zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist()))
+
+
+class ReportStats:
+    """
+        Statistiques d'un rapport, calculées une seule fois par opérations vectorisées.
+
+        Les statistiques sont construites à partir de colonnes (codes de niveau, tranches de
+        temps) et non d'objets `Event` : depuis les agrégats persistés (`from_aggregates`) ou
+        depuis un lot en colonnes (`from_batch`). Le même objet alimente le rapport PDF, le
+        rapport HTML et les graphiques.
+
+        Attributs :
+        - levels : list[str] - Les niveaux, triés par nombre décroissant d'événements.
+        - counts : np.ndarray - Nombre d'événements de chaque niveau (même ordre que `levels`).
+        - total : int - Nombre total d'événements.
+        - critical : int - Nombre d'événements de niveau critique.
+        - mean : float - Nombre moyen d'événements par niveau.
+        - step : int - Durée d'un point de la série temporelle, en secondes (60, sauf tranches incompatibles ou période très longue).
+        - times : np.ndarray - Début de chaque point de la série (epoch en secondes), sans trou.
+        - rate : np.ndarray - Débit d'événements de chaque point, en événements par minute.
+        - alert_rate : np.ndarray - Débit d'alertes de chaque point, en alertes par minute.
+        - total_alerts : int - Nombre total d'alertes.
+        - alerts_per_1000_events : float - Densité d'alertes rapportée au volume d'événements.
+        - alerts_per_hour : float - Densité d'alertes rapportée à la durée couverte.
+        - rate_percentiles : dict[int, float] - Quantiles du débit par minute.
+        - alert_size_percentiles : dict[int, float] - Quantiles du nombre d'événements par alerte.
+    """
+    def __init__(self, levels: list[str], counts: np.ndarray, starts: np.ndarray, totals: np.ndarray,
+                 alert_starts: np.ndarray, alert_totals: np.ndarray, bucket_seconds: int = 60,
+                 alert_sizes: np.ndarray | None = None, total_alerts: int | None = None,
+                 critical_levels=("CRITICAL",), max_points: int = 100_000):
+        """
+            Calcule les statistiques à partir de colonnes déjà comptées.
+
+            :param levels: list[str] - Les niveaux.
+            :param counts: np.ndarray - Nombre d'événements par niveau.
+            :param starts: np.ndarray - Début des tranches d'événements (epoch en secondes).
+            :param totals: np.ndarray - Nombre d'événements par tranche.
+            :param alert_starts: np.ndarray - Début des tranches d'alertes (epoch en secondes).
+            :param alert_totals: np.ndarray - Nombre d'alertes par tranche.
+            :param bucket_seconds: int - Durée des tranches fournies, en secondes.
+            :param alert_sizes: np.ndarray | None - Nombre d'événements de chaque alerte.
+            :param total_alerts: int | None - Nombre d'alertes (par défaut, la somme des tranches).
+            :param critical_levels: Iterable[str] - Les niveaux considérés comme critiques.
+            :param max_points: int - Nombre maximal de points de la série temporelle.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        order = np.argsort(-counts, kind="stable")
+        self.levels = [levels[i] for i in order]
+        self.counts = counts[order]
+        self.total = int(self.counts.sum())
+        self.critical = int(self.counts[np.isin(np.asarray(self.levels, dtype=object), list(critical_levels))].sum())
+        self.mean = round(float(self.counts.mean()), 2) if self.counts.size else 0.0
+
+        # Série temporelle continue (les minutes sans événement valent 0)
+        step = 60 if 60 % bucket_seconds == 0 else bucket_seconds
+        starts = np.asarray(starts, dtype=np.int64)
+        alert_starts = np.asarray(alert_starts, dtype=np.int64)
+        edges = np.concatenate((starts, alert_starts))
+        if edges.size:
+            first, last = int(edges.min()), int(edges.max())
+            step *= max(1, -(-(last - first + 1) // (step * max_points)))  # Période très longue : points plus larges
+            first -= first % step
+            length = (last - first) // step + 1
+            self.times = first + step * np.arange(length, dtype=np.int64)
+            self.rate = np.bincount((starts - first) // step, weights=totals, minlength=length) * (60 / step)
+            self.alert_rate = np.bincount((alert_starts - first) // step, weights=alert_totals, minlength=length) * (60 / step)
+        else:
+            self.times = np.empty(0, dtype=np.int64)
+            self.rate = self.alert_rate = np.empty(0, dtype=np.float64)
+        self.step = step
+
+        self.total_alerts = int(np.sum(alert_totals)) if total_alerts is None else total_alerts
+        self.alerts_per_1000_events = self.total_alerts * 1000 / self.total if self.total else 0.0
+        hours = self.times.size * step / 3600
+        self.alerts_per_hour = self.total_alerts / hours if hours else 0.0
+        self.rate_percentiles = _percentiles(self.rate)
+        sizes = np.empty(0, dtype=np.int64) if alert_sizes is None else np.asarray(alert_sizes, dtype=np.int64)
+        self.alert_size_percentiles = _percentiles(sizes)
+
+    @classmethod
+    def from_aggregates(cls, aggregates: Aggregates, alerts=None, critical_levels=("CRITICAL",)) -> "ReportStats":
+        """
+            Calcule les statistiques depuis les agrégats incrémentaux (en O(nombre de tranches)).
+
+            :param aggregates: Aggregates - Les agrégats à jour.
+            :param alerts: Iterable[Alert] | None - Les alertes (taille des alertes et nombre total), parcourues une fois.
+            :param critical_levels: Iterable[str] - Les niveaux considérés comme critiques.
+            :return: ReportStats - Les statistiques du rapport.
+        """
+        buckets, alert_buckets = aggregates.buckets, aggregates.alert_buckets
+        sizes = None if alerts is None else np.fromiter((len(a.events) for a in alerts), dtype=np.int64)
+        return cls(
+            list(aggregates.level_counts),
+            np.fromiter(aggregates.level_counts.values(), dtype=np.int64, count=len(aggregates.level_counts)),
+            np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets)),
+            np.fromiter((sum(b.values()) for b in buckets.values()), dtype=np.int64, count=len(buckets)),
+            np.fromiter(alert_buckets.keys(), dtype=np.int64, count=len(alert_buckets)),
+            np.fromiter(alert_buckets.values(), dtype=np.int64, count=len(alert_buckets)),
+            aggregates.bucket_seconds,
+            sizes,
+            aggregates.total_alerts if sizes is None else int(sizes.size),
+            critical_levels,
+        )
+
+    @classmethod
+    def from_batch(cls, batch: EventBatch, alerts=(), critical_levels=("CRITICAL",)) -> "ReportStats":
+        """
+            Calcule les statistiques depuis un lot d'événements en colonnes, sans reconstruire d'objet `Event`.
+
+            :param batch: EventBatch - Le lot d'événements.
+            :param alerts: list[Alert] - Les alertes.
+            :param critical_levels: Iterable[str] - Les niveaux considérés comme critiques.
+            :return: ReportStats - Les statistiques du rapport.
+        """
+        columns = batch.to_numpy()
+        seconds = columns["timestamps"] // NS_PER_SECOND
+        starts, totals = np.unique(seconds - seconds % 60, return_counts=True)
+        alert_seconds = _alert_seconds(alerts)
+        alert_starts, alert_totals = np.unique(alert_seconds - alert_seconds % 60, return_counts=True)
+        return cls(
+            list(batch.level_names),
+            np.bincount(columns["level_codes"], minlength=len(batch.level_names)),
+            starts, totals, alert_starts, alert_totals, 60,
+            np.fromiter((len(a.events) for a in alerts), dtype=np.int64, count=len(alerts)),
+            len(alerts),
+            critical_levels,
+        )
+
+    def level_rows(self) -> list[tuple[str, int]]:
+        """Lignes (niveau, nombre) du tableau des statistiques, par nombre décroissant"""
+        return list(zip(self.levels, self.counts.tolist()))
+
+    @property
+    def peak_rate(self) -> float:
+        """Débit maximal observé, en événements par minute"""
+        return float(self.rate.max()) if self.rate.size else 0.0
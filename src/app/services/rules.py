@@ -0,0 +1,437 @@
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+from app.models import codec
+from app.models.alerts_model import Alert
+from app.models.event_model import Event
+
+
+class KeyedWindows:
+    """
+        États de fenêtre indépendants par clé, avec une mémoire bornée.
+
+        Chaque clé (par exemple la valeur du champ `host` ou `service`) possède son propre
+        état, créé à la demande par `factory`. Les clés sont rangées de la moins récemment
+        utilisée à la plus récente : celles inactives depuis plus de `ttl_seconds` (selon
+        l'horodatage des événements) sont supprimées, et la moins récemment utilisée est
+        évincée lorsque `max_keys` est atteint.
+
+        Attributs :
+        - max_keys : int - Nombre maximal de clés suivies simultanément.
+        - ttl : int - Durée d'inactivité (en nanosecondes) au-delà de laquelle une clé est supprimée.
+        - expired : int - Nombre de clés supprimées pour inactivité.
+        - evicted : int - Nombre de clés évincées faute de place.
+    """
+    def __init__(self, factory, max_keys: int = 10000, ttl_seconds: float = 3600, on_remove=None):
+        """
+            :param factory: Callable[[], Any] - Fonction créant l'état d'une nouvelle clé.
+            :param max_keys: int - Nombre maximal de clés suivies simultanément.
+            :param ttl_seconds: float - Durée d'inactivité avant suppression d'une clé, en secondes.
+            :param on_remove: Callable[[Hashable, Any], None] | None - Appelée avec la clé et l'état de chaque clé expirée ou évincée.
+        """
+        self.factory = factory
+        self.on_remove = on_remove
+        self.max_keys = max_keys
+        self.ttl = int(ttl_seconds * 1_000_000_000)
+        self.expired = 0
+        self.evicted = 0
+        self._states = OrderedDict()  # clé -> [dernier accès, état]
+
+    def get(self, key, now: int):
+        """
+            Retourne l'état d'une clé, en le créant si nécessaire.
+
+            :param key: Hashable - La clé de regroupement.
+            :param now: int - L'horodatage courant, en nanosecondes.
+            :return: Any - L'état associé à la clé.
+        """
+        states = self._states
+        entry = states.get(key)
+        if entry is not None:
+            entry[0] = now
+            states.move_to_end(key)
+        else:
+            entry = states[key] = [now, self.factory()]
+        # Les clés les plus anciennes sont en tête : l'expiration s'arrête à la première clé active
+        while states:
+            oldest_key, oldest = next(iter(states.items()))
+            if now - oldest[0] <= self.ttl:
+                break
+            del states[oldest_key]
+            self.expired += 1
+            if self.on_remove:
+                self.on_remove(oldest_key, oldest[1])
+        while len(states) > self.max_keys:
+            removed_key, removed = states.popitem(last=False)
+            self.evicted += 1
+            if self.on_remove:
+                self.on_remove(removed_key, removed[1])
+        return entry[1]
+
+    def peek(self, key):
+        """Retourne l'état d'une clé sans la marquer comme utilisée (None si elle n'est pas suivie)"""
+        entry = self._states.get(key)
+        return entry[1] if entry is not None else None
+
+    def discard(self, key):
+        """Supprime l'état d'une clé"""
+        self._states.pop(key, None)
+
+    def snapshot(self, encode) -> dict:
+        """
+            Retourne l'état des fenêtres sous une forme sérialisable, de la clé la moins récemment utilisée à la plus récente.
+
+            :param encode: Callable[[Any], list] - Conversion de l'état d'une clé.
+            :return: dict - Les compteurs et les états [clé, dernier accès, état] de chaque clé.
+        """
+        return {
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "states": [[key, last, encode(state)] for key, (last, state) in self._states.items()],
+        }
+
+    def restore(self, data: dict, decode):
+        """
+            Remplace l'état des fenêtres par celui d'un instantané (`snapshot`).
+
+            :param data: dict - L'état sauvegardé.
+            :param decode: Callable[[list], Any] - Reconstruction de l'état d'une clé.
+        """
+        self.expired, self.evicted = data["expired"], data["evicted"]
+        self._states = OrderedDict((key, [last, decode(state)]) for key, last, state in data["states"])
+
+    def adopt(self, other: "KeyedWindows"):
+        """
+            Reprend les états et les compteurs d'autres fenêtres (règle recalibrée).
+
+            Les nouvelles limites (`max_keys`, `ttl`) s'appliquent dès le prochain accès.
+
+            :param other: KeyedWindows - Les fenêtres remplacées.
+        """
+        self.expired, self.evicted, self._states = other.expired, other.evicted, other._states
+
+    def __len__(self):
+        return len(self._states)
+
+    def items(self):
+        """Parcourt les clés suivies et leurs états, de la moins récemment utilisée à la plus récente"""
+        return ((key, entry[1]) for key, entry in self._states.items())
+
+    def metrics(self) -> dict:
+        """
+            Retourne les métriques de suivi des clés.
+
+            :return: dict - Nombre de clés actives, expirées et évincées.
+        """
+        return {"active_keys": len(self._states), "expired": self.expired, "evicted": self.evicted}
+
+
+class Rule(ABC):
+    """
+        Classe de base abstraite d'une règle de détection (les sous-classes définissent `evaluate`).
+
+        Une règle ne reçoit que les événements qui peuvent la déclencher : ceux dont le niveau
+        figure dans `levels` (tous les niveaux si `levels` vaut None) et qui possèdent le champ
+        `field` dans leurs données brutes (aucune contrainte si `field` vaut None).
+
+        Attributs :
+        - name : str - Le nom de la règle, reporté dans les alertes qu'elle déclenche.
+        - levels : frozenset[str] | None - Les niveaux concernés par la règle.
+        - field : str | None - Le champ requis dans `Event.raw`.
+        - group_by : str | None - Le champ de `Event.raw` définissant des fenêtres indépendantes.
+        - stateful : bool - La règle conserve des fenêtres entre les événements (elle doit voir tous ceux d'une clé).
+    """
+    stateful = False
+
+    def __init__(self, name: str, levels: list[str] | None = None, field: str | None = None,
+                 group_by: str | None = None):
+        """
+            Initialise les critères d'aiguillage de la règle.
+
+            :param name: str - Le nom de la règle.
+            :param levels: list[str] | None - Les niveaux concernés (tous si None).
+            :param field: str | None - Le champ requis dans les données brutes.
+            :param group_by: str | None - Le champ de regroupement (une fenêtre par valeur).
+        """
+        self.name = name
+        self.levels = frozenset(level.upper() for level in levels) if levels else None
+        self.field = field
+        self.group_by = group_by
+
+    def key(self, event: Event):
+        """
+            Retourne la clé de regroupement d'un événement (None sans regroupement).
+
+            :param event: Event - L'événement.
+            :return: Hashable | None - La valeur du champ `group_by`.
+        """
+        if self.group_by is None:
+            return None
+        value = event.raw.get(self.group_by)
+        return value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+
+    def metrics(self) -> dict:
+        """
+            Retourne les métriques internes de la règle.
+
+            :return: dict - Les métriques (vide par défaut).
+        """
+        return {}
+
+    def snapshot(self) -> dict | None:
+        """
+            Retourne l'état des fenêtres de la règle, sérialisable en JSON.
+
+            :return: dict | None - L'état, ou None pour une règle sans état.
+        """
+        return None
+
+    def restore(self, state: dict):
+        """
+            Restaure l'état des fenêtres de la règle depuis un instantané (`snapshot`).
+
+            :param state: dict - L'état sauvegardé.
+        """
+
+    def adopt(self, other: "Rule"):
+        """
+            Reprend l'état des fenêtres d'une règle de même nom remplacée par celle-ci (rechargement à chaud).
+
+            :param other: Rule - La règle remplacée.
+        """
+
+    @abstractmethod
+    def evaluate(self, event: Event) -> Alert | None:
+        """
+            Évalue un événement et retourne une alerte si la règle est déclenchée.
+
+            :param event: Event - L'événement à évaluer.
+            :return: Alert | None - L'alerte déclenchée, ou None.
+        """
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class ThresholdRule(Rule):
+    """
+        Déclenche une alerte lorsque `count` événements surviennent en moins de `window_seconds`.
+
+        Les événements retenus sont joints à l'alerte, puis la fenêtre est vidée. C'est la
+        règle historique d'`EventAnalyzer` (3 événements critiques en 30 secondes). Avec
+        `group_by`, chaque valeur du champ possède sa propre fenêtre.
+    """
+    stateful = True
+
+    def __init__(self, name: str, count: int = 3, window_seconds: float = 30,
+                 max_keys: int = 10000, key_ttl_seconds: float | None = None, **kwargs):
+        """
+            :param count: int - Nombre d'événements déclenchant l'alerte.
+            :param window_seconds: float - Durée de la fenêtre glissante, en secondes.
+            :param max_keys: int - Nombre maximal de clés suivies avec `group_by`.
+            :param key_ttl_seconds: float | None - Inactivité avant suppression d'une clé (par défaut 2 fenêtres).
+        """
+        super().__init__(name, **kwargs)
+        self.count = count
+        self.window = int(window_seconds * 1_000_000_000)
+        self.windows = KeyedWindows(deque, max_keys, key_ttl_seconds or 2 * window_seconds)
+
+    def evaluate(self, event: Event) -> Alert | None:
+        key = self.key(event)
+        buffer = self.windows.get(key, event.epoch_ns)
+        buffer.append(event)
+        while buffer and (event.epoch_ns - buffer[0].epoch_ns) > self.window:
+            buffer.popleft()
+        if len(buffer) >= self.count:
+            group = list(buffer)
+            buffer.clear()
+            return Alert(triggered_at=event.timestamp, events=group, rule=self.name, key=key)
+        return None
+
+    def metrics(self) -> dict:
+        return self.windows.metrics()
+
+    def snapshot(self) -> dict:
+        # Les événements des fenêtres sont conservés sous forme de ligne JSON, avec leur position
+        return self.windows.snapshot(lambda buffer: [[codec.dumps(e.raw), e.offset] for e in buffer])
+
+    def restore(self, state: dict):
+        self.windows.restore(state, lambda items: deque(Event.from_line(line, offset=offset) for line, offset in items))
+
+    def adopt(self, other: Rule):
+        # Même type et même regroupement : les événements retenus sont conservés, la nouvelle fenêtre les filtre
+        if type(other) is type(self) and other.group_by == self.group_by:
+            self.windows.adopt(other.windows)
+
+
+class RateRule(Rule):
+    """
+        Déclenche une alerte lorsque le débit d'événements dépasse `rate` par seconde.
+
+        Le débit est mesuré sur une fenêtre glissante de `window_seconds`. Seuls les
+        horodatages sont conservés ; l'alerte contient l'événement qui a franchi le seuil.
+        Avec `group_by`, le débit est mesuré séparément pour chaque valeur du champ.
+    """
+    stateful = True
+
+    def __init__(self, name: str, rate: float = 10, window_seconds: float = 60,
+                 max_keys: int = 10000, key_ttl_seconds: float | None = None, **kwargs):
+        """
+            :param rate: float - Débit maximal toléré, en événements par seconde.
+            :param window_seconds: float - Durée de la fenêtre de mesure, en secondes.
+            :param max_keys: int - Nombre maximal de clés suivies avec `group_by`.
+            :param key_ttl_seconds: float | None - Inactivité avant suppression d'une clé (par défaut 2 fenêtres).
+        """
+        super().__init__(name, **kwargs)
+        self.rate = rate
+        self.window = int(window_seconds * 1_000_000_000)
+        self.limit = rate * window_seconds
+        self.windows = KeyedWindows(deque, max_keys, key_ttl_seconds or 2 * window_seconds)
+
+    def evaluate(self, event: Event) -> Alert | None:
+        key = self.key(event)
+        timestamps = self.windows.get(key, event.epoch_ns)
+        timestamps.append(event.epoch_ns)
+        while timestamps and (event.epoch_ns - timestamps[0]) > self.window:
+            timestamps.popleft()
+        if len(timestamps) > self.limit:
+            timestamps.clear()
+            return Alert(triggered_at=event.timestamp, events=[event], rule=self.name, key=key)
+        return None
+
+    def metrics(self) -> dict:
+        return self.windows.metrics()
+
+    def snapshot(self) -> dict:
+        return self.windows.snapshot(list)
+
+    def restore(self, state: dict):
+        self.windows.restore(state, deque)
+
+    def adopt(self, other: Rule):
+        if type(other) is type(self) and other.group_by == self.group_by:
+            self.windows.adopt(other.windows)
+
+
+class PatternRule(Rule):
+    """
+        Déclenche une alerte pour chaque événement dont le message correspond à `pattern`.
+
+        Si `field` est fourni, l'expression régulière porte sur ce champ des données brutes
+        plutôt que sur le message.
+    """
+    def __init__(self, name: str, pattern: str = "", **kwargs):
+        """
+            :param pattern: str - L'expression régulière recherchée.
+        """
+        super().__init__(name, **kwargs)
+        self.pattern = re.compile(pattern)
+
+    def evaluate(self, event: Event) -> Alert | None:
+        value = event.raw[self.field] if self.field else event.message
+        if self.pattern.search(str(value)):
+            return Alert(triggered_at=event.timestamp, events=[event], rule=self.name, key=self.key(event))
+        return None
+
+
+RULE_TYPES = {
+    "threshold": ThresholdRule,
+    "rate": RateRule,
+    "pattern": PatternRule,
+}
+
+
+def build_rule(spec: dict) -> Rule:
+    """
+        Construit une règle à partir de sa déclaration dans la configuration.
+
+        Exemple : `{"name": "erreurs", "type": "threshold", "levels": ["ERROR"], "count": 5, "window_seconds": 60}`.
+
+        :param spec: dict - La déclaration de la règle (clé `type` parmi `RULE_TYPES`).
+        :return: Rule - La règle construite.
+        :raises ValueError: Si le type de règle est inconnu.
+    """
+    spec = dict(spec)
+    rule_type = spec.pop("type", "threshold")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Type de règle inconnu : {rule_type}")
+    spec.setdefault("name", rule_type)
+    return RULE_TYPES[rule_type](**spec)
+
+
+class RuleEngine:
+    """
+        Évalue un ensemble de règles à l'aide d'une table d'aiguillage.
+
+        Les règles sont indexées par niveau puis regroupées par champ requis. Pour chaque
+        événement, seule l'entrée de son niveau est consultée et seuls les groupes dont le
+        champ est présent sont évalués : le coût d'un événement dépend des règles qui peuvent
+        le concerner, pas du nombre total de règles.
+
+        Attributs :
+        - rules : list[Rule] - Les règles, dans leur ordre de déclaration.
+    """
+    def __init__(self, rules: list[Rule]):
+        """
+            Compile la table d'aiguillage.
+
+            :param rules: list[Rule] - Les règles à évaluer.
+        """
+        self.rules = list(rules)
+        levels = {level for rule in self.rules if rule.levels for level in rule.levels}
+        self._wildcard = self._group([rule for rule in self.rules if rule.levels is None])
+        self._index = {
+            level: self._group([rule for rule in self.rules if rule.levels is None or level in rule.levels])
+            for level in levels
+        }
+
+    @staticmethod
+    def _group(rules: list[Rule]) -> tuple:
+        """
+            Regroupe des règles par champ requis, en conservant l'ordre de déclaration.
+
+            :param rules: list[Rule] - Les règles d'un même niveau.
+            :return: tuple[tuple[str | None, tuple[Rule, ...]], ...] - Les groupes (champ, règles).
+        """
+        groups: dict[str | None, list[Rule]] = {}
+        for rule in rules:
+            groups.setdefault(rule.field, []).append(rule)
+        return tuple((field, tuple(members)) for field, members in groups.items())
+
+    def candidates(self, event: Event) -> list[Rule]:
+        """
+            Retourne les règles susceptibles d'être déclenchées par un événement.
+
+            :param event: Event - L'événement à aiguiller.
+            :return: list[Rule] - Les règles concernées.
+        """
+        return [rule
+                for field, rules in self._index.get(event.level, self._wildcard)
+                if field is None or field in event.raw
+                for rule in rules]
+
+    def metrics(self) -> dict:
+        """
+            Retourne les métriques de chaque règle, par nom de règle.
+
+            :return: dict[str, dict] - Clés actives, expirées et évincées pour les règles à fenêtre.
+        """
+        return {rule.name: rule.metrics() for rule in self.rules}
+
+    def evaluate(self, event: Event) -> list[Alert]:
+        """
+            Évalue un événement contre les règles concernées.
+
+            :param event: Event - L'événement à évaluer.
+            :return: list[Alert] - Les alertes déclenchées (souvent vide).
+        """
+        alerts = []
+        for field, rules in self._index.get(event.level, self._wildcard):
+            if field is not None and field not in event.raw:
+                continue
+            for rule in rules:
+                alert = rule.evaluate(event)
+                if alert:
+                    alerts.append(alert)
+        return alerts
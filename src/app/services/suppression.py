@@ -0,0 +1,227 @@
+import hashlib
+import heapq
+import re
+from datetime import datetime
+
+from app.models import codec
+from app.models.alerts_model import Alert
+from app.models.event_model import Event
+from app.services.metrics import NULL_METRICS, Metrics
+from app.services.rules import KeyedWindows
+
+# Parties variables d'un message remplacées pour obtenir son gabarit (dans cet ordre)
+TEMPLATE_PATTERNS = (
+    (re.compile(r'"[^"]*"|\'[^\']*\''), "<str>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b", re.IGNORECASE), "<hex>"),
+    (re.compile(r"\d+(?:[.,]\d+)?"), "<n>"),
+)
+
+
+def message_template(message) -> str:
+    """
+        Gabarit d'un message : chaînes citées, identifiants, adresses et nombres remplacés par des marqueurs.
+
+        Exemple : `"Timeout after 3012 ms on 10.0.0.7:5432"` donne `"Timeout after <n> ms on <ip>"`.
+
+        :param message: str - Le message.
+        :return: str - Le gabarit du message.
+    """
+    template = str(message)
+    for pattern, marker in TEMPLATE_PATTERNS:
+        template = pattern.sub(marker, template)
+    return template
+
+
+def fingerprint(alert: Alert) -> str:
+    """
+        Empreinte d'une alerte : règle, clé, niveaux et gabarit du message de l'événement déclencheur.
+
+        :param alert: Alert - L'alerte.
+        :return: str - L'empreinte hexadécimale (16 caractères).
+    """
+    levels = ",".join(sorted({e.level for e in alert.events}))
+    message = message_template(alert.events[-1].message) if alert.events else ""
+    data = codec.dumps([alert.rule, alert.key, levels, message])
+    return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+
+
+def _alert_ns(alert: Alert) -> int:
+    """Instant de déclenchement d'une alerte, en nanosecondes (horodatage de l'événement déclencheur)"""
+    if alert.events:
+        return alert.events[-1].epoch_ns
+    return int(alert.triggered_at.timestamp() * 1_000_000_000)
+
+
+class _Cooldown:
+    """État d'une empreinte : début de la période de silence et occurrences regroupées depuis"""
+    __slots__ = ("start", "repeats", "first", "last")
+
+    def __init__(self):
+        self.start = None
+        self.repeats = 0
+        self.first = None
+        self.last = None
+
+
+def _encode_alert(alert: Alert) -> list:
+    return [alert.triggered_at.isoformat(), alert.rule, alert.key, alert.source,
+            [[codec.dumps(e.raw), e.offset] for e in alert.events]]
+
+
+def _decode_alert(data: list) -> Alert:
+    triggered_at, rule, key, source, events = data
+    return Alert(datetime.fromisoformat(triggered_at), [Event.from_line(line, offset=offset) for line, offset in events],
+                 rule, key, source)
+
+
+class Suppressor:
+    """
+        Couche de suppression des alertes répétées, entre l'analyseur et le puits d'alertes.
+
+        Chaque alerte reçoit une empreinte (`fingerprint`). La première alerte d'une
+        empreinte est transmise immédiatement et ouvre une période de silence de
+        `cooldown_seconds` (selon l'horodatage des événements) : les alertes de même
+        empreinte qui suivent sont retenues et comptées. À la fin de la période (à la
+        prochaine occurrence, à l'expiration de l'empreinte ou à `flush`), une seule alerte
+        de synthèse est transmise : la dernière occurrence, avec le nombre d'occurrences
+        regroupées (`Alert.count`) et l'heure de la première. Si `filter` reçoit l'horodatage
+        courant du flux, la synthèse est aussi transmise dès la fin de la période, même si
+        aucune autre alerte ne survient (rafale suivie d'un silence en mode suivi).
+
+        Les empreintes sont suivies dans un cache borné (`KeyedWindows`) : au plus
+        `max_entries` empreintes, supprimées après `cooldown_seconds` d'inactivité (leur
+        synthèse éventuelle est alors transmise).
+
+        Attributs :
+        - cooldown : int - Durée de la période de silence, en nanosecondes.
+        - suppressed : int - Nombre d'alertes retenues.
+    """
+    def __init__(self, cooldown_seconds: float = 60, max_entries: int = 10000, metrics: Metrics = NULL_METRICS):
+        """
+            Initialise le cache des empreintes.
+
+            :param cooldown_seconds: float - Durée de la période de silence, en secondes.
+            :param max_entries: int - Nombre maximal d'empreintes suivies simultanément.
+            :param metrics: Metrics - Les métriques du pipeline (compteur `alerts_suppressed_total`).
+        """
+        self.cooldown = int(cooldown_seconds * 1_000_000_000)
+        self.metrics = metrics
+        self.suppressed = 0
+        self._windows = KeyedWindows(_Cooldown, max_entries, cooldown_seconds, self._on_remove)
+        self._ready: list[Alert] = []
+        self._pending: list[tuple[int, str]] = []  # Tas (début de la période, empreinte) des occurrences retenues
+
+    def _on_remove(self, key: str, window: _Cooldown):
+        """Empreinte expirée ou évincée : sa synthèse en attente est transmise"""
+        if window.repeats:
+            self._ready.append(self._summary(key, window))
+
+    @staticmethod
+    def _summary(key: str, window: _Cooldown) -> Alert:
+        """Alerte de synthèse des occurrences retenues d'une empreinte (remet le compteur à zéro)"""
+        alert = window.last
+        alert.count = window.repeats
+        alert.first_triggered_at = window.first
+        alert.fingerprint = key
+        window.repeats, window.first, window.last = 0, None, None
+        return alert
+
+    def _expire(self, now: int):
+        """Transmet les synthèses des périodes de silence terminées à l'instant `now`"""
+        pending = self._pending
+        while pending and now - pending[0][0] > self.cooldown:
+            start, key = heapq.heappop(pending)
+            window = self._windows.peek(key)
+            if window is not None and window.start == start and window.repeats:
+                self._ready.append(self._summary(key, window))
+
+    def filter(self, alerts: list[Alert], now_ns: int | None = None) -> list[Alert]:
+        """
+            Retient les alertes répétées et retourne celles à transmettre.
+
+            :param alerts: list[Alert] - Les alertes produites par l'analyseur.
+            :param now_ns: int | None - Horodatage du dernier événement analysé, en nanosecondes : les périodes de silence terminées transmettent leur synthèse.
+            :return: list[Alert] - Les alertes à transmettre : nouvelles empreintes et synthèses.
+        """
+        if now_ns is not None and self._pending:
+            self._expire(now_ns)
+        if not alerts and not self._ready:
+            return alerts
+        kept = []
+        for alert in alerts:
+            now = _alert_ns(alert)
+            key = fingerprint(alert)
+            window = self._windows.get(key, now)
+            if window.start is None or now - window.start > self.cooldown:
+                if window.repeats:
+                    kept.append(self._summary(key, window))
+                window.start = now
+                alert.fingerprint = key
+                kept.append(alert)
+                continue
+            if not window.repeats:
+                heapq.heappush(self._pending, (window.start, key))
+            window.repeats += 1
+            if window.first is None:
+                window.first = alert.triggered_at
+            window.last = alert  # Seule la dernière occurrence est conservée : mémoire bornée
+            self.suppressed += 1
+            self.metrics.inc("alerts_suppressed_total")
+        if self._ready:
+            kept = self._ready + kept  # Synthèses des empreintes expirées pendant le traitement
+            self._ready = []
+        return kept
+
+    def flush(self) -> list[Alert]:
+        """
+            Transmet les synthèses de toutes les empreintes ayant des occurrences retenues (fin du traitement).
+
+            :return: list[Alert] - Les alertes de synthèse.
+        """
+        summaries, self._ready, self._pending = self._ready, [], []
+        for key, window in self._windows.items():
+            if window.repeats:
+                summaries.append(self._summary(key, window))
+        return summaries
+
+    def snapshot(self) -> dict:
+        """
+            Retourne l'état du cache des empreintes, sérialisable en JSON (voir `Snapshotter`).
+
+            :return: dict - Les périodes de silence en cours et leurs occurrences retenues.
+        """
+        return self._windows.snapshot(lambda w: [
+            w.start, w.repeats, w.first.isoformat() if w.first else None, _encode_alert(w.last) if w.last else None,
+        ])
+
+    def restore(self, state: dict):
+        """
+            Restaure l'état du cache des empreintes depuis un instantané (`snapshot`).
+
+            :param state: dict - L'état sauvegardé.
+        """
+        def decode(data: list) -> _Cooldown:
+            window = _Cooldown()
+            window.start, window.repeats, first, last = data
+            window.first = datetime.fromisoformat(first) if first else None
+            window.last = _decode_alert(last) if last else None
+            return window
+        self._windows.restore(state, decode)
+        self._pending = [(window.start, key) for key, window in self._windows.items() if window.repeats]
+        heapq.heapify(self._pending)
+
+
+def build_suppressor(config, metrics: Metrics = NULL_METRICS) -> Suppressor | None:
+    """
+        Construit la couche de suppression décrite par la section `suppression` de la configuration.
+
+        :param config: Config - La configuration.
+        :param metrics: Metrics - Les métriques du pipeline.
+        :return: Suppressor | None - La couche de suppression, ou None si elle est désactivée.
+    """
+    if not config.get("suppression.enabled", False):
+        return None
+    return Suppressor(config.get("suppression.cooldown_seconds", 60), config.get("suppression.max_entries", 10000),
+                      metrics)
@@ -0,0 +1,38 @@
+import json
+
+from app.services.aggregates import Aggregates, refresh_aggregates
+
+
+def line(second, level):
+    return json.dumps({"timestamp": f"2025-07-11T10:{second // 60:02d}:{second % 60:02d}Z",
+                       "level": level, "message": "m"}) + "\n"
+
+
+def test_refresh_reads_only_appended_lines(tmp_path):
+    log_path = tmp_path / "events.log"
+    alert_path = tmp_path / "alerts.json"
+    store = str(tmp_path / "aggregates.json")
+    log_path.write_text(line(0, "info") + line(30, "CRITICAL") + line(61, "CRITICAL") + "{partiel")
+    alert_path.write_text(json.dumps({"triggered_at": "2025-07-11T10:01:01+00:00", "events": [], "rule": "default"}) + "\n")
+
+    aggregates = refresh_aggregates(str(log_path), str(alert_path), store)
+    assert aggregates.level_counts == {"INFO": 1, "CRITICAL": 2}
+    assert sorted(aggregates.buckets.values(), key=len) == [{"CRITICAL": 1}, {"INFO": 1, "CRITICAL": 1}]
+    assert aggregates.alert_counts == {"default": 1}
+
+    with open(log_path, "a") as f:
+        f.write('", "x": 1}\n' + line(62, "ERROR"))  # La ligne partielle est complétée (mais invalide)
+    aggregates = refresh_aggregates(str(log_path), str(alert_path), store)
+    assert aggregates.total_events == 4
+    assert Aggregates.load(store).level_counts == {"INFO": 1, "CRITICAL": 2, "ERROR": 1}
+
+
+def test_truncated_log_triggers_rebuild(tmp_path):
+    log_path = tmp_path / "events.log"
+    store = str(tmp_path / "aggregates.json")
+    log_path.write_text(line(0, "INFO") + line(1, "INFO"))
+    refresh_aggregates(str(log_path), None, store)
+
+    log_path.write_text(line(2, "ERROR"))
+    assert refresh_aggregates(str(log_path), None, store).level_counts == {"ERROR": 1}
+    assert refresh_aggregates(str(log_path), None, store, rebuild=True).total_events == 1
@@ -0,0 +1,80 @@
+import datetime
+import json
+
+import pytest
+
+from app.models.alerts_model import Alert
+from app.models.event_model import Event
+from app.providers.alert_index import AlertIndex, query_records
+from app.providers.alert_store import append_records, compact_alerts
+from app.providers.alerts_provider import query_alerts
+
+
+def make_alert(second, level):
+    event = Event({"timestamp": f"2025-07-11T10:{second // 60:02d}:{second % 60:02d}Z", "level": level,
+                   "message": f"m{second}"})
+    return Alert(triggered_at=event.timestamp, events=[event])
+
+
+def write_alerts(path, seconds):
+    levels = ["CRITICAL", "ERROR", "WARNING"]
+    append_records([make_alert(s, levels[s % 3] if s < 500 else "FATAL").to_dict() for s in seconds], path)
+
+
+@pytest.fixture
+def alert_path(tmp_path):
+    path = str(tmp_path / "alerts.json")
+    write_alerts(path, range(600))
+    return path
+
+
+def messages(alerts):
+    return [a.events[0].message for a in alerts]
+
+
+def test_query_filters_and_paginates(alert_path):
+    alerts = query_alerts(alert_path, since="2025-07-11T10:01:00Z", until="2025-07-11T10:01:59Z",
+                          levels=["critical"], limit=5, offset=2)
+    assert messages(alerts) == [f"m{s}" for s in range(66, 81, 3)]
+    assert messages(query_alerts(alert_path, levels=["FATAL"], offset=98)) == ["m598", "m599"]
+    assert messages(query_alerts(alert_path, offset=590, limit=3)) == ["m590", "m591", "m592"]
+    assert list(query_alerts(alert_path, since="2025-07-11T11:00:00Z")) == []
+
+
+def test_index_skips_blocks_without_requested_levels(alert_path):
+    index = AlertIndex.load(alert_path, f"{alert_path}.idx", 16)
+    assert index.update()
+    assert sum(block[3] for block in index.blocks) == 600
+    fatal = [block for block in index.blocks if "FATAL" in block[4]]
+    assert fatal[0][1] <= Event({"timestamp": "2025-07-11T10:08:20Z"}).epoch_ns <= fatal[-1][2]
+    assert len(fatal) == 600 // 16 - 500 // 16 + 1
+
+
+def test_index_is_incremental_and_follows_compaction(alert_path):
+    list(query_records(alert_path, block_records=16))
+    index = AlertIndex.load(alert_path, f"{alert_path}.idx", 16)
+    assert index.blocks and not index.update()
+    write_alerts(alert_path, range(600, 610))
+    assert [r["events"][0]["message"] for r in query_records(alert_path, offset=608, block_records=16)] \
+        == ["m608", "m609"]
+    compact_alerts(alert_path, keep_last=4)
+    assert [r["events"][0]["message"] for r in query_records(alert_path, block_records=16)] \
+        == ["m606", "m607", "m608", "m609"]
+
+
+def test_legacy_file_is_queried_without_index(tmp_path):
+    path = str(tmp_path / "alerts.json")
+    with open(path, "w") as f:
+        json.dump([make_alert(s, "ERROR" if s % 2 else "INFO").to_dict() for s in range(10)], f, indent=2)
+    assert messages(query_alerts(path, levels=["ERROR"], limit=2, offset=1)) == ["m3", "m5"]
+    assert not (tmp_path / "alerts.json.idx").exists()
+
+
+def test_alerts_without_stored_levels_are_filtered_on_their_events(tmp_path):
+    path = str(tmp_path / "alerts.json")
+    record = make_alert(5, "CRITICAL").to_dict()
+    del record["levels"]
+    append_records([record], path)
+    assert messages(query_alerts(path, levels=["CRITICAL"])) == ["m5"]
+    assert list(query_alerts(path, levels=["INFO"])) == []
+    assert messages(query_alerts(path, since=datetime.datetime(2025, 7, 11, 10, 0, 5))) == ["m5"]
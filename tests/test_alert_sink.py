@@ -0,0 +1,122 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.providers.alert_backends import FileBackend, SQLiteBackend, WebhookBackend
+from app.providers.alert_store import iter_records
+from app.services.alert_sink import AlertSink, SinkChannel
+
+
+def record(i):
+    return {"triggered_at": f"2025-07-11T10:00:{i % 60:02d}", "rule": "errors", "key": i, "events": [{"level": "ERROR"}]}
+
+
+class FailingBackend:
+    name = "failing"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    def write(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("indisponible")
+        self.batches.append(list(records))
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_file_and_sqlite_backends_receive_batches(tmp_path):
+    alert_path, db_path = tmp_path / "alerts.json", tmp_path / "alerts.db"
+    sink = AlertSink([FileBackend(str(alert_path)), SQLiteBackend(str(db_path))], batch_size=10, flush_interval=0.05)
+    sink.start()
+    for i in range(25):
+        sink.submit(record(i))
+    await sink.close()
+
+    assert [r["key"] for r in iter_records(str(alert_path))] == list(range(25))
+    with sqlite3.connect(db_path) as db:
+        rows = db.execute("SELECT key, event_count, record FROM alerts ORDER BY id").fetchall()
+    assert [int(key) for key, _, _ in rows] == list(range(25))
+    assert {count for _, count, _ in rows} == {1}
+    assert json.loads(rows[0][2])["rule"] == "errors"
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_with_backoff():
+    backend = FailingBackend(failures=2)
+    channel = SinkChannel(backend, batch_size=5, flush_interval=0.01, backoff=0.001)
+    channel.start()
+    for i in range(5):
+        channel.submit(record(i))
+    await channel.close()
+    assert [len(b) for b in backend.batches] == [5]
+    assert channel.written == 5 and channel.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_is_given_up_after_retries():
+    channel = SinkChannel(FailingBackend(failures=10), retries=1, backoff=0.001, flush_interval=0.01)
+    channel.start()
+    channel.submit(record(0))
+    await channel.close()
+    assert channel.failed == 1 and channel.written == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_without_blocking():
+    channel = SinkChannel(FailingBackend(failures=0), max_pending=3)
+    accepted = [channel.submit(record(i)) for i in range(5)]
+    assert accepted == [True, True, True, False, False]
+    assert channel.dropped == 2 and channel.pending == 3
+
+
+@pytest.fixture
+def webhook():
+    received, statuses = [], [500]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            status = statuses.pop(0) if statuses else 200
+            if status == 200:
+                received.append(json.loads(body)["alerts"])
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/alerts", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_webhook_retries_and_reuses_connections(webhook):
+    url, received = webhook
+    backend = WebhookBackend(url, pool_size=1)
+    channel = SinkChannel(backend, batch_size=4, flush_interval=0.01, backoff=0.001)
+    channel.start()
+    for i in range(4):
+        channel.submit(record(i))
+    await asyncio.sleep(0.1)
+    for i in range(4, 8):
+        channel.submit(record(i))
+    await channel.close()
+
+    assert [[r["key"] for r in batch] for batch in received] == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert backend.connections_opened == 1
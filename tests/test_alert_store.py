@@ -0,0 +1,72 @@
+import datetime
+import json
+
+import pytest
+
+from app.models.alerts_model import Alert
+from app.models.event_model import Event
+from app.providers.alert_store import close_writers, compact_alerts, is_legacy_file, migrate_alerts
+from app.providers.alerts_provider import iter_alerts, load_alerts, save_alerts
+
+
+def make_alert(message):
+    event = Event({
+        'timestamp': '2025-07-11T10:00:00',
+        'level': 'CRITICAL',
+        'message': message
+    })
+    return Alert(triggered_at=datetime.datetime(2025, 7, 11, 10, 0, 0), events=[event])
+
+
+@pytest.fixture
+def alert_path(tmp_path):
+    return str(tmp_path / "alerts.json")
+
+
+def test_save_alerts_appends_one_line_per_alert(alert_path):
+    for i in range(3):
+        save_alerts(make_alert(f"alerte {i}"), alert_path)
+
+    with open(alert_path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3
+    assert [a.events[0].message for a in iter_alerts(alert_path)] == ["alerte 0", "alerte 1", "alerte 2"]
+
+
+def test_legacy_file_is_migrated(alert_path):
+    with open(alert_path, "w") as f:
+        json.dump([make_alert("ancienne").to_dict()], f, indent=2)
+    assert is_legacy_file(alert_path)
+    assert [a.events[0].message for a in load_alerts(alert_path)] == ["ancienne"]
+
+    assert migrate_alerts(alert_path) == 1
+    assert not is_legacy_file(alert_path)
+    save_alerts(make_alert("nouvelle"), alert_path)
+    assert [a.events[0].message for a in load_alerts(alert_path)] == ["ancienne", "nouvelle"]
+
+
+def test_compact_drops_corrupt_lines_and_keeps_last(alert_path):
+    for i in range(4):
+        save_alerts(make_alert(f"alerte {i}"), alert_path)
+    with open(alert_path, "a") as f:
+        f.write('{"triggered_at": "2025-07')  # enregistrement tronqué
+
+    assert len(load_alerts(alert_path)) == 4
+    assert compact_alerts(alert_path, keep_last=2) == 2
+    assert [a.events[0].message for a in load_alerts(alert_path)] == ["alerte 2", "alerte 3"]
+
+    # L'écrivain est rouvert sur le fichier compacté
+    save_alerts(make_alert("alerte 4"), alert_path)
+    assert len(load_alerts(alert_path)) == 3
+
+
+def test_torn_tail_is_dropped_before_appending(alert_path):
+    save_alerts(make_alert("one"), alert_path)
+    save_alerts(make_alert("two"), alert_path)
+    close_writers()
+    with open(alert_path, "rb+") as f:
+        f.truncate(f.seek(0, 2) - 10)  # Arrêt brutal au milieu de l'écriture de "two"
+
+    save_alerts(make_alert("three"), alert_path)
+    save_alerts(make_alert("four"), alert_path)
+    assert [a.events[0].message for a in load_alerts(alert_path)] == ["one", "three", "four"]
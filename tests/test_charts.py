@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.services import charts
+from app.services.charts import ChartCache, chart_key
+
+PNG_HEADER = b"\x89PNG"
+
+
+def distribution(*counts):
+    return ("distribution", {"levels": ["INFO", "ERROR", "CRITICAL"][:len(counts)], "counts": np.array(counts)})
+
+
+def rate():
+    times = 1752228000 + 60 * np.arange(5)
+    return ("rate", {"times": times, "rate": np.array([3.0, 0, 2, 5, 1]), "alert_rate": np.zeros(5)})
+
+
+def test_key_depends_on_content():
+    assert chart_key(*distribution(3, 1)) == chart_key(*distribution(3, 1))
+    assert chart_key(*distribution(3, 1)) != chart_key(*distribution(3, 2))
+    assert chart_key("distribution", {"levels": ["A"], "counts": np.array([1], dtype=np.int64)}) \
+        != chart_key("distribution", {"levels": ["A"], "counts": np.array([1], dtype=np.int32)})
+
+
+def test_charts_are_rendered_in_pool_and_reused(tmp_path, monkeypatch):
+    cache = ChartCache(str(tmp_path), workers=2)
+    paths = cache.render([distribution(3, 1), rate()])
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(4) == PNG_HEADER
+
+    def fail(*args):
+        raise AssertionError("graphique déjà en cache")
+    monkeypatch.setattr(charts, "_render", fail)
+    assert cache.render([distribution(3, 1), rate()]) == paths
+
+
+def test_figures_are_closed(tmp_path):
+    plt = pytest.importorskip("matplotlib.pyplot")
+    ChartCache(str(tmp_path), workers=1).render([distribution(1, 2), rate()])
+    assert plt.get_backend().lower() == "agg"
+    assert plt.get_fignums() == []
+
+
+def test_least_recently_used_images_are_evicted(tmp_path):
+    cache = ChartCache(str(tmp_path), workers=1)
+    first, = cache.render([distribution(1)])
+    second, = cache.render([distribution(2)])
+    os.utime(first, (0, 0))
+    os.utime(second, (1, 1))
+    cache.max_bytes = os.path.getsize(second) + os.path.getsize(first) // 2
+
+    third, = cache.render([distribution(3)])
+    assert not os.path.exists(first)
+    assert os.path.exists(third)
+    cache.max_bytes = 0
+    cache.evict(keep=[third])
+    assert os.listdir(tmp_path) == [os.path.basename(third)]
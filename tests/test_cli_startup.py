@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Bibliothèques de tracé, de tableaux et de PDF : réservées aux commandes de rapport
+HEAVY = ("matplotlib", "pandas", "numpy", "fpdf", "PIL")
+
+PROBE = """
+import runpy, sys
+main, args = sys.argv[1], sys.argv[2:]
+sys.argv = ["main.py", *args]
+try:
+    runpy.run_path(main, run_name="__main__")
+except SystemExit:
+    pass
+print("MODULES=" + ",".join(sorted({m.split(".")[0] for m in sys.modules} & set(%r))))
+""" % (HEAVY,)
+
+
+def loaded_modules(cwd, *args) -> list[str]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT / "src"), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", PROBE, str(ROOT / "main.py"), *args],
+                            cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+    line = next(line for line in result.stdout.splitlines() if line.startswith("MODULES="))
+    return [m for m in line[len("MODULES="):].split(",") if m]
+
+
+@pytest.mark.parametrize("args", [["show-alerts"], ["clean-reports"], ["--help"]])
+def test_light_commands_do_not_import_heavy_libraries(tmp_path, args):
+    assert loaded_modules(tmp_path, *args) == []
+
+
+def test_run_does_not_import_heavy_libraries(tmp_path):
+    with open(tmp_path / "events.log", "w") as f:
+        for i in range(5):
+            f.write(json.dumps({"timestamp": f"2025-07-11T10:00:0{i}", "level": "CRITICAL", "message": "panne"}) + "\n")
+    assert loaded_modules(tmp_path, "run", "--file-path", "events.log") == []
+    assert (tmp_path / "alerts.json").exists()
@@ -0,0 +1,85 @@
+import pytest
+
+from app.models import codec
+from app.models.event_model import Event
+from app.providers.alert_store import AlertLogWriter, iter_records, scan_records
+
+LINE = b'{"timestamp": "2025-07-11T10:00:00Z", "level": "error", "message": "\xc3\xa9chec", "host": "web-1"}'
+
+
+@pytest.fixture(params=codec.BACKENDS)
+def backend(request):
+    selected = codec.use(request.param)
+    yield selected
+    codec.use("auto")
+
+
+def test_backends_round_trip(backend):
+    record = {"message": "échec", "count": 3, "nested": {"values": [1.5, None, True]}}
+    encoded = codec.dumps(record)
+    assert " " not in encoded.replace("é", "")  # JSON compact
+    assert codec.loads(encoded) == record
+    assert codec.loads(encoded.encode()) == record
+    assert codec.loads(codec.dumps(record, indent=2)) == record
+    assert "\n" in codec.dumps(record, indent=2)
+
+
+def test_invalid_line_raises_decode_error(backend):
+    with pytest.raises(codec.DecodeError):
+        codec.loads(b'{"level": ')
+
+
+def test_event_from_line_matches_constructor(backend):
+    event = Event.from_line(LINE, offset=12)
+    expected = Event(codec.loads(LINE))
+    assert (event.epoch_ns, event.level, event.message, event.offset) == (expected.epoch_ns, "ERROR", "échec", 12)
+    assert event.raw["host"] == "web-1"
+
+
+def test_non_finite_values_decode_like_the_json_module(backend):
+    line = b'{"timestamp": "2025-07-11T10:00:00Z", "level": "ERROR", "message": "capteur", "value": NaN, "max": -Infinity}'
+    record = codec.loads(line)
+    assert record["value"] != record["value"] and record["max"] == float("-inf")
+    assert codec.loads(line.decode())["max"] == float("-inf")
+    event = Event.from_line(line)
+    assert (event.level, event.message) == ("ERROR", "capteur")
+    assert event.raw["max"] == float("-inf")
+    with pytest.raises(codec.DecodeError):
+        codec.loads(b'{"value": NaN')
+
+
+def test_msgspec_decodes_raw_lazily():
+    pytest.importorskip("msgspec")
+    assert codec.use("msgspec") == "msgspec"
+    try:
+        event = Event.from_line(LINE)
+        assert event._raw is None  # Seuls les champs typés sont décodés
+        assert event.raw["host"] == "web-1"
+        with pytest.raises(codec.DecodeError):
+            Event.from_line(b'{"level": "INFO"}')  # Horodatage manquant
+    finally:
+        codec.use("auto")
+
+
+def test_unknown_backend_falls_back_to_available():
+    try:
+        assert codec.use("inconnu") in codec.BACKENDS
+        assert codec.use("json") == "json"
+    finally:
+        codec.use("auto")
+
+
+def test_indented_alert_file_is_readable(tmp_path):
+    path = str(tmp_path / "alerts.json")
+    writer = AlertLogWriter(path, indent=2)
+    writer.append({"triggered_at": "2025-07-11T10:00:00", "rule": "a", "events": [{"level": "CRITICAL"}]})
+    writer.close()
+    with open(path, "a") as f:
+        f.write('{"triggered_at": "2025-07-11T10:00:01", "rule": "b", "events": []}\n')
+        f.write('{\n  "rule": "tronquée"')  # Enregistrement en cours d'écriture
+
+    assert [r["rule"] for r in iter_records(path)] == ["a", "b"]
+    records = list(scan_records(path))
+    assert [r["rule"] for r, _ in records] == ["a", "b"]
+    with open(path, "rb") as f:
+        assert f.read()[records[-1][1]:].startswith(b"{\n")
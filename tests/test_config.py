@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+from app.configs.config import Config
+from app.models.event_model import Event
+from app.services.events_analyzer import EventAnalyzer, load_rules
+from app.services.process.reload import apply_reload, watch_config
+
+
+def write_rules(path, count, mtime=None):
+    with open(path, "w") as f:
+        f.write(f"""
+[event_analyzer]
+default_rule = false
+rules = [{{ name = "errors", type = "threshold", levels = ["ERROR"], count = {count}, window_seconds = 60 }}]
+""")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def error(second):
+    return Event({"timestamp": f"2025-07-11T10:00:{second:02d}Z", "level": "ERROR", "message": f"e{second}"})
+
+
+def test_layers_override_defaults_in_order(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "config.yaml"
+    path.write_text("pipeline:\n  batch_size: 500\n  workers: 2\nevent_analyzer:\n  window_seconds: 10\n")
+    config = Config(str(path), environ={"ALERT_FLOW_PIPELINE__WORKERS": "4", "ALERT_FLOW_CODEC__BACKEND": "json",
+                                        "ALERT_FLOW_CONFIG": "ignored.toml"})
+    assert config.get("pipeline.batch_size") == 500
+    assert config.get("pipeline.workers") == 4
+    assert config.get("codec.backend") == "json"
+    assert config.get("event_analyzer.window_seconds") == 10
+    assert config.get("event_analyzer.critical_levels") == ["CRITICAL"]
+    assert config.get("pipeline")["max_queue_depth"] == 100
+    assert config.get("pipeline.unknown", "x") == "x"
+
+
+def test_missing_toml_parser_is_reported_as_value_error(tmp_path, monkeypatch):
+    path = tmp_path / "config.toml"
+    write_rules(path, 3)
+    monkeypatch.setitem(sys.modules, "tomllib", None)  # Python < 3.11, sans tomli
+    monkeypatch.setitem(sys.modules, "tomli", None)
+    with pytest.raises(ValueError, match="tomli"):
+        Config(str(path), environ={})
+
+
+def test_reload_reports_changes_and_keeps_config_on_error(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"follow": {"poll_interval": 1.0}}))
+    config = Config(str(path), environ={})
+    assert not config.file_changed()
+    path.write_text(json.dumps({"follow": {"poll_interval": 2.0}, "metrics": {"enabled": True}}))
+    os.utime(path, ns=(1, 1))
+    assert config.file_changed()
+    assert config.reload() == ["follow.poll_interval", "metrics.enabled"]
+    path.write_text("{invalide")
+    with pytest.raises(ValueError):
+        config.reload()
+    assert config.get("follow.poll_interval") == 2.0
+    assert not config.file_changed()  # Le fichier invalide n'est signalé qu'une fois
+
+
+def test_retuned_rules_keep_their_windows(tmp_path):
+    path = tmp_path / "config.toml"
+    write_rules(path, 4)
+    config = Config(str(path), environ={})
+    analyzer = EventAnalyzer(load_rules(config))
+    assert analyzer.analyze_batch([error(s) for s in range(3)]) == []
+    write_rules(path, 3)
+    assert apply_reload(config, analyzer) == ["event_analyzer.rules"]
+    alerts = analyzer.evaluate(error(3))
+    assert [e.message for e in alerts[0].events] == ["e0", "e1", "e2", "e3"]
+
+
+@pytest.mark.asyncio
+async def test_watch_config_reloads_on_file_change(tmp_path):
+    path = tmp_path / "config.toml"
+    write_rules(path, 4, mtime=10**18)
+    config = Config(str(path), environ={})
+    analyzer = EventAnalyzer(load_rules(config))
+    rule = analyzer.engine.rules[0]
+    watcher = asyncio.create_task(watch_config(config, analyzer, interval=0.01))
+    write_rules(path, 2, mtime=2 * 10**18)
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if analyzer.engine.rules[0] is not rule:
+            break
+    watcher.cancel()
+    assert analyzer.engine.rules[0].count == 2
+
+
+@pytest.mark.asyncio
+async def test_watch_config_survives_invalid_yaml(tmp_path, capsys):
+    pytest.importorskip("yaml")
+    path = tmp_path / "config.yaml"
+    path.write_text("event_analyzer:\n  window_seconds: 30\n")
+    config = Config(str(path), environ={})
+    analyzer = EventAnalyzer(load_rules(config))
+    watcher = asyncio.create_task(watch_config(config, analyzer, interval=0.01))
+
+    async def edit(text, mtime):
+        path.write_text(text)
+        os.utime(path, ns=(mtime, mtime))
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not config.file_changed():
+                break
+        await asyncio.sleep(0.03)
+
+    await edit("event_analyzer: [window_seconds: 5\n", 10**18)
+    assert not watcher.done()
+    assert "Configuration non rechargée" in capsys.readouterr().out
+    assert config.get("event_analyzer.window_seconds") == 30
+
+    await edit("event_analyzer:\n  window_seconds: 5\n", 2 * 10**18)
+    watcher.cancel()
+    assert config.get("event_analyzer.window_seconds") == 5
+    assert analyzer.engine.rules[0].window == 5 * 10**9
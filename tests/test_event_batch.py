@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app.models.event_batch import EventBatch
+from app.models.event_model import Event
+
+
+LINES = [
+    json.dumps({"timestamp": "2025-07-11T10:00:00Z", "level": "info", "message": "démarrage", "host": "a"}),
+    json.dumps({"timestamp": "2025-07-11T10:00:01.500000", "level": "CRITICAL", "message": "panne"}),
+    "pas du json",
+    json.dumps({"timestamp": "2025-07-11T10:00:02+00:00", "level": "critical", "message": "panne"}),
+]
+
+
+def test_event_has_no_instance_dict_and_interned_levels():
+    a = Event(json.loads(LINES[1]))
+    b = Event(json.loads(LINES[3]))
+    assert not hasattr(a, "__dict__")
+    assert a.level is b.level
+
+
+def test_batch_columns_and_lazy_access():
+    batch = EventBatch.from_lines(LINES)
+    assert len(batch) == 3
+    assert batch.level_counts() == {"INFO": 1, "CRITICAL": 2}
+    assert batch.timestamps[1] - batch.timestamps[0] == 1_500_000_000
+    assert batch.message(0) == "démarrage"
+    assert batch.raw(0)["host"] == "a"
+    assert [e.message for e in batch] == ["démarrage", "panne", "panne"]
+    assert batch[-1].level == "CRITICAL"
+
+    columns = batch.to_numpy()
+    assert columns["level_codes"].tolist() == [0, 1, 1]
+
+
+def test_batch_accepts_appends_after_numpy_export():
+    pytest.importorskip("numpy")
+    batch = EventBatch.from_lines(LINES[:2])
+    columns = batch.to_numpy()
+    batch.append_line(json.dumps({"timestamp": "2025-07-11T10:00:03Z", "level": "warning", "message": "disque"}))
+    assert batch.level_names == ["INFO", "CRITICAL", "WARNING"] and len(batch) == 3
+    assert columns["level_codes"].tolist() == [0, 1]
+    assert batch.to_numpy()["timestamps"].tolist() == list(batch.timestamps)
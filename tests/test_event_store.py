@@ -0,0 +1,85 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from app.models.timestamps import to_epoch_ns
+from app.providers.alerts_provider import load_alerts
+from app.providers.event_store import EventIndex, EventStore, read_events_at
+from app.providers.events_provider import load_events
+from app.services.events_analyzer import EventAnalyzer
+from app.services.process.process_lines import process_batches
+from app.services.process.read import read_batches
+
+
+def write_events(path, seconds, mode="w"):
+    with open(path, mode) as f:
+        for i, s in enumerate(seconds):
+            level = "CRITICAL" if i % 3 == 0 else "INFO"
+            f.write(json.dumps({"timestamp": f"2025-07-11T10:{s // 60:02d}:{s % 60:02d}Z", "level": level,
+                                "message": f"m{s}"}) + "\n")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    # Horodatages globalement croissants mais légèrement désordonnés
+    rng = random.Random(1)
+    seconds = sorted(range(600), key=lambda s: s + rng.randint(-5, 5))
+    path = tmp_path / "events.log"
+    write_events(path, seconds)
+    return str(path)
+
+
+def test_range_query_matches_full_scan(log_file):
+    store = EventStore(log_file, block_lines=16)
+    everything = list(store.query())
+    assert len(everything) == 600
+    for since, until in [(0, 59), (100, 130), (590, 700), (-10, -1)]:
+        since_ns = to_epoch_ns("2025-07-11T10:00:00Z") + since * 10**9
+        until_ns = to_epoch_ns("2025-07-11T10:00:00Z") + until * 10**9
+        expected = [e.message for e in everything if since_ns <= e.epoch_ns <= until_ns and e.level == "CRITICAL"]
+        assert [e.message for e in store.query(since_ns, until_ns, ["critical"])] == expected
+
+
+def test_index_seeks_to_candidate_blocks(log_file):
+    store = EventStore(log_file, block_lines=16)
+    since_ns = to_epoch_ns("2025-07-11T10:05:00Z")
+    first, last = store.index.block_range(since_ns, since_ns + 10 * 10**9)
+    assert last - first <= 3
+    assert len(store.index.blocks) == 600 // 16 + 1
+
+
+def test_load_events_filters_and_offsets(log_file):
+    events = load_events(log_file, since="2025-07-11T10:01:00Z", until="2025-07-11T10:01:09Z")
+    assert sorted(e.message for e in events) == [f"m{s}" for s in range(60, 70)]
+    assert [e.message for e in read_events_at(log_file, [e.offset for e in events])] == [e.message for e in events]
+
+
+def test_index_is_incremental(log_file, tmp_path):
+    index = EventIndex.load(log_file, str(tmp_path / "events.log.idx"), 16)
+    assert index.update()
+    assert not index.update()
+    write_events(log_file, range(600, 610), mode="a")
+    assert index.update()
+    assert sum(block[3] for block in index.blocks) == 610
+    write_events(log_file, range(5))  # Troncature : réindexation complète
+    assert index.update()
+    assert sum(block[3] for block in index.blocks) == 5
+
+
+@pytest.mark.asyncio
+async def test_alerts_reference_events_by_offset(log_file, tmp_path):
+    alert_path = str(tmp_path / "alerts.json")
+    queue = asyncio.Queue()
+    producer = asyncio.create_task(read_batches(log_file, queue, batch_size=50, offsets=True))
+    consumer = asyncio.create_task(process_batches(queue, EventAnalyzer(), alert_path, source=log_file))
+    await producer
+    await queue.join()
+    consumer.cancel()
+
+    with open(alert_path) as f:
+        records = [json.loads(line) for line in f]
+    assert records and all("event_refs" in r and "events" not in r for r in records)
+    alerts = load_alerts(alert_path)
+    assert all(len(a.events) == 3 and {e.level for e in a.events} == {"CRITICAL"} for a in alerts)
@@ -0,0 +1,132 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.process.checkpoint import load_checkpoint
+from app.services.process.read import follow_lines
+
+
+async def collect(queue, received):
+    while True:
+        received.append(await queue.get())
+        queue.task_done()
+
+
+async def wait_for(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "délai dépassé"
+        await asyncio.sleep(0.01)
+
+
+async def start(log_path, checkpoint_path, received):
+    queue = asyncio.Queue()
+    stop = asyncio.Event()
+    reader = asyncio.create_task(follow_lines(str(log_path), queue, 0.01, str(checkpoint_path), stop=stop))
+    consumer = asyncio.create_task(collect(queue, received))
+    return stop, reader, consumer
+
+
+async def shutdown(stop, reader, consumer):
+    stop.set()
+    await reader
+    consumer.cancel()
+
+
+@pytest.mark.asyncio
+async def test_follow_appends_rotation_and_truncation(tmp_path):
+    log_path = tmp_path / "events.log"
+    checkpoint_path = tmp_path / "events.log.checkpoint"
+    log_path.write_text("a\nb\n")
+    received = []
+    handles = await start(log_path, checkpoint_path, received)
+
+    await wait_for(lambda: received == ["a", "b"])
+    with open(log_path, "a") as f:
+        f.write("c\npartiel")
+    await wait_for(lambda: received == ["a", "b", "c"])
+    with open(log_path, "a") as f:
+        f.write("-fin\n")
+    await wait_for(lambda: received[-1] == "partiel-fin")
+
+    os.rename(log_path, tmp_path / "events.log.1")
+    log_path.write_text("d\n")
+    await wait_for(lambda: received[-1] == "d")
+
+    log_path.write_text("")
+    await asyncio.sleep(0.05)
+    log_path.write_text("e\n")
+    await wait_for(lambda: received[-1] == "e")
+    await shutdown(*handles)
+
+
+@pytest.mark.asyncio
+async def test_follow_resumes_from_checkpoint(tmp_path):
+    log_path = tmp_path / "events.log"
+    checkpoint_path = tmp_path / "events.log.checkpoint"
+    log_path.write_text("a\nb\n")
+
+    received = []
+    handles = await start(log_path, checkpoint_path, received)
+    await wait_for(lambda: (load_checkpoint(str(checkpoint_path)) or {}).get("offset") == 4)
+    await shutdown(*handles)
+
+    with open(log_path, "a") as f:
+        f.write("c\n")
+    received = []
+    handles = await start(log_path, checkpoint_path, received)
+    await wait_for(lambda: received == ["c"])
+    await shutdown(*handles)
+
+
+@pytest.mark.asyncio
+async def test_follow_drains_old_file_on_rotation(tmp_path):
+    log_path = tmp_path / "events.log"
+    log_path.write_text("a\n")
+    queue = asyncio.Queue()
+    stop = asyncio.Event()
+    received = []
+
+    async def rotate_on_first_line():
+        while True:
+            line = await queue.get()
+            received.append(line)
+            if line == "a":
+                # Rotation par renommage : l'écrivain termine l'ancien fichier avant de passer au nouveau
+                os.rename(log_path, tmp_path / "events.log.1")
+                with open(tmp_path / "events.log.1", "a") as f:
+                    f.write("b\nfin")
+                log_path.write_text("c\n")
+            queue.task_done()
+
+    consumer = asyncio.create_task(rotate_on_first_line())
+    reader = asyncio.create_task(follow_lines(str(log_path), queue, 0.01, str(tmp_path / "events.log.checkpoint"),
+                                              stop=stop))
+    await wait_for(lambda: received[-1:] == ["c"])
+    assert received == ["a", "b", "fin", "c"]
+    await shutdown(stop, reader, consumer)
+
+
+@pytest.mark.asyncio
+async def test_follow_checkpoints_during_continuous_reading(tmp_path):
+    log_path = tmp_path / "events.log"
+    checkpoint_path = tmp_path / "events.log.checkpoint"
+    log_path.write_text("a\nb\nc\n")
+    queue = asyncio.Queue()
+    stop = asyncio.Event()
+    seen = []
+
+    async def record_checkpoints():
+        while True:
+            line = await queue.get()
+            seen.append((line, (load_checkpoint(str(checkpoint_path)) or {}).get("offset")))
+            queue.task_done()
+
+    consumer = asyncio.create_task(record_checkpoints())
+    reader = asyncio.create_task(follow_lines(str(log_path), queue, 0.01, str(checkpoint_path), chunk_size=2,
+                                              stop=stop, checkpoint_interval=0))
+    await wait_for(lambda: len(seen) == 3)
+    assert seen == [("a", None), ("b", 2), ("c", 4)]  # Sans attendre la fin du fichier
+    await shutdown(stop, reader, consumer)
@@ -0,0 +1,49 @@
+import datetime
+import json
+import re
+
+from app.models.alerts_model import Alert
+from app.models.event_model import Event
+from app.services.aggregates import Aggregates
+from app.services.process import report_generator
+from app.services.report_stats import ReportStats
+
+
+def make_alerts(count):
+    for i in range(count):
+        event = Event({"timestamp": "2025-07-11T10:00:00", "level": "CRITICAL", "message": "<panne>"})
+        yield Alert(triggered_at=datetime.datetime(2025, 7, 11, 10, 0, i % 60), events=[event, event],
+                    rule="rafale", key=f"host-{i}")
+
+
+def generate(tmp_path, monkeypatch, count, **kwargs):
+    monkeypatch.setattr(report_generator.webbrowser, "open", lambda *args, **kw: True)
+    output = tmp_path / "report.html"
+    stats = ReportStats.from_aggregates(Aggregates(), make_alerts(count))
+    report_generator.generate_html(stats, make_alerts(count), str(output), page_size=4, **kwargs)
+    return output.read_text(), tmp_path / "report_data"
+
+
+def test_alerts_are_written_in_lazy_pages(tmp_path, monkeypatch):
+    html, data_dir = generate(tmp_path, monkeypatch, 10)
+
+    assert "<b>Alertes :</b> 10" in html
+    assert len(re.findall(r'<tr data-level="CRITICAL">', html)) == 4  # Seule la première page est dans le document
+    assert "var reportPages = {total: 3, current: 1, directory: \"report_data\"}" in html
+    assert "&lt;panne&gt;" not in html and "<panne>" not in html  # Les événements ne sont pas recopiés
+
+    segments = sorted(p.name for p in data_dir.iterdir())
+    assert segments == ["alerts_00001.js", "alerts_00002.js", "alerts_00003.js"]
+    last = (data_dir / "alerts_00003.js").read_text()
+    number, rows = re.fullmatch(r"reportPage\((\d+), (.*)\);\n", last, re.S).groups()
+    assert number == "3"
+    assert json.loads(rows) == [["2025-07-11T10:00:08", "rafale", "host-8", 2, "CRITICAL"],
+                                ["2025-07-11T10:00:09", "rafale", "host-9", 2, "CRITICAL"]]
+
+
+def test_static_report_without_alerts(tmp_path, monkeypatch):
+    html, data_dir = generate(tmp_path, monkeypatch, 0, interactive=False)
+    assert html.rstrip().endswith("</html>")
+    assert "<script>" not in html and 'id="filter"' not in html
+    assert [p.name for p in data_dir.iterdir()] == ["alerts_00001.js"]
+    assert not list(tmp_path.glob("*.tmp"))
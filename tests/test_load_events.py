@@ -0,0 +1,57 @@
+import json
+import random
+
+import pytest
+
+from app.configs.config import Config
+from app.providers import events_provider
+from app.providers.events_provider import load_events, load_events_parallel, split_ranges
+from app.providers.log_scanner import scan_events
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    rng = random.Random(42)
+    path = tmp_path / "events.log"
+    with open(path, "w") as f:
+        for i in range(500):
+            second = rng.randrange(60)
+            suffix = "Z" if i % 3 else ""
+            f.write(json.dumps({"timestamp": f"2025-07-11T10:00:{second:02d}{suffix}",
+                                "level": rng.choice(["info", "ERROR", "CRITICAL"]),
+                                "message": f"m{i}"}) + "\n")
+        f.write("ligne invalide\n")
+    return str(path)
+
+
+def test_split_ranges_are_line_aligned(log_file):
+    ranges = split_ranges(log_file, 7, min_size=1)
+    assert ranges[0][0] == 0
+    with open(log_file, "rb") as f:
+        data = f.read()
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[start - 1:start] == b"\n"
+
+
+def test_parallel_load_is_deterministic(log_file):
+    reference = [e.message for e in load_events_parallel(log_file, workers=1, min_chunk_bytes=1)]
+    assert len(reference) == 500
+    for workers in (2, 3):
+        assert [e.message for e in load_events_parallel(log_file, workers, min_chunk_bytes=1)] == reference
+
+
+def test_load_events_order_does_not_depend_on_workers(log_file, monkeypatch):
+    # Plages d'un octet minimum : le chargement parallèle découpe réellement ce petit fichier
+    config = Config(environ={"ALERT_FLOW_EVENT_LOADER__MIN_CHUNK_BYTES": "1"})
+    monkeypatch.setattr(events_provider, "get_config", lambda: config)
+    reference = [e.message for e in load_events(log_file, workers=1)]
+    assert len(reference) == 500
+    assert reference == [e.message for e in sorted(scan_events(log_file), key=lambda e: e.epoch_ns)]
+    for workers in (2, 3):
+        assert [e.message for e in load_events(log_file, workers=workers)] == reference
+    critical = [m for m, e in zip(reference, load_events(log_file, workers=1)) if e.level == "CRITICAL"]
+    for workers in (1, 3):
+        assert [e.message for e in load_events(log_file, workers=workers, levels=["critical"])] == critical
+    assert [e.message for e in load_events(log_file, since="2025-07-11T10:00:00", until="2025-07-11T10:01:00")] \
+        == reference
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from app.models.event_model import Event
+from app.providers.events_provider import load_events, parse_range
+from app.providers.log_scanner import chunk_bounds, field_value, scan_events, scan_levels
+
+LINES = [
+    '{"timestamp": "2025-07-11T10:00:00Z", "level": "INFO", "message": "démarrage"}',
+    '{"timestamp": "2025-07-11T10:00:01Z", "level": "critical", "message": "disque plein"}',
+    '{"level":"CRITICAL","timestamp":1752228002,"message":"epoch en secondes"}',
+    '{"timestamp": "2025-07-11T10:00:03Z", "level": "\\u0043RITICAL", "message": "niveau échappé"}',
+    '{"timestamp": "2025-07-11T10:00:04Z", "meta": {"level": "INFO"}, "level": "CRITICAL", "message": "imbriqué"}',
+    '{"timestamp": "2025-07-11T10:00:05Z", "message": "level", "level": "INFO"}',
+    '',
+    'pas du json "level": "CRITICAL"',
+    '{"timestamp": "2025-07-11T10:00:06Z", "level": "ERROR", "message": "fin"}',
+]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "events.log"
+    path.write_text("\n".join(LINES) + "\n" + '{"timestamp": "2025-07-11T10:00:07Z", "level": "CRITICAL"')
+    return str(path)
+
+
+def reference_events():
+    events = []
+    for line in LINES:
+        try:
+            events.append(Event(json.loads(line)))
+        except Exception:
+            continue
+    return events
+
+
+def test_field_value():
+    line = b'{"level": "INFO", "ts": 12.5, "n": -3, "flag": true, "esc": "a\\"b"}'
+    assert field_value(line, b'"level"', 0, len(line)) == b"INFO"
+    assert field_value(line, b'"ts"', 0, len(line)) == 12.5
+    assert field_value(line, b'"n"', 0, len(line)) == -3
+    assert field_value(line, b'"flag"', 0, len(line)) is None
+    assert field_value(line, b'"esc"', 0, len(line)) is None
+    assert field_value(line, b'"absent"', 0, len(line)) is None
+
+
+def test_chunk_bounds_align_on_lines():
+    data = b"".join(b"x" * (i % 7) + b"\n" for i in range(100))
+    chunks = list(chunk_bounds(data, size=16))
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+    assert all(data[end - 1:end] == b"\n" for _, end in chunks)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_scan_events_matches_json_decoding(log_file):
+    events = list(scan_events(log_file))
+    expected = reference_events()
+    assert [e.raw for e in events] == [e.raw for e in expected]
+    with open(log_file, "rb") as f:
+        data = f.read()
+    assert [json.loads(data[e.offset:].split(b"\n", 1)[0]) for e in events] == [e.raw for e in events]
+
+
+def test_level_prefilter(log_file):
+    critical = list(scan_events(log_file, ["critical"]))
+    assert [e.message for e in critical] == ["disque plein", "epoch en secondes", "niveau échappé", "imbriqué"]
+    assert [e.message for e in load_events(log_file, workers=1, levels=["ERROR"])] == ["fin"]
+
+
+def test_scan_levels_matches_events(log_file):
+    seen = []
+    offset = scan_levels(log_file, lambda level, epoch_ns, position: seen.append((level, epoch_ns)))
+    assert seen == [(e.level, e.epoch_ns) for e in reference_events()]
+    assert offset == len(("\n".join(LINES) + "\n").encode())  # Dernière ligne incomplète non lue
+
+
+def test_parse_range_uses_scanner(log_file):
+    size = len(("\n".join(LINES) + "\n").encode())
+    events = parse_range(log_file, 0, size)
+    assert sorted(e.message for e in events) == sorted(e.message for e in reference_events())
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_text("")
+    assert list(scan_events(str(path))) == []
+    assert scan_levels(str(path), lambda *args: None) == 0
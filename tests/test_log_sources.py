@@ -0,0 +1,81 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app.providers.alerts_provider import load_alerts
+from app.providers.events_provider import load_events
+from app.providers.log_sources import iter_events, read_keyed_chunks, resolve_sources
+from app.services.events_analyzer import EventAnalyzer
+from app.services.process.process_lines import process_batches
+from app.services.process.read import read_merged
+
+
+def line(second, level, message):
+    return json.dumps({"timestamp": f"2025-07-11T10:00:{second:02d}", "level": level, "message": message}) + "\n"
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    # Trois sources entrelacées dans le temps : un log, une rotation compressée et un autre hôte
+    (tmp_path / "app.log").write_text("".join(line(s, "CRITICAL" if s == 3 else "INFO", f"a{s}") for s in range(0, 12, 3)))
+    with gzip.open(tmp_path / "app.log.1.gz", "wt") as f:
+        f.write("".join(line(s, "CRITICAL" if s == 1 else "INFO", f"b{s}") for s in range(1, 12, 3)))
+    (tmp_path / "db.log").write_text("".join(line(s, "CRITICAL" if s == 2 else "INFO", f"c{s}") for s in range(2, 12, 3))
+                                     + "pas du json\n")
+    (tmp_path / "app.log.idx").write_text("{}")
+    (tmp_path / "notes.txt").write_text("ignoré")
+    return tmp_path
+
+
+def test_resolve_sources(log_dir):
+    names = [p.rsplit("/", 1)[-1] for p in resolve_sources(str(log_dir))]
+    assert names == ["app.log", "app.log.1.gz", "db.log"]
+    assert [p.rsplit("/", 1)[-1] for p in resolve_sources(str(log_dir / "*.log"))] == ["app.log", "db.log"]
+    assert resolve_sources("absent.log") == ["absent.log"]
+
+
+def test_gzip_is_decompressed_transparently(log_dir):
+    assert [e.message for e in iter_events(str(log_dir / "app.log.1.gz"))] == ["b1", "b4", "b7", "b10"]
+    keys = [key for chunk in read_keyed_chunks(str(log_dir / "app.log.1.gz"), chunk_size=50) for key, _ in chunk]
+    assert keys == sorted(keys) and len(keys) == 4
+
+
+def test_load_events_merges_directory(log_dir):
+    events = load_events(str(log_dir), workers=1)
+    assert [e.message for e in events] == [f"{'abc'[s % 3]}{s}" for s in range(12)]
+    assert [e.message for e in load_events(str(log_dir), workers=2)] == [e.message for e in events]
+    assert [e.message for e in load_events(str(log_dir), workers=1, levels=["CRITICAL"])] == ["b1", "c2", "a3"]
+    since = [e.message for e in load_events(str(log_dir), workers=1, since="2025-07-11T10:00:09")]
+    assert since == ["a9", "b10", "c11"]
+
+
+@pytest.mark.asyncio
+async def test_merged_pipeline_detects_across_files(log_dir, tmp_path):
+    queue = asyncio.Queue(maxsize=1)
+    sources = resolve_sources(str(log_dir))
+    lines = []
+    await asyncio.gather(read_merged(sources, queue, chunk_size=64), _drain(queue, lines, 13))
+    assert [json.loads(l)["message"] for l in lines[:12]] == [f"{'abc'[s % 3]}{s}" for s in range(12)]
+
+    # Trois CRITICAL en moins de 3 s, chacun dans un fichier différent : une seule alerte
+    alert_path = str(tmp_path / "alerts.json")
+    consumer = asyncio.create_task(process_batches(queue, EventAnalyzer(), alert_path))
+    await read_merged(sources, queue, batch_size=4, chunk_size=64)
+    await queue.join()
+    consumer.cancel()
+    assert [[e.message for e in a.events] for a in load_alerts(alert_path)] == [["b1", "c2", "a3"]]
+
+
+async def _drain(queue, lines, count):
+    for _ in range(count):
+        lines.append(await queue.get())
+        queue.task_done()
+
+
+@pytest.mark.asyncio
+async def test_corrupt_archive_raises(tmp_path):
+    (tmp_path / "broken.log.gz").write_bytes(b"\x1f\x8b" + b"\x00" * 20)
+    with pytest.raises(Exception):
+        await read_merged([str(tmp_path / "broken.log.gz")], asyncio.Queue())
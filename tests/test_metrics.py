@@ -0,0 +1,88 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+
+from app.services.events_analyzer import EventAnalyzer
+from app.services.metrics import NULL_METRICS, Histogram, Metrics, TimedQueue
+from app.services.process.process_lines import process_lines
+from app.services.rules import ThresholdRule
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for value in [0.0005] * 90 + [0.05] * 10:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(0.99) == 0.1
+
+
+def test_prometheus_export(tmp_path):
+    metrics = Metrics()
+    metrics.inc("events_total", 3)
+    metrics.set_gauge("queue_depth", 2)
+    metrics.register_gauge("active_keys", lambda: 5)
+    metrics.observe("stage_seconds", 0.002, "decode")
+    metrics.observe("stage_seconds", 0.004, "analyze")
+    text = metrics.to_prometheus()
+    assert "alert_flow_events_total 3" in text
+    assert "alert_flow_queue_depth 2" in text
+    assert "alert_flow_active_keys 5" in text
+    assert text.count("# TYPE alert_flow_stage_seconds histogram") == 1
+    assert 'alert_flow_stage_seconds_bucket{stage="decode",le="+Inf"} 1' in text
+    assert 'alert_flow_stage_seconds_count{stage="analyze"} 1' in text
+
+    path = tmp_path / "metrics.prom"
+    metrics.write_prometheus(str(path))
+    assert path.read_text() == text
+
+
+def test_http_endpoint():
+    metrics = Metrics()
+    metrics.inc("alerts_total")
+    server = metrics.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert "alert_flow_alerts_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+
+
+def test_null_metrics_records_nothing():
+    NULL_METRICS.inc("events_total")
+    NULL_METRICS.observe("stage_seconds", 1.0, "decode")
+    assert not NULL_METRICS.enabled
+    assert NULL_METRICS.counters == {} and NULL_METRICS.histograms == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_pipeline_metrics(tmp_path, capsys):
+    metrics = Metrics()
+    queue = asyncio.Queue()
+    for i in range(4):
+        await queue.put(json.dumps({"timestamp": f"2025-07-11T10:00:0{i}", "level": "CRITICAL", "message": f"m{i}"}))
+    await queue.put("pas du json")
+    consumer = asyncio.create_task(process_lines(queue, EventAnalyzer(), str(tmp_path / "alerts.json"), metrics))
+    await queue.join()
+    consumer.cancel()
+
+    assert metrics.counters == {"events_total": 4, "alerts_total": 1, "errors_total": 1}
+    stages = {stage for name, stage in metrics.histograms if name == "stage_seconds"}
+    assert {"queue_wait", "decode", "analyze", "save"} <= stages
+    assert metrics.histograms[("alert_latency_seconds", None)].count == 1
+
+
+@pytest.mark.asyncio
+async def test_alert_latency_includes_queue_wait(tmp_path, capsys):
+    metrics = Metrics()
+    queue = TimedQueue()
+    await queue.put(json.dumps({"timestamp": "2025-07-11T10:00:00", "level": "CRITICAL", "message": "panne"}))
+    await asyncio.sleep(0.05)  # La ligne attend dans la queue avant d'être consommée
+    analyzer = EventAnalyzer(rules=[ThresholdRule("default", count=1, levels=["CRITICAL"])])
+    consumer = asyncio.create_task(process_lines(queue, analyzer, str(tmp_path / "alerts.json"), metrics))
+    await queue.join()
+    consumer.cancel()
+    assert metrics.histograms[("alert_latency_seconds", None)].sum >= 0.05
+    assert metrics.histograms[("stage_seconds", "queue_wait")].sum < 0.05
@@ -0,0 +1,34 @@
+import asyncio
+import json
+
+import pytest
+
+from app.providers.alerts_provider import load_alerts
+from app.services.events_analyzer import EventAnalyzer
+from app.services.process.process_lines import process_batches
+from app.services.process.read import read_batches
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "events.log"
+    with open(path, "w") as f:
+        for i in range(10):
+            level = "CRITICAL" if i % 2 else "INFO"
+            f.write(json.dumps({"timestamp": f"2025-07-11T10:00:{i:02d}", "level": level, "message": f"m{i}"}) + "\n")
+        f.write("pas du json\n")
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_throughput_pipeline(log_file, tmp_path):
+    alert_path = str(tmp_path / "alerts.json")
+    queue = asyncio.Queue(maxsize=1)
+    producer = asyncio.create_task(read_batches(log_file, queue, batch_size=4, chunk_size=64))
+    consumer = asyncio.create_task(process_batches(queue, EventAnalyzer(), alert_path))
+    await producer
+    await queue.join()
+    consumer.cancel()
+
+    alerts = load_alerts(alert_path)
+    assert [[e.message for e in a.events] for a in alerts] == [["m1", "m3", "m5"]]
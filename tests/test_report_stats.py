@@ -0,0 +1,75 @@
+import datetime
+import json
+
+import pytest
+
+from app.models.alerts_model import Alert
+from app.models.event_batch import EventBatch
+from app.models.event_model import Event
+from app.services.aggregates import Aggregates
+from app.services.process import report_generator
+from app.services.report_stats import ReportStats
+
+
+def line(second, level):
+    return json.dumps({"timestamp": f"2025-07-11T10:{second // 60:02d}:{second % 60:02d}Z",
+                       "level": level, "message": "m"})
+
+
+# Minute 0 : 3 événements, minute 1 : aucun, minute 2 : 2 événements
+LINES = [line(0, "INFO"), line(10, "CRITICAL"), line(50, "INFO"), line(125, "ERROR"), line(130, "INFO")]
+
+
+def make_alert(minute, size):
+    event = Event(json.loads(line(minute * 60, "CRITICAL")))
+    return Alert(triggered_at=datetime.datetime(2025, 7, 11, 10, minute, 30), events=[event] * size)
+
+
+def test_batch_and_aggregates_give_same_statistics(tmp_path):
+    alerts = [make_alert(0, 2), make_alert(2, 4)]
+    log_path = tmp_path / "events.log"
+    log_path.write_text("\n".join(LINES) + "\n")
+    aggregates = Aggregates().refresh(str(log_path))
+    for alert in alerts:
+        aggregates.add_alert(alert.to_dict())
+
+    for stats in (ReportStats.from_batch(EventBatch.from_lines(LINES), alerts),
+                  ReportStats.from_aggregates(aggregates, alerts)):
+        assert stats.level_rows() == [("INFO", 3), ("CRITICAL", 1), ("ERROR", 1)]
+        assert (stats.total, stats.critical, stats.mean) == (5, 1, 1.67)
+        assert stats.rate.tolist() == [3.0, 0.0, 2.0]
+        assert stats.alert_rate.tolist() == [1.0, 0.0, 1.0]
+        assert stats.rate_percentiles[50] == 2.0
+        assert stats.peak_rate == 3.0
+        assert stats.alerts_per_1000_events == 400.0
+        assert stats.alerts_per_hour == pytest.approx(40.0)
+        assert stats.alert_size_percentiles[50] == 3.0
+
+
+def test_coarse_buckets_and_long_periods():
+    aggregates = Aggregates(bucket_seconds=120)
+    aggregates.add_level("INFO", 0)
+    aggregates.add_level("INFO", 240 * 10 ** 9)
+    stats = ReportStats.from_aggregates(aggregates)
+    assert stats.step == 120 and stats.rate.tolist() == [0.5, 0.0, 0.5]
+
+    wide = ReportStats(["INFO"], [2], [0, 10 ** 9], [1, 1], [], [], max_points=1000)
+    assert len(wide.times) <= 1000 and wide.rate.sum() * wide.step / 60 == 2
+
+
+def test_empty_statistics():
+    stats = ReportStats.from_aggregates(Aggregates(), [])
+    assert (stats.total, stats.mean, stats.peak_rate, stats.rate_percentiles[99]) == (0, 0.0, 0.0, 0.0)
+
+
+def test_reports_share_statistics(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_generator.webbrowser, "open", lambda *args, **kwargs: True)
+    stats = ReportStats.from_batch(EventBatch.from_lines(LINES), [make_alert(0, 2)])
+    report_generator.generate_html(stats, [], str(tmp_path / "report.html"))
+    report_generator.generate_pdf(stats, [], str(tmp_path))
+
+    html = (tmp_path / "report.html").read_text()
+    assert "<tr><td>INFO</td><td>3</td></tr>" in html
+    assert 'src="charts/rate_' in html
+    assert len(list((tmp_path / "charts").glob("*.png"))) == 2  # Images partagées par les deux rapports
+    assert list(tmp_path.glob("report_*.pdf"))
@@ -0,0 +1,66 @@
+import pytest
+
+from app.models.event_model import Event
+from app.services.events_analyzer import EventAnalyzer
+from app.services.rules import PatternRule, RateRule, Rule, RuleEngine, ThresholdRule, build_rule
+
+
+def event(second, level="CRITICAL", message="panne", **fields):
+    return Event({"timestamp": f"2025-07-11T10:{second // 60:02d}:{second % 60:02d}",
+                  "level": level, "message": message, **fields})
+
+
+def test_default_rule_keeps_historic_behavior():
+    analyzer = EventAnalyzer()
+    seconds = [0, 10, 50, 55, 60, 61]
+    alerts = analyzer.analyze_batch([event(s) for s in seconds] + [event(62, "INFO")])
+    assert [[e.epoch_ns for e in a.events] for a in alerts] == [[event(s).epoch_ns for s in (50, 55, 60)]]
+    assert alerts[0].rule == "default"
+
+
+def test_dispatch_only_touches_matching_rules():
+    errors = ThresholdRule("errors", count=2, levels=["error"])
+    service = ThresholdRule("service", count=2, levels=["ERROR"], field="service")
+    anything = PatternRule("timeout", pattern="timeout")
+    engine = RuleEngine([errors, service, anything])
+
+    assert engine.candidates(event(0, "INFO")) == [anything]
+    assert engine.candidates(event(0, "ERROR")) == [errors, anything]
+    assert set(engine.candidates(event(0, "ERROR", service="api"))) == {errors, service, anything}
+
+    alerts = engine.evaluate(event(0, "ERROR", "timeout", service="api"))
+    assert [a.rule for a in alerts] == ["timeout"]
+    alerts = engine.evaluate(event(1, "ERROR", service="api"))
+    assert sorted(a.rule for a in alerts) == ["errors", "service"]
+
+
+def test_rate_rule():
+    rule = RateRule("rate", rate=1, window_seconds=2)
+    assert [rule.evaluate(event(0)), rule.evaluate(event(1))] == [None, None]
+    assert rule.evaluate(event(1)).events[0].message == "panne"
+    assert rule.evaluate(event(10)) is None
+
+
+def test_build_rule_from_config():
+    rule = build_rule({"type": "pattern", "name": "disque", "pattern": "disk", "levels": ["warning"]})
+    assert isinstance(rule, PatternRule) and rule.levels == {"WARNING"}
+    with pytest.raises(ValueError):
+        build_rule({"type": "inconnu"})
+    with pytest.raises(TypeError):
+        Rule("abstraite")  # `evaluate` doit être défini par les sous-classes
+
+
+def test_grouped_windows_are_independent_and_bounded():
+    rule = ThresholdRule("hosts", count=2, window_seconds=10, group_by="host", max_keys=2)
+    assert rule.evaluate(event(0, host="a")) is None
+    assert rule.evaluate(event(1, host="b")) is None
+    alert = rule.evaluate(event(2, host="a"))
+    assert alert.key == "a" and len(alert.events) == 2
+
+    rule.evaluate(event(3, host="c"))  # "b" est la clé la moins récemment utilisée
+    assert rule.metrics() == {"active_keys": 2, "expired": 0, "evicted": 1}
+    assert rule.evaluate(event(4, host="b")) is None  # Fenêtre de "b" repartie de zéro
+
+    rule.evaluate(event(100, host="d"))  # "c" et "b" inactives depuis plus de 2 fenêtres
+    assert rule.metrics()["expired"] == 2
+    assert rule.metrics()["active_keys"] == 1
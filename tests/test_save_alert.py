@@ -32,7 +32,7 @@ def test_save_alert(alert_sample):
 
     # Vérifier si l'alerte a été correctement sauvegardée dans le fichier
     with open(alert_path, "r") as f:
-        alerts = json.load(f)
+        alerts = [json.loads(line) for line in f if line.strip()]
         assert len(alerts) == 1  # Vérifier qu'une seule alerte est présente
         # Convertir la chaîne ISO 8601 en datetime avant la comparaison
         saved_triggered_at = datetime.datetime.fromisoformat(alerts[0]["triggered_at"])
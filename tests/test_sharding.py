@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.providers.alerts_provider import load_alerts
+from app.services.process.sharding import ShardRouter, key_extractor, shard_for, unshardable_rules
+from app.services.rules import PatternRule, RateRule, ThresholdRule
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_shard_for_is_stable():
+    assert shard_for("api", 4) == shard_for("api", 4)
+    assert shard_for(None, 4) == 0
+    assert {shard_for(f"host-{i}", 4) for i in range(50)} == {0, 1, 2, 3}
+
+
+def test_key_extractor_reads_field_without_full_decode():
+    extract = key_extractor("host")
+    assert extract(json.dumps({"level": "INFO", "host": "web \"1\""})) == 'web "1"'
+    assert extract('{"host": 12, "level": "INFO"}') == "12"
+    assert extract('{"level": "INFO"}') is None
+    assert key_extractor(None)('{"host": "a"}') is None
+
+
+@pytest.mark.asyncio
+async def test_router_writes_alerts_from_workers(tmp_path):
+    alert_path = str(tmp_path / "alerts.json")
+    lines = [json.dumps({"timestamp": f"2025-07-11T10:00:{i:02d}", "level": "CRITICAL", "message": f"m{i}"})
+             for i in range(7)]
+    router = ShardRouter(2, None, batch_size=2)
+    router.start()
+    writer = asyncio.create_task(router.write_alerts(alert_path))
+    await router.route(lines)
+    await router.close()
+    await writer
+
+    alerts = load_alerts(alert_path)
+    assert [[e.message for e in a.events] for a in alerts] == [["m0", "m1", "m2"], ["m3", "m4", "m5"]]
+
+
+def test_rules_not_grouped_by_the_shard_key_are_reported():
+    rules = [
+        ThresholdRule("hosts", count=3, levels=["CRITICAL"], group_by="host"),
+        ThresholdRule("global_err", count=5, window_seconds=10, levels=["ERROR"]),
+        RateRule("services", rate=5, group_by="service"),
+        PatternRule("disk", pattern="disk"),
+    ]
+    assert unshardable_rules(rules, "host") == ["global_err", "services"]
+    assert unshardable_rules(rules[:1] + rules[3:], "host") == []
+    assert unshardable_rules(rules, None) == []
+
+
+def run_cli(cwd, *args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT / "src"), os.environ.get("PYTHONPATH")])),
+               ALERT_FLOW_CONFIG=str(cwd / "config.json"))
+    return subprocess.run([sys.executable, str(ROOT / "main.py"), *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=120).stdout
+
+
+def test_mixed_rule_set_falls_back_to_a_single_worker(tmp_path):
+    (tmp_path / "config.json").write_text(json.dumps({"event_analyzer": {"group_by": "host", "rules": [
+        {"name": "global_err", "type": "threshold", "levels": ["ERROR"], "count": 5, "window_seconds": 10},
+    ]}}))
+    with open(tmp_path / "events.log", "w") as f:
+        for i in range(600):
+            level = "ERROR" if i % 3 else "CRITICAL"
+            f.write(json.dumps({"timestamp": f"2025-07-11T10:{i // 60:02d}:{i % 60:02d}", "level": level,
+                                "host": f"web-{i % 4}", "message": f"m{i}"}) + "\n")
+
+    def alerts_by_rule(workers):
+        (tmp_path / "alerts.json").unlink(missing_ok=True)
+        output = run_cli(tmp_path, "run", "--mode", "throughput", "--workers", str(workers))
+        rules = [a.rule for a in load_alerts(str(tmp_path / "alerts.json"))]
+        return output, {rule: rules.count(rule) for rule in set(rules)}
+
+    _, expected = alerts_by_rule(1)
+    output, counts = alerts_by_rule(3)
+    assert "Analyse répartie désactivée" in output and "global_err" in output
+    assert counts == expected and expected["global_err"] > 0
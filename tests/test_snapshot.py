@@ -0,0 +1,105 @@
+import asyncio
+import json
+import shutil
+
+import pytest
+
+from app.models.event_model import Event
+from app.providers.alert_backends import FileBackend
+from app.providers.alert_store import iter_records
+from app.services.alert_sink import AlertSink
+from app.services.events_analyzer import EventAnalyzer
+from app.services.process.process_lines import process_batches
+from app.services.process.read import read_batches
+from app.services.process.snapshot import Snapshotter, decode_snapshot, encode_snapshot
+from app.services.rules import RateRule, ThresholdRule
+
+
+def analyzer():
+    return EventAnalyzer(rules=[
+        ThresholdRule("default", count=3, window_seconds=30, levels=["CRITICAL"], group_by="host"),
+        RateRule("rate", rate=1, window_seconds=2),
+    ])
+
+
+def line(second, level, host="a"):
+    return json.dumps({"timestamp": f"2025-07-11T10:{second // 60:02d}:{second % 60:02d}", "level": level,
+                       "message": f"m{second}", "host": host}) + "\n"
+
+
+def test_encoding_detects_corruption():
+    data = encode_snapshot({"offset": 42, "analyzer": []})
+    assert decode_snapshot(data) == {"offset": 42, "analyzer": []}
+    assert decode_snapshot(data[:-1]) is None
+    assert decode_snapshot(data[:-1] + bytes([data[-1] ^ 1])) is None
+
+
+def test_analyzer_windows_survive_restore():
+    before = analyzer()
+    for second in (0, 5):
+        assert before.evaluate(Event.from_line(line(second, "CRITICAL"), offset=second)) == []
+    state = json.loads(json.dumps(before.snapshot()))
+
+    after = analyzer()
+    after.restore(state)
+    alerts = after.evaluate(Event.from_line(line(9, "CRITICAL")))
+    assert [(a.rule, [e.message for e in a.events]) for a in alerts] == [("default", ["m0", "m5", "m9"])]
+    assert [e.offset for e in alerts[0].events[:2]] == [0, 5]
+    assert after.metrics()["default"]["active_keys"] == 1
+
+
+async def run(log_file, alert_path, snapshot_path, interval=0.0):
+    queue = asyncio.Queue(maxsize=2)
+    sink = AlertSink([FileBackend(alert_path)], flush_interval=0.01)
+    sink.start()
+    detector = analyzer()
+    snapshotter = Snapshotter(snapshot_path, detector, queue, sink, interval)
+    resume = snapshotter.restore(log_file)
+    consumer = asyncio.create_task(process_batches(queue, detector, alert_path, sink=sink))
+    await read_batches(log_file, queue, batch_size=2, chunk_size=64, start=resume["offset"] if resume else 0,
+                       snapshot=snapshotter)
+    await queue.join()
+    consumer.cancel()
+    await sink.close()
+    return resume
+
+
+def alert_keys(path):
+    return [(r["rule"], [e["message"] for e in r["events"]]) for r in iter_records(path)]
+
+
+@pytest.mark.asyncio
+async def test_restart_resumes_without_missed_or_duplicate_alerts(tmp_path):
+    first = "".join(line(s, "CRITICAL" if s % 4 == 0 else "INFO") for s in range(0, 30))
+    second = "".join(line(s, "CRITICAL" if s % 4 == 0 else "INFO", "b" if s % 8 else "a") for s in range(30, 60))
+    reference_log, reference_alerts = tmp_path / "reference.log", str(tmp_path / "reference.json")
+    reference_log.write_text(first + second)
+    await run(str(reference_log), reference_alerts, str(tmp_path / "reference.snapshot"))
+
+    log_file, alert_path, snapshot_path = tmp_path / "events.log", str(tmp_path / "alerts.json"), str(tmp_path / "events.snapshot")
+    log_file.write_text(first)
+    assert await run(str(log_file), alert_path, snapshot_path) is None
+    stale = tmp_path / "stale.snapshot"
+    shutil.copy(snapshot_path, stale)
+    with open(log_file, "a") as f:
+        f.write(second)
+
+    # Deuxième exécution interrompue après l'écriture de ses alertes, avant son instantané final
+    assert (await run(str(log_file), alert_path, snapshot_path))["offset"] == len(first)
+    shutil.copy(stale, snapshot_path)
+    # Reprise depuis l'instantané précédent : les alertes rejouées ne sont pas réécrites
+    assert (await run(str(log_file), alert_path, snapshot_path))["offset"] == len(first)
+
+    assert alert_keys(alert_path) == alert_keys(reference_alerts)
+    assert any(rule == "default" and messages[0] < "m30" < messages[-1] for rule, messages in alert_keys(alert_path))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_beyond_end_of_file_is_ignored(tmp_path):
+    log_file = tmp_path / "events.log"
+    log_file.write_text(line(0, "CRITICAL") + line(1, "CRITICAL"))
+    snapshot_path = str(tmp_path / "events.snapshot")
+    await run(str(log_file), str(tmp_path / "alerts.json"), snapshot_path)
+    log_file.unlink()
+    log_file.write_text(line(2, "CRITICAL"))  # Nouveau fichier, plus court que la position sauvegardée
+    assert Snapshotter(snapshot_path, analyzer(), asyncio.Queue()).restore(str(log_file)) is None
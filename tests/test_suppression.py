@@ -0,0 +1,71 @@
+import json
+
+from app.models.event_model import Event
+from app.services.events_analyzer import EventAnalyzer
+from app.services.rules import ThresholdRule
+from app.services.suppression import Suppressor, fingerprint, message_template
+
+
+def event(second, message="Disk 93% full on 10.0.0.7", host="a"):
+    return Event.from_line(json.dumps({"timestamp": 1752228000 + second, "level": "CRITICAL",
+                                       "message": message, "host": host}))
+
+
+def flood(suppressor, seconds, **kwargs):
+    analyzer = EventAnalyzer(rules=[ThresholdRule("default", count=1, levels=["CRITICAL"], group_by="host")])
+    return [alert for second in seconds for alert in suppressor.filter(analyzer.evaluate(event(second, **kwargs)))]
+
+
+def test_message_template():
+    assert message_template('Timeout after 3012 ms on 10.0.0.7:5432 for "bob"') == "Timeout after <n> ms on <ip> for <str>"
+    assert message_template("job 3f2b8c1e-1d2a-4c3b-9e8f-0a1b2c3d4e5f failed at 0x7ffe") == "job <uuid> failed at <hex>"
+
+
+def test_repeats_are_coalesced_within_cooldown():
+    suppressor = Suppressor(cooldown_seconds=60)
+    emitted = flood(suppressor, range(0, 50, 5))
+    assert [(a.events[0].epoch_ns // 10**9 - 1752228000, a.count) for a in emitted] == [(0, 1)]
+    assert suppressor.suppressed == 9
+
+    # Fin de la période de silence : une synthèse des 9 répétitions, puis la nouvelle occurrence
+    emitted = flood(suppressor, [70])
+    assert [(a.count, a.fingerprint) for a in emitted] == [(9, emitted[1].fingerprint), (1, emitted[1].fingerprint)]
+    summary = emitted[0].to_dict()
+    assert summary["count"] == 9 and summary["first_triggered_at"] == "2025-07-11T10:00:05+00:00"
+
+
+def test_fingerprint_separates_keys_and_templates():
+    analyzer = EventAnalyzer(rules=[ThresholdRule("default", count=1, levels=["CRITICAL"], group_by="host")])
+    same = [analyzer.evaluate(event(s, f"Disk {90 + s}% full on 10.0.0.{s}"))[0] for s in (1, 2)]
+    assert fingerprint(same[0]) == fingerprint(same[1])
+    assert fingerprint(analyzer.evaluate(event(3, host="b"))[0]) != fingerprint(same[0])
+    assert fingerprint(analyzer.evaluate(event(4, "Service down"))[0]) != fingerprint(same[0])
+
+
+def test_cache_is_bounded_and_flushes_evicted_summaries():
+    suppressor = Suppressor(cooldown_seconds=60, max_entries=2)
+    flood(suppressor, [0, 1], host="a")
+    emitted = flood(suppressor, [2], host="b") + flood(suppressor, [3], host="c")
+    assert [(a.key, a.count) for a in emitted] == [("b", 1), ("a", 1), ("c", 1)]
+    assert len(list(suppressor._windows.items())) == 2
+    flood(suppressor, [4, 5], host="c")
+    assert [(a.key, a.count) for a in suppressor.flush()] == [("c", 2)]
+    assert suppressor.flush() == []
+
+
+def test_state_survives_snapshot():
+    suppressor = Suppressor(cooldown_seconds=60)
+    flood(suppressor, [0, 5, 10])
+    restored = Suppressor(cooldown_seconds=60)
+    restored.restore(json.loads(json.dumps(suppressor.snapshot())))
+    assert flood(restored, [15]) == []
+    assert [(a.count, a.events[0].message) for a in restored.flush()] == [(3, "Disk 93% full on 10.0.0.7")]
+
+
+def test_summary_is_emitted_when_cooldown_ends_without_new_alert():
+    suppressor = Suppressor(cooldown_seconds=60)
+    flood(suppressor, [0, 5, 10])
+    assert suppressor.filter([], event(50).epoch_ns) == []
+    emitted = suppressor.filter([], event(61).epoch_ns)  # Événement sans alerte, après la période
+    assert [(a.count, a.events[0].epoch_ns) for a in emitted] == [(2, event(10).epoch_ns)]
+    assert suppressor.filter([], event(200).epoch_ns) == [] and suppressor.flush() == []
@@ -0,0 +1,26 @@
+import json
+
+from app.models.event_model import Event
+from benchmarks.synthetic import generate_events, parse_mix, write_log
+
+
+def test_generate_events_is_deterministic():
+    first = list(generate_events(500, seed=7, burst_every=100, burst_size=5))
+    second = list(generate_events(500, seed=7, burst_every=100, burst_size=5))
+    assert first == second
+    assert first != list(generate_events(500, seed=8, burst_every=100, burst_size=5))
+
+
+def test_generate_events_bursts_and_mix():
+    events = list(generate_events(300, seed=1, level_mix=parse_mix("INFO=1"), burst_every=100, burst_size=4))
+    assert len(events) == 300 + 3 * 4
+    assert {e["level"] for e in events} == {"INFO", "CRITICAL"}
+    parsed = [Event(e) for e in events]
+    assert all(a.epoch_ns <= b.epoch_ns for a, b in zip(parsed, parsed[1:]))
+
+
+def test_write_log(tmp_path):
+    path = tmp_path / "events.log"
+    assert write_log(str(path), 50, seed=3) == 50
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == list(generate_events(50, seed=3))
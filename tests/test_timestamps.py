@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.event_model import Event
+from app.models.timestamps import TimestampParser, ns_to_datetime
+
+
+def reference_ns(value):
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp()) * 1_000_000_000 + timestamp.microsecond * 1000
+
+
+@pytest.mark.parametrize("value", [
+    "2025-07-11T10:00:05",
+    "2025-07-11T10:00:05Z",
+    "2025-07-11 10:00:05",
+    "2025-07-11T10:00:05.123Z",
+    "2025-07-11T10:00:05.123456+02:00",
+    "2025-07-11T10:00:05-0530",
+    "2025-07-11T10:00",
+    "2025-07-11",
+])
+def test_iso_variants_match_fromisoformat(value):
+    parser = TimestampParser()
+    assert parser.parse_ns(value) == reference_ns(value)
+    assert parser.parse_ns(value) == reference_ns(value)  # Deuxième passage : préfixe en cache
+
+
+def test_epoch_units_are_detected():
+    parser = TimestampParser()
+    expected = 1_752_228_000 * 1_000_000_000
+    assert parser.parse_ns(1_752_228_000) == expected
+    assert parser.parse_ns(1_752_228_000_000) == expected
+    assert parser.parse_ns(1_752_228_000.5) == expected + 500_000_000
+    assert parser.parse_ns("1752228000") == expected
+    assert parser.kind == "epoch"
+
+
+def test_invalid_values_raise():
+    parser = TimestampParser()
+    for value in ("2025-07-11T10:00:61", "pas une date", None):
+        with pytest.raises((ValueError, TypeError)):
+            parser.parse_ns(value)
+
+
+def test_event_exposes_epoch_and_lazy_datetime():
+    event = Event({"timestamp": 1_752_228_000, "level": "info", "message": "epoch"})
+    assert event.timestamp == ns_to_datetime(event.epoch_ns) == datetime(2025, 7, 11, 10, 0, tzinfo=timezone.utc)
+    event = Event({"timestamp": "2025-07-11T10:00:00", "level": "info", "message": "iso"})
+    assert event.timestamp.tzinfo is None
+
+
+def test_shared_parser_keeps_iso_fast_path_after_epoch_values():
+    parser = TimestampParser()
+    assert parser.parse_ns(1_752_228_000) == 1_752_228_000 * 1_000_000_000
+    value = "2025-07-11T10:00:05.123Z"
+    assert parser.parse_ns(value) == reference_ns(value)
+    assert "2025-07-11T10:00:05" in parser._seconds  # Préfixe en cache malgré le premier flux epoch